@@ -1,21 +1,97 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.responses import HTMLResponse, RedirectResponse
 from uvicorn import run as app_run
+import asyncio
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
-
-from typing import Optional
+from functools import partial
 
 # Importing constants and pipeline modules from the project
-from src.constants import APP_HOST, APP_PORT
-from src.pipline.prediction_pipeline import VehicleData, VehicleDataClassifier
-from src.pipline.training_pipeline import TrainPipeline
+from src.constants import (APP_HOST, APP_PORT, APP_WORKERS, MODEL_CACHE_WARM_UP_RETRY_SECONDS,
+                           PREDICTION_COALESCER_ENABLED, PREDICTION_RANK_DEFAULT_K)
+from src.entity.config_entity import ShadowConfig, VehiclePredictorConfig
+from src.entity.model_cache import get_model_cache
+from src.logger import logging
+from src.metrics import ERRORS, registry, stage_timer
+from src.pipline.bulk_prediction import CsvStreamScorer, DuplexStreamingResponse
+from src.pipline.inference_executor import InferenceExecutor
+from src.pipline.prediction_coalescer import PredictionCoalescer
+from src.pipline.prediction_pipeline import VehicleDataClassifier, get_feature_decoder, get_prediction_cache
+from src.pipline.request_decoder import RequestValidationError
+from src.pipline.shadow_scoring import ShadowScorer
+from src.pipline.training_jobs import TrainingJobManager, TrainingJobRunningError
+
+predictor_config = VehiclePredictorConfig()
+model_cache = get_model_cache(bucket_name=predictor_config.model_bucket_name,
+                              model_path=predictor_config.model_file_path)
+
+# Decodes JSON and form payloads into typed, validated model inputs
+feature_decoder = get_feature_decoder()
+
+# Blocking inference runs on a bounded thread pool so the event loop keeps serving other requests
+inference_executor = InferenceExecutor()
+
+# Concurrent single-row predictions are coalesced into one vectorized model call
+record_predictor = VehicleDataClassifier(predictor_config)
+# Only records that missed the prediction cache in predict_record are queued, so the batch skips the lookup
+prediction_coalescer = PredictionCoalescer(predict_fn=partial(record_predictor.predict_records, check_cache=False),
+                                           executor=inference_executor)
+
+# Training runs in a separate process, one job at a time; a pushed model is picked up right away
+training_jobs = TrainingJobManager(on_success=model_cache.refresh)
+
+# A challenger model scores a sample of live requests off the request path, for comparison only
+shadow_config = ShadowConfig()
+shadow_scorer = None
+if shadow_config.enabled:
+    shadow_scorer = ShadowScorer(model_cache=get_model_cache(bucket_name=shadow_config.model_bucket_name,
+                                                             model_path=shadow_config.model_file_path),
+                                 shadow_config=shadow_config)
+
+# Set once the production model is loaded and has answered a synthetic prediction
+model_warmed_up = asyncio.Event()
+
+async def warm_up_model():
+    """
+    Loads and warms the production model, retrying until it succeeds.
+    """
+    while True:
+        try:
+            await inference_executor.run(VehicleDataClassifier(predictor_config).warm_up)
+            model_warmed_up.set()
+            return
+        except Exception as e:
+            # Liveness is unaffected; readiness stays false until a model is resident
+            logging.warning(f"Could not warm up production model, retrying in "
+                            f"{MODEL_CACHE_WARM_UP_RETRY_SECONDS}s: {e}")
+            await asyncio.sleep(MODEL_CACHE_WARM_UP_RETRY_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Loads and warms the production model in the background at startup and keeps it fresh.
+    """
+    warm_up_task = asyncio.create_task(warm_up_model())
+    model_cache.start_watcher()
+    if shadow_scorer is not None:
+        shadow_scorer.model_cache.start_watcher()
+    yield
+    warm_up_task.cancel()
+    await prediction_coalescer.shutdown()
+    model_cache.stop_watcher()
+    if shadow_scorer is not None:
+        shadow_scorer.model_cache.stop_watcher()
+        shadow_scorer.shutdown()
+    training_jobs.shutdown()
+    inference_executor.shutdown()
 
 # Initialize FastAPI application
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Mount the 'static' directory for serving static files (like CSS)
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -35,58 +111,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class DataForm:
-    """
-    DataForm class to handle and process incoming form data.
-    This class defines the vehicle-related attributes expected from the form.
-    """
-    def __init__(self, request: Request):
-        self.gender: Optional[str] = None
-        self.SeniorCitizen: Optional[int] = None
-        self.Partner: Optional[str] = None
-        self.Dependents: Optional[str] = None
-        self.tenure: Optional[int] = None
-        self.PhoneService: Optional[str] = None
-        self.MultipleLines: Optional[str] = None
-        self.InternetService: Optional[str] = None
-        self.OnlineSecurity: Optional[str] = None
-        self.OnlineBackup: Optional[str] = None
-        self.DeviceProtection: Optional[str] = None
-        self.TechSupport: Optional[str] = None
-        self.StreamingTV: Optional[str] = None
-        self.StreamingMovies: Optional[str] = None
-        self.Contract: Optional[str] = None
-        self.PaperlessBilling: Optional[str] = None
-        self.PaymentMethod: Optional[str] = None
-        self.MonthlyCharges: Optional[float] = None
-        self.TotalCharges: Optional[float] = None
-        self.request: Request = request
-
-    async def get_vehicle_data(self):
-        """
-        Method to retrieve and assign form data to class attributes.
-        This method is asynchronous to handle form data fetching without blocking.
-        """
-        form = await self.request.form()
-        self.gender = form.get("gender")
-        self.SeniorCitizen = form.get("SeniorCitizen")
-        self.Partner = form.get("Partner")
-        self.Dependents = form.get("Dependents")
-        self.tenure = form.get("tenure")
-        self.PhoneService = form.get("PhoneService")
-        self.MultipleLines = form.get("MultipleLines")
-        self.InternetService = form.get("InternetService")
-        self.OnlineSecurity = form.get("OnlineSecurity")
-        self.OnlineBackup = form.get("OnlineBackup")
-        self.DeviceProtection = form.get("DeviceProtection")
-        self.TechSupport = form.get("TechSupport")
-        self.StreamingTV = form.get("StreamingTV")
-        self.StreamingMovies = form.get("StreamingMovies")
-        self.Contract = form.get("Contract")
-        self.PaperlessBilling = form.get("PaperlessBilling")
-        self.PaymentMethod = form.get("PaymentMethod")
-        self.MonthlyCharges = form.get("MonthlyCharges")
-        self.TotalCharges = form.get("TotalCharges")
+async def predict_record(record: dict):
+    """
+    Scores one decoded record, coalesced with concurrent requests when enabled.
+    """
+    start = time.perf_counter()
+    if PREDICTION_COALESCER_ENABLED:
+        # Cache hits are answered right away, without waiting out the coalescer window
+        hit, value = record_predictor.get_cached_prediction(record)
+        if not hit:
+            # Queue the record so it is scored together with concurrent requests
+            value = await prediction_coalescer.predict(record)
+    else:
+        # Look the record up in the prediction cache and score it on a miss, on the inference pool
+        value = (await inference_executor.run(record_predictor.predict_records, [record]))[0]
+
+    if shadow_scorer is not None:
+        shadow_scorer.submit([record], [value], time.perf_counter() - start)
+    return value
+
+def validation_error_response(error: RequestValidationError) -> JSONResponse:
+    return JSONResponse(status_code=422, content={"status": False, "error": f"{error}", "errors": error.errors})
 
 # Route to render the main page with the form
 @app.get("/", tags=["authentication"])
@@ -95,22 +140,35 @@ async def index(request: Request):
     Renders the main HTML form page for vehicle data input.
     """
     return templates.TemplateResponse(
-            "vehicledata.html",{"request": request, "context": "Rendering", "time": datetime.now().timestamp()})
+            request, "vehicledata.html", {"context": "Rendering", "time": datetime.now().timestamp()})
 
 # Route to trigger the model training process
 @app.get("/train")
 async def trainRouteClient():
     """
-    Endpoint to initiate the model training pipeline.
+    Endpoint to start the model training pipeline as a background job and return its id.
     """
     try:
-        train_pipeline = TrainPipeline()
-        train_pipeline.run_pipeline()
-        return Response("Training successful!!!")
+        job = await asyncio.to_thread(training_jobs.submit)
+        return JSONResponse(status_code=202, content={"status": True, "job_id": job.job_id})
 
+    except TrainingJobRunningError as e:
+        return JSONResponse(status_code=409, content={"status": False, "job_id": e.job_id, "error": f"{e}"})
     except Exception as e:
+        ERRORS.inc("/train")
         return Response(f"Error Occurred! {e}")
 
+# Route to poll a training job
+@app.get("/train/{job_id}")
+async def trainStatusRouteClient(job_id: str):
+    """
+    Returns the status, current stage, elapsed time per stage and artifacts of a training job.
+    """
+    job = training_jobs.get_job(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"status": False, "error": f"Unknown training job {job_id}"})
+    return job
+
 # Route to handle form submission and make predictions
 @app.post("/")
 async def predictRouteClient(request: Request):
@@ -118,52 +176,194 @@ async def predictRouteClient(request: Request):
     Endpoint to receive form data, process it, and make a prediction.
     """
     try:
-        form = DataForm(request)
-        await form.get_vehicle_data()
-        
-        vehicle_data = VehicleData(
-                                gender= form.gender,
-                                SeniorCitizen=form.SeniorCitizen,
-                                Partner=form.Partner,
-                                Dependents=form.Dependents,
-                                tenure=form.tenure,
-                                PhoneService=form.PhoneService,
-                                MultipleLines=form.MultipleLines,
-                                InternetService=form.InternetService,
-                                OnlineSecurity=form.OnlineSecurity,
-                                OnlineBackup=form.OnlineBackup,
-                                DeviceProtection=form.DeviceProtection,
-                                TechSupport=form.TechSupport,
-                                StreamingTV=form.StreamingTV,
-                                StreamingMovies=form.StreamingMovies,
-                                Contract=form.Contract,
-                                PaperlessBilling=form.PaperlessBilling,
-                                PaymentMethod=form.PaymentMethod,
-                                MonthlyCharges=form.MonthlyCharges,
-                                TotalCharges=form.TotalCharges,
-                                )
-
-        # Convert form data into a DataFrame for the model
-        vehicle_df = vehicle_data.get_vehicle_input_data_frame()
-
-        # Initialize the prediction pipeline
-        model_predictor = VehicleDataClassifier()
+        with stage_timer("form_parse"):
+            record = feature_decoder.decode(await request.form())
 
-        # Make a prediction and retrieve the result
-        value = model_predictor.predict(dataframe=vehicle_df)[0]
+        value = await predict_record(record)
 
         # Interpret the prediction result as 'Response-Yes' or 'Response-No'
         status = "Response-Yes" if value == 1 else "Response-No"
 
         # Render the same HTML page with the prediction result
-        return templates.TemplateResponse(
-            "vehicledata.html",
-            {"request": request, "context": status},
-        )
+        with stage_timer("render"):
+            return templates.TemplateResponse(
+                request,
+                "vehicledata.html",
+                {"context": status},
+            )
         
     except Exception as e:
+        ERRORS.inc("/")
         return {"status": False, "error": f"{e}"}
 
+# Route to score one customer from a JSON or form payload
+@app.post("/predict")
+async def predictRecordRouteClient(request: Request):
+    """
+    Endpoint to receive one customer record as a JSON object or form data and return its prediction.
+    """
+    try:
+        with stage_timer("form_parse"):
+            if request.headers.get("content-type", "").startswith("application/json"):
+                payload = await request.json()
+            else:
+                payload = await request.form()
+            record = feature_decoder.decode(payload)
+
+        value = await predict_record(record)
+        return {"status": True, "prediction": int(value)}
+
+    except RequestValidationError as e:
+        return validation_error_response(e)
+    except Exception as e:
+        ERRORS.inc("/predict")
+        return {"status": False, "error": f"{e}"}
+
+# Route to score many customers in one request
+@app.post("/predict/batch")
+async def predictBatchRouteClient(request: Request):
+    """
+    Endpoint to receive a JSON list of customer records (or {"records": [...]}) and
+    return one prediction per record, in input order.
+    """
+    try:
+        payload = await request.json()
+        records = payload["records"] if isinstance(payload, dict) else payload
+        with stage_timer("form_parse"):
+            records = feature_decoder.decode_many(records)
+
+        # Build a single columnar DataFrame for the whole batch and run the model once over
+        # all records, on the inference pool
+        model_predictor = VehicleDataClassifier()
+        start = time.perf_counter()
+        predictions = await inference_executor.run(model_predictor.predict_records, records)
+        if shadow_scorer is not None:
+            shadow_scorer.submit(records, predictions, time.perf_counter() - start)
+
+        return {"status": True, "count": len(predictions), "predictions": [int(value) for value in predictions]}
+
+    except RequestValidationError as e:
+        return validation_error_response(e)
+    except Exception as e:
+        ERRORS.inc("/predict/batch")
+        return {"status": False, "error": f"{e}"}
+
+# Route to rank customers by churn risk
+@app.post("/predict/rank")
+async def predictRankRouteClient(request: Request):
+    """
+    Endpoint to receive {"records": [...], "k": K} and return the K records most likely to churn,
+    most at-risk first, with their churn probability. A record's customerID is echoed back when present.
+    K must be an integer >= 1; an empty list of records gives an empty ranking.
+    """
+    try:
+        payload = await request.json()
+        payload_records = payload["records"] if isinstance(payload, dict) else payload
+        k = payload.get("k", PREDICTION_RANK_DEFAULT_K) if isinstance(payload, dict) else PREDICTION_RANK_DEFAULT_K
+        if isinstance(k, bool) or not isinstance(k, int) or k < 1:
+            raise RequestValidationError([f"k: expected an integer >= 1, got {k!r}"])
+        with stage_timer("form_parse"):
+            records = feature_decoder.decode_many(payload_records)
+        if not records:
+            # Nothing to rank, and the preprocessing cannot be run over zero rows
+            return {"status": True, "count": 0, "k": k, "ranking": []}
+
+        model_predictor = VehicleDataClassifier()
+        indices, churn_probabilities = await inference_executor.run(model_predictor.rank_records, records, k)
+
+        ranking = []
+        for index, churn_probability in zip(indices.tolist(), churn_probabilities.tolist()):
+            entry = {"index": index, "churn_probability": churn_probability}
+            if "customerID" in payload_records[index]:
+                entry["customerID"] = payload_records[index]["customerID"]
+            ranking.append(entry)
+        return {"status": True, "count": len(records), "k": k, "ranking": ranking}
+
+    except RequestValidationError as e:
+        return validation_error_response(e)
+    except Exception as e:
+        ERRORS.inc("/predict/rank")
+        return {"status": False, "error": f"{e}"}
+
+# Route to score a large CSV upload while it streams in
+@app.post("/predict/csv")
+async def predictCsvRouteClient(request: Request):
+    """
+    Endpoint to receive a (chunked) CSV upload in the shape of the training data and stream
+    back one "row,customerID,prediction,error" line per input row as chunks are scored. Rows that
+    fail validation get no prediction and their problems in the error column. Uploads bypass the
+    prediction cache: their rows are mostly seen once and would evict the entries of the live routes.
+    """
+    try:
+        model_predictor = VehicleDataClassifier()
+        scorer = CsvStreamScorer(byte_stream=request.stream(), predict_fn=model_predictor.predict,
+                                 executor=inference_executor)
+        await scorer.read_header()
+        return DuplexStreamingResponse(scorer.iter_predictions(), body_read=scorer.body_read,
+                                       media_type="text/csv")
+
+    except Exception as e:
+        ERRORS.inc("/predict/csv")
+        return {"status": False, "error": f"{e}"}
+
+# Route to inspect the inference pool
+@app.get("/inference/stats")
+async def inferenceStatsRouteClient():
+    """
+    Returns inference pool size, queue usage and the pool-wait versus compute time split.
+    """
+    return inference_executor.get_stats()
+
+# Route to inspect the prediction cache
+@app.get("/predict/cache/stats")
+async def predictionCacheStatsRouteClient():
+    """
+    Returns size, hit/miss counters and the model version of the prediction cache.
+    """
+    return get_prediction_cache().get_stats()
+
+# Route to compare the shadow model with production
+@app.get("/shadow/stats")
+async def shadowStatsRouteClient():
+    """
+    Returns how often the shadow model agrees with production on sampled requests, their confusion
+    counts and the latency of both models.
+    """
+    if shadow_scorer is None:
+        return {"enabled": False}
+    return {"enabled": True, **shadow_scorer.get_stats()}
+
+# Route for the liveness probe
+@app.get("/health/live")
+async def liveRouteClient():
+    """
+    Reports that the process is up and the event loop is serving requests.
+    """
+    return {"status": True}
+
+# Route for the readiness probe
+@app.get("/health/ready")
+async def readyRouteClient():
+    """
+    Reports ready (200) only once the production model is resident and warmed up, 503 before.
+    """
+    if model_warmed_up.is_set() and model_cache.is_loaded:
+        return {"status": True, "model_version": model_cache.version}
+    return JSONResponse(status_code=503, content={"status": False, "error": "Model is not loaded yet"})
+
+# Route to expose latency histograms and counters to a Prometheus scraper
+@app.get("/metrics")
+async def metricsRouteClient():
+    """
+    Returns per-stage latency histograms, pool wait/compute times, model loads, cache
+    lookups and error counts in the Prometheus text exposition format.
+    """
+    return Response(registry.render(), media_type="text/plain; version=0.0.4")
+
 # Main entry point to start the FastAPI server
 if __name__ == "__main__":
-    app_run(app, host=APP_HOST, port=APP_PORT)
\ No newline at end of file
+    if APP_WORKERS > 1:
+        # Each worker imports the app itself; the model is shared between them through /dev/shm
+        app_run("app:app", host=APP_HOST, port=APP_PORT, workers=APP_WORKERS)
+    else:
+        app_run(app, host=APP_HOST, port=APP_PORT)
\ No newline at end of file
@@ -0,0 +1,8 @@
+from dotenv import load_dotenv
+from src.pipline.batch_scoring_pipeline import BatchScoringPipeline
+
+if __name__ == "__main__":
+    load_dotenv()
+
+    batch_scoring_pipeline = BatchScoringPipeline()
+    batch_scoring_pipeline.run_pipeline()
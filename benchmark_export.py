@@ -0,0 +1,59 @@
+import argparse
+import json
+import time
+
+import pandas as pd
+
+from src.components.data_ingestion import DataIngestion
+from src.constants import (DATA_INGESTION_COLLECTION_NAME, DATA_INGESTION_EXPORT_BATCH_SIZE,
+                           DATA_INGESTION_EXPORT_CHUNK_SIZE)
+from src.data_access.CustomerData import CustomerData
+from src.data_access.raw_batch_decoder import RawBatchDecoder
+
+
+def measure(export, repeats: int) -> dict:
+    """
+    Best-of-repeats wall time of export(), which returns the number of rows it read.
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        rows = export()
+        times.append(time.perf_counter() - start)
+    return {"rows": rows, "best_ms": min(times) * 1000, "documents_per_second": rows / min(times)}
+
+
+def run_benchmark(customer_data: CustomerData, collection_name: str, chunk_size: int, batch_size: int,
+                  repeats: int) -> dict:
+    column_types = DataIngestion._schema_column_types()
+    collection = customer_data.get_collection(collection_name)
+
+    def list_find() -> int:
+        # What export_collection_as_dataframe does: a dict per document, then one DataFrame of them
+        return len(pd.DataFrame(list(collection.find({}, batch_size=batch_size))))
+
+    def typed_chunks(raw_batches: bool) -> int:
+        chunks = customer_data.iter_collection_as_typed_chunks(
+            collection_name=collection_name, column_types=column_types, chunk_size=chunk_size,
+            batch_size=batch_size, raw_batches=raw_batches)
+        return sum(len(chunk) for chunk in chunks)
+
+    return {
+        "raw_batch_decoder": "pymongoarrow" if RawBatchDecoder.is_available(column_types) else "documents",
+        "list_find": measure(list_find, repeats),
+        "document_chunks": measure(lambda: typed_chunks(raw_batches=False), repeats),
+        "raw_batch_chunks": measure(lambda: typed_chunks(raw_batches=True), repeats),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare MongoDB export throughput of list(find()), typed "
+                                                 "document chunks and raw BSON batch decoding")
+    parser.add_argument("--collection-name", default=DATA_INGESTION_COLLECTION_NAME)
+    parser.add_argument("--chunk-size", type=int, default=DATA_INGESTION_EXPORT_CHUNK_SIZE)
+    parser.add_argument("--batch-size", type=int, default=DATA_INGESTION_EXPORT_BATCH_SIZE)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    report = run_benchmark(CustomerData(), args.collection_name, args.chunk_size, args.batch_size, args.repeats)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import pickle
+import tempfile
+import time
+import tracemalloc
+
+import dill
+import numpy as np
+import pandas as pd
+
+from src.constants import LOAD_TEST_DATA_FILE_PATH
+from src.entity.compiled_estimator import CompiledModel
+from src.entity.model_artifact import read_model_artifact, write_model_artifact
+
+
+def measure(load, dataframe: pd.DataFrame, repeats: int) -> dict:
+    """
+    Best-of-repeats wall time of load() and of load() plus the first prediction on the sample rows,
+    and the peak Python heap allocated while loading.
+    """
+    load_times, first_predict_times, peaks = [], [], []
+    for _ in range(repeats):
+        tracemalloc.start()
+        start = time.perf_counter()
+        model = load()
+        loaded = time.perf_counter()
+        model.predict(dataframe)
+        first_predict_times.append(time.perf_counter() - start)
+        load_times.append(loaded - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {"load_ms": min(load_times) * 1000, "load_and_first_predict_ms": min(first_predict_times) * 1000,
+            "peak_heap_mb": min(peaks) / 2 ** 20}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare model load time of the pickle and the compiled artifact format")
+    parser.add_argument("--model-file-path", help="Pickled MyModel; a model is fitted on the data file when omitted")
+    parser.add_argument("--data-file-path", default=LOAD_TEST_DATA_FILE_PATH)
+    parser.add_argument("--n-estimators", type=int, help="Number of trees of the fitted model")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    dataframe = pd.read_csv(args.data_file_path)
+    dataframe["TotalCharges"] = pd.to_numeric(dataframe["TotalCharges"], errors="coerce")
+    sample = dataframe.sample(n=100, random_state=0)
+
+    with tempfile.TemporaryDirectory() as benchmark_dir:
+        model_file_path = args.model_file_path
+        if model_file_path is None:
+            from src.pipline.load_test_pipeline import fit_model
+
+            model_file_path = os.path.join(benchmark_dir, "model.pkl")
+            with open(model_file_path, "wb") as model_file:
+                dill.dump(fit_model(dataframe, n_estimators=args.n_estimators), model_file)
+        artifact_file_path = os.path.join(benchmark_dir, "model.model")
+        with open(model_file_path, "rb") as model_file:
+            model = pickle.load(model_file)
+        write_model_artifact(artifact_file_path, CompiledModel.from_model(model))
+        if not np.array_equal(read_model_artifact(artifact_file_path).predict(sample), model.predict(sample)):
+            raise SystemExit("Compiled artifact predictions differ from the pickled model")
+
+        def load_pickle():
+            # What the S3 path did: read the whole body into bytes, then unpickle
+            with open(model_file_path, "rb") as model_file:
+                return pickle.loads(model_file.read())
+
+        report = {
+            "n_estimators": len(model.trained_model_object.estimators_),
+            "pickle_bytes": os.path.getsize(model_file_path),
+            "artifact_bytes": os.path.getsize(artifact_file_path),
+            "pickle": measure(load_pickle, sample, args.repeats),
+            "compiled_mmap": measure(lambda: read_model_artifact(artifact_file_path), sample, args.repeats),
+        }
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,33 @@
+import argparse
+import json
+from dataclasses import asdict, fields
+
+from dotenv import load_dotenv
+from src.entity.config_entity import LoadTestConfig
+from src.pipline.load_test_pipeline import LOAD_TEST_ROUTES, LoadTestPipeline
+
+if __name__ == "__main__":
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Load test the churn prediction API")
+    parser.add_argument("--route", choices=sorted(LOAD_TEST_ROUTES))
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--requests", type=int)
+    parser.add_argument("--warmup-requests", type=int)
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--random-state", type=int)
+    parser.add_argument("--data-file-path")
+    parser.add_argument("--storage-dir")
+    parser.add_argument("--model-file-path")
+    parser.add_argument("--base-url")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = vars(parser.parse_args())
+
+    overrides = {field.name: args[field.name] for field in fields(LoadTestConfig) if args.get(field.name) is not None}
+    load_test_pipeline = LoadTestPipeline(load_test_config=LoadTestConfig(**overrides))
+    report = json.dumps(asdict(load_test_pipeline.run_pipeline()), indent=2)
+
+    print(report)
+    if args["output"]:
+        with open(args["output"], "w") as report_file:
+            report_file.write(report + "\n")
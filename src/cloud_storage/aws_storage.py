@@ -1,14 +1,19 @@
-import boto3
 from src.configuration.aws_connection import S3Client
+from dataclasses import replace
 from io import StringIO
-from typing import Union,List
+from typing import TYPE_CHECKING, Union,List,Optional,Tuple
 import os,sys
 from src.logger import logging
-from mypy_boto3_s3.service_resource import Bucket
 from src.exception import CustomException
-from botocore.exceptions import ClientError
+from src.cloud_storage.object_cache import CachedObject, S3ObjectCache
+from src.constants import S3_CACHE_OFFLINE_FALLBACK
+from src.entity.model_artifact import load_model_file
+from botocore.exceptions import BotoCoreError, ClientError
 from pandas import DataFrame,read_csv
-import pickle
+
+if TYPE_CHECKING:
+    # Type stubs only; importing them at runtime costs as much as boto3 itself
+    from mypy_boto3_s3.service_resource import Bucket
 
 
 class SimpleStorageService:
@@ -17,14 +22,18 @@ class SimpleStorageService:
     data uploads, and data retrieval in S3 buckets.
     """
 
-    def __init__(self):
+    def __init__(self, object_cache: Optional[S3ObjectCache] = None):
         """
         Initializes the SimpleStorageService instance with S3 resource and client
         from the S3Client class.
+
+        Args:
+            object_cache (S3ObjectCache): Local cache models are downloaded to, the default cache when omitted.
         """
         s3_client = S3Client()
         self.s3_resource = s3_client.s3_resource
         self.s3_client = s3_client.s3_client
+        self.object_cache = object_cache if object_cache is not None else S3ObjectCache()
 
     def s3_key_path_available(self, bucket_name, s3_key) -> bool:
         """
@@ -71,7 +80,7 @@ class SimpleStorageService:
         except Exception as e:
             raise CustomException(e, sys) from e
 
-    def get_bucket(self, bucket_name: str) -> Bucket:
+    def get_bucket(self, bucket_name: str) -> "Bucket":
         """
         Retrieves the S3 bucket object based on the provided bucket name.
 
@@ -113,7 +122,7 @@ class SimpleStorageService:
 
     def load_model(self, model_name: str, bucket_name: str, model_dir: str = None) -> object:
         """
-        Loads a serialized model from the specified S3 bucket.
+        Loads a serialized model from the specified S3 bucket, through the local object cache.
 
         Args:
             model_name (str): Name of the model file in the bucket.
@@ -123,13 +132,97 @@ class SimpleStorageService:
         Returns:
             object: The deserialized model object.
         """
+        return self.load_model_with_version(model_name, bucket_name, model_dir)[0]
+
+    def fetch_object(self, key: str, bucket_name: str) -> CachedObject:
+        """
+        Returns a verified local copy of an S3 object. A HEAD request tells whether the cached copy
+        (keyed by bucket, key and ETag) is current; the body is only downloaded when it is not.
+
+        Args:
+            key (str): Key of the object in the bucket.
+            bucket_name (str): Name of the S3 bucket.
+
+        Returns:
+            CachedObject: The cached copy and the version tag it was downloaded as.
+        """
+        head = self.s3_client.head_object(Bucket=bucket_name, Key=key)
+        cached = self.object_cache.get(bucket_name, key, head["ETag"])
+        if cached is not None:
+            logging.info(f"Using cached copy of s3://{bucket_name}/{key} ({cached.etag})")
+            # The same content may have been uploaded again under a new version id
+            return replace(cached, version=head.get("VersionId") or cached.etag)
+        response = self.s3_client.get_object(Bucket=bucket_name, Key=key)
+        etag = response["ETag"].strip('"')
+        # With SSE-KMS the ETag is not the MD5 of the content
+        return self.object_cache.put_stream(bucket_name, key, etag=etag,
+                                            version=response.get("VersionId") or etag,
+                                            stream=response["Body"],
+                                            verify_md5=response.get("ServerSideEncryption") != "aws:kms")
+
+    @staticmethod
+    def _is_unavailable(error: Exception) -> bool:
+        # Network, credential and server errors; a missing object is an answer, not an outage
+        if isinstance(error, ClientError):
+            return error.response["Error"]["Code"] not in ("404", "NoSuchKey")
+        return isinstance(error, BotoCoreError)
+
+    def get_object_version(self, model_name: str, bucket_name: str, model_dir: str = None) -> Optional[str]:
+        """
+        Returns the version tag of an object without downloading its content.
+
+        Args:
+            model_name (str): Name of the model file in the bucket.
+            bucket_name (str): Name of the S3 bucket.
+            model_dir (str): Directory path within the bucket.
+
+        Returns:
+            Optional[str]: The S3 version id if bucket versioning is enabled, otherwise the ETag,
+            or None when the object does not exist.
+        """
+        try:
+            model_file = model_dir + "/" + model_name if model_dir else model_name
+            response = self.s3_client.head_object(Bucket=bucket_name, Key=model_file)
+            return response.get("VersionId") or response["ETag"].strip('"')
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                return None
+            raise CustomException(e, sys) from e
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def load_model_with_version(self, model_name: str, bucket_name: str, model_dir: str = None) -> Tuple[object, str]:
+        """
+        Loads a serialized model together with the version tag of the object it was read from.
+        The body is only downloaded when the local object cache has no intact copy of the current
+        ETag, and the tag comes from the same response as the body, so they always belong together.
+        A compiled model artifact is memory-mapped from the cache, a pickle is unpickled.
+        When S3 cannot be reached, the last version loaded successfully is served from the cache.
+
+        Args:
+            model_name (str): Name of the model file in the bucket.
+            bucket_name (str): Name of the S3 bucket.
+            model_dir (str): Directory path within the bucket.
+
+        Returns:
+            Tuple[object, str]: The deserialized model object and its version tag.
+        """
         try:
             model_file = model_dir + "/" + model_name if model_dir else model_name
-            file_object = self.get_file_object(model_file, bucket_name)
-            model_obj = self.read_object(file_object, decode=False)
-            model = pickle.loads(model_obj)
-            logging.info("Production model loaded from S3 bucket.")
-            return model
+            try:
+                cached = self.fetch_object(model_file, bucket_name)
+            except Exception as e:
+                if not (S3_CACHE_OFFLINE_FALLBACK and self._is_unavailable(e)):
+                    raise
+                cached = self.object_cache.get_last_good(bucket_name, model_file)
+                if cached is None:
+                    raise
+                logging.warning(f"S3 is unavailable ({e}), using last good cached version {cached.version} "
+                                f"of {model_file}")
+            model = load_model_file(cached.path)
+            self.object_cache.mark_good(cached)
+            logging.info(f"Production model version {cached.version} loaded from S3 bucket.")
+            return model, cached.version
         except Exception as e:
             raise CustomException(e, sys) from e
 
@@ -176,6 +269,20 @@ class SimpleStorageService:
         except Exception as e:
             raise CustomException(e, sys) from e
 
+    def delete_file(self, key: str, bucket_name: str) -> None:
+        """
+        Deletes an object from the specified S3 bucket; deleting a missing object is not an error.
+
+        Args:
+            key (str): Target file path in the bucket.
+            bucket_name (str): Name of the S3 bucket.
+        """
+        try:
+            self.s3_client.delete_object(Bucket=bucket_name, Key=key)
+            logging.info(f"Deleted {key} from {bucket_name}")
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
     def upload_df_as_csv(self, data_frame: DataFrame, local_filename: str, bucket_filename: str, bucket_name: str) -> None:
         """
         Uploads a DataFrame as a CSV file to the specified S3 bucket.
@@ -0,0 +1,89 @@
+import hashlib
+import mmap
+import os
+import pickle
+import shutil
+import sys
+from typing import Optional, Tuple
+
+from src.entity.model_artifact import is_model_artifact, model_from_buffer
+from src.exception import CustomException
+from src.logger import logging
+
+
+class LocalStorageService:
+    """
+    Local stand-in for SimpleStorageService that keeps objects as files under
+    `root_dir/<bucket_name>/<key>`. It implements the model methods used by Proj1Estimator,
+    with the MD5 of the content as version tag (what S3 reports as ETag for single-part uploads),
+    so serving can be run and load-tested without an AWS account.
+    """
+
+    def __init__(self, root_dir: str):
+        """
+        :param root_dir: Directory holding one sub-directory per bucket
+        """
+        self.root_dir = root_dir
+
+    def _object_path(self, bucket_name: str, key: str) -> str:
+        return os.path.join(self.root_dir, bucket_name, key)
+
+    @staticmethod
+    def _model_key(model_name: str, model_dir: str = None) -> str:
+        return model_dir + "/" + model_name if model_dir else model_name
+
+    def s3_key_path_available(self, bucket_name, s3_key) -> bool:
+        try:
+            prefix_path = self._object_path(bucket_name, s3_key)
+            directory, prefix = os.path.split(prefix_path)
+            return os.path.isdir(directory) and any(name.startswith(prefix) for name in os.listdir(directory))
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def load_model(self, model_name: str, bucket_name: str, model_dir: str = None) -> object:
+        return self.load_model_with_version(model_name, bucket_name, model_dir)[0]
+
+    def get_object_version(self, model_name: str, bucket_name: str, model_dir: str = None) -> Optional[str]:
+        try:
+            object_path = self._object_path(bucket_name, self._model_key(model_name, model_dir))
+            if not os.path.exists(object_path):
+                return None
+            with open(object_path, "rb") as object_file:
+                return hashlib.md5(object_file.read()).hexdigest()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def load_model_with_version(self, model_name: str, bucket_name: str, model_dir: str = None) -> Tuple[object, str]:
+        try:
+            object_path = self._object_path(bucket_name, self._model_key(model_name, model_dir))
+            # Version and model come from the same mapping, so they match even if the object is replaced
+            with open(object_path, "rb") as object_file:
+                content = mmap.mmap(object_file.fileno(), 0, access=mmap.ACCESS_READ)
+            version = hashlib.md5(content).hexdigest()
+            # Compiled model artifacts are used in place from the stored file
+            model = model_from_buffer(content) if is_model_artifact(content) else pickle.loads(content)
+            logging.info(f"Model version {version} loaded from local storage {object_path}")
+            return model, version
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def upload_file(self, from_filename: str, to_filename: str, bucket_name: str, remove: bool = True):
+        try:
+            object_path = self._object_path(bucket_name, to_filename)
+            os.makedirs(os.path.dirname(object_path) or ".", exist_ok=True)
+            # Copy next to the target and rename, so readers never see a partially written object
+            temporary_path = object_path + ".tmp"
+            shutil.copyfile(from_filename, temporary_path)
+            os.replace(temporary_path, object_path)
+            if remove:
+                os.remove(from_filename)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def delete_file(self, key: str, bucket_name: str) -> None:
+        try:
+            object_path = self._object_path(bucket_name, key)
+            if os.path.exists(object_path):
+                os.remove(object_path)
+        except Exception as e:
+            raise CustomException(e, sys) from e
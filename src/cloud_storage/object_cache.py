@@ -0,0 +1,226 @@
+import contextlib
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import BinaryIO, Iterable, Optional
+
+from src.constants import S3_CACHE_DIR, S3_CACHE_MAX_BYTES, S3_CACHE_VERIFY_ON_READ
+from src.exception import CustomException
+from src.logger import logging
+
+# Single-part uploads without SSE-KMS have the MD5 of the content as ETag
+_MD5_ETAG = re.compile(r"^[0-9a-f]{32}$")
+_CHUNK_SIZE = 1024 * 1024
+
+
+class ChecksumMismatchError(ValueError):
+    """
+    Raised when downloaded content does not match the checksum S3 reported for it.
+    """
+
+
+@dataclass(frozen=True)
+class CachedObject:
+    bucket_name: str
+    key: str
+    etag: str
+    version: str
+    sha256: str
+    size: int
+    path: str
+
+
+def _key_digest(*parts: str) -> str:
+    return hashlib.sha1("/".join(parts).encode("utf-8")).hexdigest()
+
+
+class S3ObjectCache:
+    """
+    Content-addressed local cache of S3 objects, shared by every process using the same directory.
+
+        <root_dir>/blobs/<sha256>          object content, immutable once written
+        <root_dir>/refs/<bucket/key/etag>  which blob holds an object version
+        <root_dir>/last_good/<bucket/key>  the version last loaded successfully, for offline use
+
+    Downloads are checked against the ETag when it is an MD5 and against the recorded SHA-256 when
+    read back (a corrupt blob is dropped and downloaded again). Every file is written under a
+    temporary name and renamed into place. Blobs are evicted least recently used first once their
+    total size exceeds max_bytes, except the last good version of every object. Evicted blobs stay
+    valid for processes that still have them memory-mapped.
+    """
+
+    def __init__(self, root_dir: str = S3_CACHE_DIR, max_bytes: int = S3_CACHE_MAX_BYTES,
+                 verify_on_read: bool = S3_CACHE_VERIFY_ON_READ):
+        """
+        :param root_dir: Directory of the cache
+        :param max_bytes: Size bound of all cached blobs together
+        :param verify_on_read: Re-hash a cached blob every time it is served
+        """
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self.verify_on_read = verify_on_read
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.root_dir, "blobs", sha256)
+
+    def _ref_path(self, bucket_name: str, key: str, etag: str) -> str:
+        return os.path.join(self.root_dir, "refs", _key_digest(bucket_name, key, etag) + ".json")
+
+    def _last_good_path(self, bucket_name: str, key: str) -> str:
+        return os.path.join(self.root_dir, "last_good", _key_digest(bucket_name, key) + ".json")
+
+    def _write_json(self, path: str, content: dict) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        with os.fdopen(descriptor, "w") as json_file:
+            json.dump(content, json_file)
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[dict]:
+        try:
+            with open(path) as json_file:
+                return json.load(json_file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @staticmethod
+    def _sha256(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as blob_file:
+            for chunk in iter(lambda: blob_file.read(_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _checked(self, record: Optional[dict], record_path: str) -> Optional[CachedObject]:
+        """
+        Returns the cached object of a ref record if its blob is present and intact, dropping it otherwise.
+        """
+        if record is None:
+            return None
+        # The blob location follows from the checksum, so the cache directory can be moved
+        cached = CachedObject(**{**record, "path": self._blob_path(record["sha256"])})
+        try:
+            intact = os.path.getsize(cached.path) == cached.size and (
+                not self.verify_on_read or self._sha256(cached.path) == cached.sha256)
+        except FileNotFoundError:
+            intact = False
+        if not intact:
+            logging.warning(f"Cached copy of s3://{cached.bucket_name}/{cached.key} ({cached.etag}) "
+                            f"is missing or corrupt, dropping it")
+            for path in (cached.path, record_path):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+            return None
+        # Last access time for eviction; atime is often not updated by the file system
+        os.utime(cached.path)
+        return cached
+
+    def get(self, bucket_name: str, key: str, etag: str) -> Optional[CachedObject]:
+        """
+        Returns the cached copy of the object version with the given ETag, or None on a miss.
+        """
+        try:
+            ref_path = self._ref_path(bucket_name, key, etag.strip('"'))
+            return self._checked(self._read_json(ref_path), ref_path)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def put_stream(self, bucket_name: str, key: str, etag: str, version: str, stream: BinaryIO,
+                   verify_md5: bool = True) -> CachedObject:
+        """
+        Streams an object body into the cache, checking it against the ETag when that is an MD5.
+        :param verify_md5: False when the ETag is known not to be the content MD5 (e.g. SSE-KMS)
+        :raises ChecksumMismatchError: the content does not match the ETag; nothing is cached
+        """
+        try:
+            etag = etag.strip('"')
+            blob_dir = os.path.join(self.root_dir, "blobs")
+            os.makedirs(blob_dir, exist_ok=True)
+            sha256, md5, size = hashlib.sha256(), hashlib.md5(), 0
+            descriptor, temporary_path = tempfile.mkstemp(dir=blob_dir, prefix=".tmp-")
+            try:
+                with os.fdopen(descriptor, "wb") as blob_file:
+                    for chunk in iter(lambda: stream.read(_CHUNK_SIZE), b""):
+                        sha256.update(chunk)
+                        md5.update(chunk)
+                        size += len(chunk)
+                        blob_file.write(chunk)
+                if verify_md5 and _MD5_ETAG.match(etag) and md5.hexdigest() != etag:
+                    raise ChecksumMismatchError(f"s3://{bucket_name}/{key}: MD5 {md5.hexdigest()} != ETag {etag}")
+                blob_path = self._blob_path(sha256.hexdigest())
+                # Content addressed: an existing blob already holds exactly these bytes
+                os.replace(temporary_path, blob_path)
+            except Exception:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(temporary_path)
+                raise
+
+            cached = CachedObject(bucket_name=bucket_name, key=key, etag=etag, version=version,
+                                  sha256=sha256.hexdigest(), size=size, path=blob_path)
+            self._write_json(self._ref_path(bucket_name, key, etag), asdict(cached))
+            logging.info(f"Cached s3://{bucket_name}/{key} ({etag}, {size} bytes) as {blob_path}")
+            self.evict(keep=[cached.sha256])
+            return cached
+        except ChecksumMismatchError:
+            raise
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def mark_good(self, cached: CachedObject) -> None:
+        """
+        Records the object version as the last one loaded successfully. The previous last good
+        version loses its eviction protection.
+        """
+        try:
+            self._write_json(self._last_good_path(cached.bucket_name, cached.key), asdict(cached))
+            self.evict()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_last_good(self, bucket_name: str, key: str) -> Optional[CachedObject]:
+        """
+        Returns the cached copy of the last version of the object that was loaded successfully.
+        """
+        try:
+            last_good_path = self._last_good_path(bucket_name, key)
+            return self._checked(self._read_json(last_good_path), last_good_path)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def evict(self, keep: Iterable[str] = ()) -> None:
+        """
+        Removes least recently used blobs until the cache fits max_bytes. Blobs in keep and the last
+        good version of every object are never removed.
+        """
+        try:
+            blob_dir = os.path.join(self.root_dir, "blobs")
+            last_good_dir = os.path.join(self.root_dir, "last_good")
+            protected = set(keep)
+            if os.path.isdir(last_good_dir):
+                for name in os.listdir(last_good_dir):
+                    record = self._read_json(os.path.join(last_good_dir, name))
+                    if record is not None:
+                        protected.add(record["sha256"])
+
+            blobs = []
+            for entry in os.scandir(blob_dir):
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    blobs.append((stat.st_mtime, stat.st_size, entry.name))
+            total = sum(size for _, size, _ in blobs)
+            for _, size, name in sorted(blobs):
+                if total <= self.max_bytes:
+                    break
+                if name in protected:
+                    continue
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(blob_dir, name))
+                total -= size
+                logging.info(f"Evicted cached blob {name} ({size} bytes)")
+        except Exception as e:
+            raise CustomException(e, sys) from e
@@ -1,22 +1,35 @@
+import multiprocessing
 import os
 import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
 
 from pandas import DataFrame
 from sklearn.model_selection import train_test_split
 
+from src.configuration.mongo_db_connection import MongoDBClient
+from src.constants import SCHEMA_FILE_PATH
 from src.entity.config_entity import DataIngestionConfig
 from src.entity.artifact_entity import DataIngestionArtifact
 from src.exception import CustomException
 from src.logger import logging
 from src.data_access.CustomerData import CustomerData
+from src.data_access.feature_store import FeatureStore
+from src.data_access.parallel_export import ParallelExporter
+from src.utils.main_utils import (concatenate_dataframe_files, dataframe_file_format, read_dataframe, read_yaml_file,
+                                  write_dataframe, write_dataframe_chunks)
 
 class DataIngestion:
-    def __init__(self,data_ingestion_config:DataIngestionConfig=DataIngestionConfig()):
+    def __init__(self,data_ingestion_config:Optional[DataIngestionConfig]=None,
+                 mongo_client_factory:Callable=MongoDBClient):
         """
-        :param data_ingestion_config: configuration for data ingestion
+        :param data_ingestion_config: configuration for data ingestion, a fresh one for the current run when omitted
+        :param mongo_client_factory: picklable callable creating the MongoDB client, also called in export workers
         """
         try:
-            self.data_ingestion_config = data_ingestion_config
+            self.data_ingestion_config = data_ingestion_config or DataIngestionConfig()
+            self.mongo_client_factory = mongo_client_factory
         except Exception as e:
             raise CustomException(e,sys)
         
@@ -24,14 +37,19 @@ class DataIngestion:
     def export_data_into_feature_store(self)->DataFrame:
         """
         Method Name :   export_data_into_feature_store
-        Description :   This method exports data from mongodb to csv file
+        Description :   This method exports data from mongodb to the feature store file
         
         Output      :   data is returned as artifact of data ingestion components
         On Failure  :   Write an exception log and then raise an exception
         """
         try:
+            if self.data_ingestion_config.incremental:
+                return self.ingest_into_persistent_feature_store()
+            if self.data_ingestion_config.streaming_export:
+                return self.stream_data_into_feature_store()
+
             logging.info(f"Exporting data from mongodb")
-            my_data = CustomerData()
+            my_data = CustomerData(mongo_client=self.mongo_client_factory())
             dataframe = my_data.export_collection_as_dataframe(collection_name=
                                                                    self.data_ingestion_config.collection_name)
             logging.info(f"Shape of dataframe: {dataframe.shape}")
@@ -39,12 +57,154 @@ class DataIngestion:
             dir_path = os.path.dirname(feature_store_file_path)
             os.makedirs(dir_path,exist_ok=True)
             logging.info(f"Saving exported data into feature store file path: {feature_store_file_path}")
-            dataframe.to_csv(feature_store_file_path,index=False,header=True)
+            write_dataframe(feature_store_file_path, dataframe, compression=self.data_ingestion_config.artifact_compression)
             return dataframe
 
         except Exception as e:
             raise CustomException(e,sys)
 
+    @staticmethod
+    def _schema_column_types() -> dict:
+        schema_config = read_yaml_file(file_path=SCHEMA_FILE_PATH)
+        return {column: dtype for entry in schema_config["columns"] for column, dtype in entry.items()}
+
+    def _get_parallel_exporter(self, customer_data: CustomerData, query: Optional[dict],
+                               file_format: str) -> Optional[ParallelExporter]:
+        """
+        Returns an exporter splitting the documents matching query over worker processes, or None
+        when there are too few of them to be worth starting the workers or this process may not
+        start any (a daemonic process, e.g. a pool worker).
+        """
+        config = self.data_ingestion_config
+        if config.export_workers < 2:
+            return None
+        if multiprocessing.current_process().daemon:
+            logging.info("Daemonic processes cannot start export workers, exporting serially")
+            return None
+        collection = customer_data.get_collection(config.collection_name)
+        count = collection.count_documents(query) if query else collection.estimated_document_count()
+        if count < config.parallel_min_documents:
+            return None
+        return ParallelExporter(max_workers=config.export_workers, chunk_size=config.export_chunk_size,
+                                batch_size=config.export_batch_size, mongo_client_factory=self.mongo_client_factory,
+                                customer_data=customer_data, file_format=file_format,
+                                compression=config.artifact_compression, raw_batches=config.raw_batch_decoding)
+
+    def stream_data_into_feature_store(self) -> DataFrame:
+        """
+        Method Name :   stream_data_into_feature_store
+        Description :   This method streams the schema columns of the mongodb collection into the feature
+                        store file chunk by chunk, typed as in config/schema.yaml, and reads the file back
+                        once. Peak memory is one typed chunk during the export and one typed copy of the data
+                        after it, instead of documents, list and frame of the whole collection at once.
+
+        Output      :   data is returned as artifact of data ingestion components
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            column_types = self._schema_column_types()
+            feature_store_file_path = self.data_ingestion_config.feature_store_file_path
+            dir_path = os.path.dirname(feature_store_file_path)
+            os.makedirs(dir_path, exist_ok=True)
+
+            logging.info(f"Streaming data from mongodb into feature store file path: {feature_store_file_path}")
+            customer_data = CustomerData(mongo_client=self.mongo_client_factory())
+            parallel_exporter = self._get_parallel_exporter(customer_data, query=None,
+                                                            file_format=dataframe_file_format(feature_store_file_path))
+            if parallel_exporter is not None:
+                with tempfile.TemporaryDirectory(prefix=".ranges-", dir=dir_path) as ranges_dir:
+                    exported_ranges = parallel_exporter.export(
+                        collection_name=self.data_ingestion_config.collection_name,
+                        column_types=column_types, output_dir=ranges_dir)
+                    concatenate_dataframe_files([exported.file_path for exported in exported_ranges],
+                                                feature_store_file_path,
+                                                compression=self.data_ingestion_config.artifact_compression)
+                rows = sum(exported.rows for exported in exported_ranges)
+            else:
+                chunks = customer_data.iter_collection_as_typed_chunks(
+                    collection_name=self.data_ingestion_config.collection_name, column_types=column_types,
+                    chunk_size=self.data_ingestion_config.export_chunk_size,
+                    batch_size=self.data_ingestion_config.export_batch_size,
+                    raw_batches=self.data_ingestion_config.raw_batch_decoding)
+                # Written under a temporary name so a failed export never leaves a truncated feature store
+                rows = write_dataframe_chunks(feature_store_file_path, chunks, column_types,
+                                              compression=self.data_ingestion_config.artifact_compression)
+            logging.info(f"Exported {rows} rows into feature store")
+
+            dataframe = read_dataframe(feature_store_file_path).astype(
+                {column: "category" for column, dtype in column_types.items() if dtype == "category"})
+            logging.info(f"Shape of dataframe: {dataframe.shape}")
+            return dataframe
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _needs_full_resync(self, feature_store: FeatureStore, watermark: object) -> bool:
+        config = self.data_ingestion_config
+        if watermark is None or config.force_full_resync:
+            return True
+        if config.full_resync_days <= 0:
+            return False
+        last_full_sync = feature_store.read_last_full_sync(config.watermark_field)
+        return last_full_sync is None or \
+            datetime.now(timezone.utc) - last_full_sync >= timedelta(days=config.full_resync_days)
+
+    def ingest_into_persistent_feature_store(self) -> DataFrame:
+        """
+        Method Name :   ingest_into_persistent_feature_store
+        Description :   This method pulls only the documents updated since the high-water mark of the
+                        persistent feature store, in ascending order of the watermark field (an update
+                        timestamp), appends them as a new partition and reads the store back with one row
+                        per customer. The first run, a forced one and one every full_resync_days rebuild
+                        the store from the whole collection instead, which drops deleted documents.
+
+        Output      :   data is returned as artifact of data ingestion components
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            config = self.data_ingestion_config
+            feature_store = FeatureStore(root_dir=config.persistent_feature_store_dir,
+                                         column_types=self._schema_column_types(), key_column=config.key_column,
+                                         file_format=config.artifact_format, compression=config.artifact_compression)
+            watermark = feature_store.read_watermark(config.watermark_field)
+            full_resync = self._needs_full_resync(feature_store, watermark)
+            query = None
+            if not full_resync:
+                # Documents committed late or by writers with a lagging clock may carry an update time
+                # just before the mark, so a window before it is pulled again and deduplicated on read
+                since = watermark
+                if isinstance(watermark, datetime):
+                    since = watermark - timedelta(seconds=config.watermark_lookback_seconds)
+                elif isinstance(watermark, (int, float)):
+                    # Epoch seconds
+                    since = watermark - config.watermark_lookback_seconds
+                query = {config.watermark_field: {"$gte": since}}
+            scope = "all documents" if full_resync else f"documents matching {query}"
+            logging.info(f"Ingesting {scope} into feature store {config.persistent_feature_store_dir}")
+
+            customer_data = CustomerData(mongo_client=self.mongo_client_factory())
+            chunks = customer_data.iter_collection_as_typed_chunks(
+                collection_name=config.collection_name, column_types=feature_store.column_types,
+                chunk_size=config.export_chunk_size, batch_size=config.export_batch_size, query=query,
+                sort_field=config.watermark_field, raw_batches=config.raw_batch_decoding)
+            if full_resync:
+                feature_store.resync(chunks, watermark_field=config.watermark_field)
+            else:
+                feature_store.append(chunks, watermark_field=config.watermark_field)
+
+            dataframe = feature_store.read()
+            if len(feature_store.list_partitions()) > config.max_partitions:
+                feature_store.compact(dataframe)
+            documents = customer_data.get_collection(config.collection_name).estimated_document_count()
+            if not full_resync and documents != len(dataframe):
+                logging.warning(f"Feature store holds {len(dataframe)} customers but the collection has {documents} "
+                                f"documents; set DATA_INGESTION_FORCE_FULL_RESYNC=1 to rebuild it")
+            logging.info(f"Shape of dataframe: {dataframe.shape}")
+            return dataframe
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
     def split_data_as_train_test(self,dataframe: DataFrame) ->None:
         """
         Method Name :   split_data_as_train_test
@@ -65,8 +225,10 @@ class DataIngestion:
             os.makedirs(dir_path,exist_ok=True)
             
             logging.info(f"Exporting train and test file path.")
-            train_set.to_csv(self.data_ingestion_config.training_file_path,index=False,header=True)
-            test_set.to_csv(self.data_ingestion_config.testing_file_path,index=False,header=True)
+            write_dataframe(self.data_ingestion_config.training_file_path, train_set,
+                            compression=self.data_ingestion_config.artifact_compression)
+            write_dataframe(self.data_ingestion_config.testing_file_path, test_set,
+                            compression=self.data_ingestion_config.artifact_compression)
 
             logging.info(f"Exported train and test file path.")
         except Exception as e:
@@ -11,7 +11,7 @@ from src.entity.config_entity import DataTransformationConfig
 from src.entity.artifact_entity import DataTransformationArtifact, DataIngestionArtifact, DataValidationArtifact
 from src.exception import CustomException
 from src.logger import logging
-from src.utils.main_utils import save_object, save_numpy_array_data, read_yaml_file
+from src.utils.main_utils import save_object, save_numpy_array_data, read_dataframe, read_yaml_file
 
 
 class DataTransformation:
@@ -27,9 +27,9 @@ class DataTransformation:
             raise CustomException(e, sys)
 
     @staticmethod
-    def read_data(file_path) -> pd.DataFrame:
+    def read_data(file_path, columns=None) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_dataframe(file_path, columns=columns)
         except Exception as e:
             raise CustomException(e, sys)
 
@@ -99,15 +99,16 @@ class DataTransformation:
             if not self.data_validation_artifact.validation_status:
                 raise Exception(self.data_validation_artifact.message)
 
-            # Load train and test data
-            train_df = self.read_data(file_path=self.data_ingestion_artifact.trained_file_path)
-            test_df = self.read_data(file_path=self.data_ingestion_artifact.test_file_path)
+            # Load train and test data, only the model features and the target
+            columns = self._schema_config['numerical_features'] + self._schema_config['categorical_features'] + [TARGET_COLUMN]
+            train_df = self.read_data(file_path=self.data_ingestion_artifact.trained_file_path, columns=columns)
+            test_df = self.read_data(file_path=self.data_ingestion_artifact.test_file_path, columns=columns)
             logging.info("Train-Test data loaded")
 
-            input_feature_train_df = train_df.drop(columns=[TARGET_COLUMN], axis=1)
+            input_feature_train_df = train_df.drop(columns=[TARGET_COLUMN])
             target_feature_train_df = train_df[TARGET_COLUMN]
 
-            input_feature_test_df = test_df.drop(columns=[TARGET_COLUMN], axis=1)
+            input_feature_test_df = test_df.drop(columns=[TARGET_COLUMN])
             target_feature_test_df = test_df[TARGET_COLUMN]
             logging.info("Input and Target cols defined for both train and test df.")
 
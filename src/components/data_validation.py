@@ -8,7 +8,7 @@ from pandas import DataFrame
 
 from src.exception import CustomException
 from src.logger import logging
-from src.utils.main_utils import read_yaml_file
+from src.utils.main_utils import read_dataframe, read_yaml_file
 from src.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
 from src.entity.config_entity import DataValidationConfig
 from src.constants import SCHEMA_FILE_PATH
@@ -76,7 +76,7 @@ class DataValidation:
     @staticmethod
     def read_data(file_path) -> DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_dataframe(file_path)
         except Exception as e:
             raise CustomException(e, sys)
         
@@ -2,9 +2,9 @@ from src.entity.config_entity import ModelEvaluationConfig
 from src.entity.artifact_entity import ModelTrainerArtifact, DataIngestionArtifact, ModelEvaluationArtifact, DataTransformationArtifact
 from sklearn.metrics import accuracy_score
 from src.exception import CustomException as MyException
-from src.constants import TARGET_COLUMN
+from src.constants import SCHEMA_FILE_PATH, TARGET_COLUMN
 from src.logger import logging
-from src.utils.main_utils import load_object
+from src.utils.main_utils import load_object, read_dataframe, read_yaml_file
 import sys
 import pandas as pd
 from typing import Optional
@@ -80,7 +80,11 @@ class ModelEvaluation:
         On Failure  :   Write an exception log and then raise an exception
         """
         try:
-            test_df = pd.read_csv(self.data_ingestion_artifact.test_file_path)
+            # Only the model features and the target are decoded from the test file
+            schema_config = read_yaml_file(file_path=SCHEMA_FILE_PATH)
+            test_df = read_dataframe(self.data_ingestion_artifact.test_file_path,
+                                     columns=schema_config["numerical_features"] + schema_config["categorical_features"]
+                                     + [TARGET_COLUMN])
             x, y = test_df.drop(TARGET_COLUMN, axis=1), test_df[TARGET_COLUMN]
 
             logging.info("Test data loaded and now transforming it for prediction...")
@@ -1,4 +1,3 @@
-import boto3
 import os
 from src.constants import AWS_SECRET_ACCESS_KEY_ENV_KEY, AWS_ACCESS_KEY_ID_ENV_KEY, REGION_NAME
 
@@ -14,6 +13,9 @@ class S3Client:
         """
 
         if S3Client.s3_resource==None or S3Client.s3_client==None:
+            # Imported on first use so that importing the serving app does not pay for boto3
+            import boto3
+
             __access_key_id = os.getenv(AWS_ACCESS_KEY_ID_ENV_KEY, )
             __secret_access_key = os.getenv(AWS_SECRET_ACCESS_KEY_ENV_KEY, )
             if __access_key_id is None:
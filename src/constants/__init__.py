@@ -10,6 +10,8 @@ PIPELINE_NAME: str = ""
 ARTIFACT_DIR: str = "artifact"
 
 MODEL_FILE_NAME = "model.pkl"
+# The compiled model artifact is pushed next to the pickle, e.g. model.pkl -> model.compiled
+COMPILED_MODEL_FILE_EXTENSION = ".compiled"
 
 TARGET_COLUMN = "Churn"
 CURRENT_YEAR = date.today().year
@@ -27,6 +29,15 @@ AWS_SECRET_ACCESS_KEY_ENV_KEY = "AWS_SECRET_ACCESS_KEY"
 REGION_NAME = "us-east-1"
 
 
+"""
+S3 object cache related constants start with S3_CACHE VAR NAME
+"""
+S3_CACHE_DIR: str = os.path.join("artifact", "s3_cache")
+S3_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024
+S3_CACHE_VERIFY_ON_READ: bool = True
+# Serve the last successfully loaded model version from the cache when S3 cannot be reached
+S3_CACHE_OFFLINE_FALLBACK: bool = True
+
 """
 Data Ingestion related constant start with DATA_INGESTION VAR NAME
 """
@@ -35,6 +46,33 @@ DATA_INGESTION_DIR_NAME: str = "data_ingestion"
 DATA_INGESTION_FEATURE_STORE_DIR: str = "feature_store"
 DATA_INGESTION_INGESTED_DIR: str = "ingested"
 DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO: float = 0.25
+# Format of the feature store, train and test files: "parquet", "feather" or "csv"
+DATA_INGESTION_ARTIFACT_FORMAT: str = "parquet"
+DATA_INGESTION_ARTIFACT_COMPRESSION: str = "zstd"
+# Stream the collection into the feature store chunk by chunk instead of loading it whole
+DATA_INGESTION_STREAMING_EXPORT: bool = True
+DATA_INGESTION_EXPORT_CHUNK_SIZE: int = 10_000
+# Documents per cursor round trip; Telco documents are ~0.5 KB, well under the 16 MB reply limit
+DATA_INGESTION_EXPORT_BATCH_SIZE: int = 5_000
+# Decode raw BSON batches column by column instead of into a dict per document; needs pymongoarrow
+DATA_INGESTION_RAW_BATCH_DECODING: bool = True
+# Worker processes exporting _id ranges in parallel, for at least DATA_INGESTION_PARALLEL_MIN_DOCUMENTS documents
+DATA_INGESTION_EXPORT_WORKERS: int = os.cpu_count() or 1
+DATA_INGESTION_PARALLEL_MIN_DOCUMENTS: int = 200_000
+# Opt-in: only pull documents changed since the previous run into a feature store kept across runs
+DATA_INGESTION_INCREMENTAL: bool = False
+DATA_INGESTION_PERSISTENT_FEATURE_STORE_DIR: str = os.path.join(ARTIFACT_DIR, "feature_store")
+# Update timestamp the writers set on every insert and update; "_id" misses updates and is not monotonic
+DATA_INGESTION_WATERMARK_FIELD: str = "updated_at"
+# Documents are pulled again from this long before the watermark, for late commits and clock skew of writers
+DATA_INGESTION_WATERMARK_LOOKBACK_SECONDS: int = 300
+# The store is rebuilt from the whole collection this often, dropping deleted documents; 0 disables it
+DATA_INGESTION_FULL_RESYNC_DAYS: int = 7
+# Rebuild the store from the whole collection on the next run
+DATA_INGESTION_FORCE_FULL_RESYNC: bool = os.getenv("DATA_INGESTION_FORCE_FULL_RESYNC", "0") == "1"
+DATA_INGESTION_KEY_COLUMN: str = "customerID"
+# Partitions are merged into one deduplicated partition beyond this count
+DATA_INGESTION_MAX_PARTITIONS: int = 30
 
 """
 Data Validation realted contant start with DATA_VALIDATION VAR NAME
@@ -71,7 +109,78 @@ MODEL Evaluation related constants
 MODEL_EVALUATION_CHANGED_THRESHOLD_SCORE: float = 0.02
 MODEL_BUCKET_NAME = "my-model-mlops-project-abhi"
 MODEL_PUSHER_S3_KEY = "model-registry"
+# "compiled": push the mmap-friendly compiled model artifact under its own key next to the pickle
+# (only the pickle if the model cannot be compiled); "pickle": push the dill-serialized MyModel only
+MODEL_PUSHER_ARTIFACT_FORMAT: str = "compiled"
+
+"""
+Batch scoring related constants start with BATCH_SCORING VAR NAME
+"""
+BATCH_SCORING_COLLECTION_NAME: str = "Telco_Customer_Churn"
+BATCH_SCORING_CHUNK_SIZE: int = 5_000
+BATCH_SCORING_MAX_WORKERS: int = 4
+BATCH_SCORING_PREDICTION_FIELD: str = "churn_prediction"
+BATCH_SCORING_SCORED_AT_FIELD: str = "scored_at"
+
+"""
+Model serving related constants start with MODEL_CACHE VAR NAME
+"""
+MODEL_CACHE_REFRESH_INTERVAL_SECONDS: int = 60
+MODEL_CACHE_COMPILE_ENABLED: bool = True
+MODEL_CACHE_WARM_UP_RETRY_SECONDS: int = 10
+# Host-wide directory of the compiled model segments shared by serving workers (tmpfs when available)
+MODEL_CACHE_SHARED_MEMORY_DIR: str = os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else "artifact",
+                                                  "telco_churn_model")
+
+"""
+Online prediction related constants start with PREDICTION VAR NAME
+"""
+PREDICTION_COALESCER_ENABLED: bool = True
+PREDICTION_COALESCER_WINDOW_MS: float = 5
+PREDICTION_COALESCER_MAX_BATCH_SIZE: int = 64
+INFERENCE_POOL_MAX_WORKERS: int = 4
+INFERENCE_POOL_MAX_QUEUE_DEPTH: int = 64
+PREDICTION_CACHE_ENABLED: bool = True
+PREDICTION_CACHE_MAX_SIZE: int = 100_000
+PREDICTION_CACHE_TTL_SECONDS: int = 3600
+PREDICTION_CSV_CHUNK_ROWS: int = 10_000
+PREDICTION_RANK_DEFAULT_K: int = 100
+
+"""
+Shadow model related constants start with SHADOW VAR NAME
+"""
+# Score a challenger model on a sample of live requests next to production
+SHADOW_ENABLED: bool = os.getenv("SHADOW_ENABLED", "0") == "1"
+SHADOW_MODEL_FILE_PATH: str = "staging/" + MODEL_FILE_NAME
+SHADOW_SAMPLE_RATE: float = 0.1
+SHADOW_MAX_WORKERS: int = 1
+SHADOW_MAX_QUEUE_DEPTH: int = 32
+# Number of most recent sampled requests the latency percentiles are computed over
+SHADOW_LATENCY_WINDOW: int = 1000
+SHADOW_RETRY_SECONDS: int = 60
+
+"""
+Background training job related constants start with TRAINING_JOB VAR NAME
+"""
+TRAINING_JOB_HISTORY_SIZE: int = 20
+TRAINING_JOB_NICENESS: int = 10
+# Host-wide lock and job status files shared by all serving workers
+TRAINING_JOB_STATE_DIR: str = os.path.join(ARTIFACT_DIR, "training_jobs")
+
+"""
+Load testing related constants start with LOAD_TEST VAR NAME
+"""
+LOAD_TEST_DATA_FILE_PATH: str = os.path.join("notebook", "Telco-Customer-Churn.csv")
+LOAD_TEST_STORAGE_DIR: str = os.path.join("artifact", "load_test_storage")
+LOAD_TEST_ROUTE: str = "predict"
+LOAD_TEST_CONCURRENCY: int = 16
+LOAD_TEST_REQUESTS: int = 2000
+LOAD_TEST_WARMUP_REQUESTS: int = 50
+LOAD_TEST_BATCH_SIZE: int = 100
+LOAD_TEST_RANDOM_STATE: int = 42
 
 
 APP_HOST = "0.0.0.0"
-APP_PORT = 5000
\ No newline at end of file
+APP_PORT = 5000
+# Number of uvicorn worker processes; above 1 the workers share the model through MODEL_CACHE_SHARED_MEMORY_DIR
+APP_WORKERS: int = int(os.getenv("APP_WORKERS", "1"))
\ No newline at end of file
@@ -1,26 +1,42 @@
 import sys
 import pandas as pd
 import numpy as np
-from typing import Optional
+from typing import Dict, Iterator, List, Optional
 
 from src.configuration.mongo_db_connection import MongoDBClient
 from src.constants import DATABASE_NAME
+from src.data_access.raw_batch_decoder import RawBatchDecoder
 from src.exception import CustomException
+from src.logger import logging
 
 class CustomerData:
     """
     A class to export MongoDB records as a pandas DataFrame.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, mongo_client: Optional[MongoDBClient] = None) -> None:
         """
         Initializes the MongoDB client connection.
+
+        Parameters:
+        ----------
+        mongo_client : Optional[MongoDBClient]
+            An existing client (or any object exposing `client` and `database`), e.g. backed by
+            mongomock in tests. A new MongoDBClient is created when omitted.
         """
         try:
-            self.mongo_client = MongoDBClient(database_name=DATABASE_NAME)
+            self.mongo_client = mongo_client if mongo_client is not None else MongoDBClient(database_name=DATABASE_NAME)
         except Exception as e:
             raise CustomException(e, sys)
 
+    def get_collection(self, collection_name: str, database_name: Optional[str] = None):
+        """
+        Returns the collection from the default or the specified database.
+        """
+        if database_name is None:
+            return self.mongo_client.database[collection_name]
+        return self.mongo_client.client[database_name][collection_name]
+
     def export_collection_as_dataframe(self, collection_name: str, database_name: Optional[str] = None) -> pd.DataFrame:
         """
         Exports an entire MongoDB collection as a pandas DataFrame.
@@ -39,19 +55,221 @@ class CustomerData:
         """
         try:
             # Access specified collection from the default or specified database
-            if database_name is None:
-                collection = self.mongo_client.database[collection_name]
-            else:
-                collection = self.mongo_client[database_name][collection_name]
+            collection = self.get_collection(collection_name, database_name)
 
             # Convert collection data to DataFrame and preprocess
             print("Fetching data from mongoDB")
             df = pd.DataFrame(list(collection.find()))
             print(f"Data fecthed with len: {len(df)}")
             if "_id" in df.columns.to_list():
-                df = df.drop(columns=["_id"], axis=1)
+                df = df.drop(columns=["_id"])
             df.replace({"na":np.nan},inplace=True)
             return df
 
         except Exception as e:
-            raise CustomException(e, sys)
\ No newline at end of file
+            raise CustomException(e, sys)
+
+    def iter_collection_chunks(self, collection_name: str, chunk_size: int, columns: Optional[List[str]] = None,
+                               database_name: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        """
+        Iterates a MongoDB collection through one server-side cursor, yielding DataFrames of at most
+        chunk_size documents. Only one chunk is held in memory at a time.
+
+        Parameters:
+        ----------
+        collection_name : str
+            The name of the MongoDB collection to read.
+        chunk_size : int
+            Number of documents per yielded DataFrame (also used as the cursor batch size).
+        columns : Optional[List[str]]
+            Fields to fetch; '_id' is always included. All fields are fetched when omitted.
+        database_name : Optional[str]
+            Name of the database (optional). Defaults to DATABASE_NAME.
+
+        Yields:
+        -------
+        pd.DataFrame
+            Chunk of the collection, keeping '_id' and with 'na' values replaced with NaN.
+        """
+        try:
+            collection = self.get_collection(collection_name, database_name)
+            projection = {column: 1 for column in columns} if columns else None
+            cursor = collection.find({}, projection, batch_size=chunk_size)
+            try:
+                documents = []
+                for document in cursor:
+                    documents.append(document)
+                    if len(documents) == chunk_size:
+                        yield pd.DataFrame(documents).replace({"na": np.nan})
+                        documents = []
+                if documents:
+                    yield pd.DataFrame(documents).replace({"na": np.nan})
+            finally:
+                cursor.close()
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def _typed_column(values: list, dtype: str) -> pd.Series:
+        """
+        Builds one column of a chunk with the pandas dtype of its schema type ('int', 'float' or
+        'category'); 'na' and missing values become NaN. 'object' keeps the values as they are.
+        """
+        if dtype == "object":
+            return pd.Series(values, dtype="object")
+        if dtype == "category":
+            return pd.Series(values, dtype="object").replace({"na": np.nan}).astype("category")
+        column = pd.to_numeric(pd.Series(values, dtype="object"), errors="coerce")
+        if dtype == "int" and not column.isna().any():
+            return column.astype("int64")
+        return column.astype("float64")
+
+    def iter_collection_as_typed_chunks(self, collection_name: str, column_types: Dict[str, str], chunk_size: int,
+                                        batch_size: Optional[int] = None, query: Optional[dict] = None,
+                                        sort_field: Optional[str] = None, database_name: Optional[str] = None,
+                                        raw_batches: bool = False) -> Iterator[pd.DataFrame]:
+        """
+        Streams a MongoDB collection as DataFrames of at most chunk_size documents, restricted to
+        the given columns and typed per column. Documents are never materialized as a list: the
+        server only sends the projected fields, values are appended straight to per-column buffers,
+        and each chunk is built column by column and released before the next one is read.
+
+        Parameters:
+        ----------
+        collection_name : str
+            The name of the MongoDB collection to read.
+        column_types : Dict[str, str]
+            Column name to schema type ('int', 'float' or 'category'), in output column order,
+            e.g. the 'columns' section of config/schema.yaml. '_id' is only fetched as sort_field.
+        chunk_size : int
+            Number of documents per yielded DataFrame.
+        batch_size : Optional[int]
+            Number of documents per cursor round trip. Defaults to chunk_size.
+        query : Optional[dict]
+            Filter of the documents to read, e.g. {"_id": {"$gt": last_id}}. All documents when omitted.
+        sort_field : Optional[str]
+            Field to read the documents in ascending order of. It is added as the last column with
+            its values as returned by MongoDB (e.g. ObjectId, datetime) unless it is a schema column.
+        database_name : Optional[str]
+            Name of the database (optional). Defaults to DATABASE_NAME.
+        raw_batches : bool
+            Read the cursor as raw BSON batches and decode them column by column with pymongoarrow,
+            without building a dict per document (see RawBatchDecoder). Ignored when pymongoarrow is
+            not installed or a column has no Arrow type.
+
+        Yields:
+        -------
+        pd.DataFrame
+            Chunk of the collection with the schema columns and dtypes.
+        """
+        try:
+            collection = self.get_collection(collection_name, database_name)
+            column_types = dict(column_types)
+            if sort_field is not None and sort_field not in column_types:
+                column_types[sort_field] = "object"
+            projection = {column: 1 for column in column_types}
+            if "_id" not in column_types:
+                projection["_id"] = 0
+            if raw_batches:
+                if RawBatchDecoder.is_available(column_types):
+                    yield from self._iter_raw_batch_chunks(collection, column_types, chunk_size,
+                                                           batch_size or chunk_size, query, projection, sort_field)
+                    return
+                logging.info("pymongoarrow is not installed or a column has no Arrow type, "
+                             "reading the collection document by document")
+            cursor = collection.find(query or {}, projection, batch_size=batch_size or chunk_size)
+            if sort_field is not None:
+                cursor = cursor.sort(sort_field, 1)
+
+            def build_chunk(buffers: Dict[str, list]) -> pd.DataFrame:
+                return pd.DataFrame({column: self._typed_column(values, column_types[column])
+                                     for column, values in buffers.items()})
+
+            try:
+                buffers = {column: [] for column in column_types}
+                count = 0
+                for document in cursor:
+                    for column, values in buffers.items():
+                        values.append(document.get(column))
+                    count += 1
+                    if count == chunk_size:
+                        yield build_chunk(buffers)
+                        buffers = {column: [] for column in column_types}
+                        count = 0
+                if count:
+                    yield build_chunk(buffers)
+            finally:
+                cursor.close()
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def _iter_raw_batch_chunks(collection, column_types: Dict[str, str], chunk_size: int, batch_size: int,
+                               query: Optional[dict], projection: dict,
+                               sort_field: Optional[str]) -> Iterator[pd.DataFrame]:
+        """
+        Yields the chunks of iter_collection_as_typed_chunks() from a find_raw_batches cursor.
+        Decoded batches are cut into chunks of chunk_size rows, so at most one chunk plus one
+        batch of decoded columns is held at a time.
+        """
+        decoder = RawBatchDecoder(column_types, codec_options=collection.codec_options)
+        cursor = collection.find_raw_batches(query or {}, projection, batch_size=batch_size)
+        if sort_field is not None:
+            cursor = cursor.sort(sort_field, 1)
+        try:
+            frames, rows = [], 0
+            for batch in cursor:
+                frame = decoder.decode(batch)
+                frames.append(frame)
+                rows += len(frame)
+                while rows >= chunk_size:
+                    decoded = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+                    yield decoder.to_typed_chunk(decoded.iloc[:chunk_size])
+                    frames, rows = [decoded.iloc[chunk_size:]], len(decoded) - chunk_size
+            if rows:
+                yield decoder.to_typed_chunk(frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True))
+        finally:
+            cursor.close()
+
+    def sample_split_points(self, collection_name: str, parts: int, query: Optional[dict] = None,
+                            field: str = "_id", samples_per_part: int = 32,
+                            database_name: Optional[str] = None) -> list:
+        """
+        Picks values of field that split the matching documents into ranges of roughly equal size,
+        from a random sample of parts * samples_per_part documents ($sample uses a random cursor,
+        so this does not scan the collection).
+
+        Parameters:
+        ----------
+        collection_name : str
+            The name of the MongoDB collection.
+        parts : int
+            Number of ranges wanted.
+        query : Optional[dict]
+            Filter of the documents to split. All documents when omitted.
+        field : str
+            Field to split on, indexed and unique such as '_id'.
+        samples_per_part : int
+            Sampled documents per range; more give more even ranges.
+        database_name : Optional[str]
+            Name of the database (optional). Defaults to DATABASE_NAME.
+
+        Returns:
+        -------
+        list
+            At most parts - 1 ascending, distinct split points; range i is [point i-1, point i).
+        """
+        try:
+            collection = self.get_collection(collection_name, database_name)
+            pipeline = [{"$match": query}] if query else []
+            pipeline += [{"$sample": {"size": parts * samples_per_part}}, {"$project": {field: 1}}]
+            values = sorted(document[field] for document in collection.aggregate(pipeline))
+            if not values:
+                return []
+            points = [values[len(values) * index // parts] for index in range(1, parts)]
+            return sorted(set(points))
+
+        except Exception as e:
+            raise CustomException(e, sys)
@@ -0,0 +1,231 @@
+import contextlib
+import json
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+from bson import ObjectId
+
+from src.exception import CustomException
+from src.logger import logging
+from src.utils.main_utils import read_dataframe, write_dataframe, write_dataframe_chunks
+
+_PARTITION_NAME = re.compile(r"^part-(\d{8})\.(csv|parquet|feather)$")
+_WATERMARK_FILE_NAME = "watermark.json"
+
+
+def encode_watermark(field: str, value: object) -> dict:
+    """
+    Makes a high-water mark value (ObjectId, datetime or a JSON scalar) storable as JSON.
+    """
+    if isinstance(value, ObjectId):
+        return {"field": field, "type": "objectid", "value": str(value)}
+    if isinstance(value, datetime):
+        return {"field": field, "type": "datetime", "value": value.isoformat()}
+    if hasattr(value, "item"):
+        # numpy scalar
+        value = value.item()
+    return {"field": field, "type": "value", "value": value}
+
+
+def decode_watermark(record: dict) -> object:
+    if record["type"] == "objectid":
+        return ObjectId(record["value"])
+    if record["type"] == "datetime":
+        return datetime.fromisoformat(record["value"])
+    return record["value"]
+
+
+class FeatureStore:
+    """
+    Persistent, append-only feature store of one collection, kept across training runs.
+
+        <root_dir>/part-00000001.parquet  documents ingested by one run, ascending by the watermark field
+        <root_dir>/watermark.json         watermark field, highest value ingested so far and time of
+                                          the last full resync
+
+    Every run only pulls documents past the high-water mark and appends them as a new partition.
+    A customer may therefore appear in several partitions; read() keeps the row of the newest
+    partition. Partitions and the watermark are written under temporary names and renamed into
+    place, the partition first: a run that dies in between pulls the same documents again next
+    time, which deduplication absorbs. Documents deleted from MongoDB stay in the store until the
+    next resync(), which replaces all partitions with the full collection. New partitions are
+    written in file_format; partitions of other formats, from before a format change, are still read.
+    """
+
+    def __init__(self, root_dir: str, column_types: Dict[str, str], key_column: str,
+                 file_format: str = "parquet", compression: Optional[str] = "zstd"):
+        """
+        :param root_dir: Directory of the store, outside the timestamped artifact directory of a run
+        :param column_types: Column name to schema type ('int', 'float' or 'category'), in file column order
+        :param key_column: Column identifying a customer, rows are deduplicated by it on read
+        :param file_format: Format of new partitions, "parquet", "feather" or "csv"
+        :param compression: Codec of columnar partitions
+        """
+        self.root_dir = root_dir
+        self.column_types = column_types
+        self.key_column = key_column
+        self.file_format = file_format
+        self.compression = compression
+
+    def list_partitions(self) -> List[str]:
+        """
+        Returns the partition file paths, oldest first.
+        """
+        if not os.path.isdir(self.root_dir):
+            return []
+        names = sorted(name for name in os.listdir(self.root_dir) if _PARTITION_NAME.match(name))
+        return [os.path.join(self.root_dir, name) for name in names]
+
+    def _partition_path(self, number: int) -> str:
+        return os.path.join(self.root_dir, f"part-{number:08d}.{self.file_format}")
+
+    def _next_partition_number(self) -> int:
+        partitions = self.list_partitions()
+        if not partitions:
+            return 1
+        return int(_PARTITION_NAME.match(os.path.basename(partitions[-1])).group(1)) + 1
+
+    def _read_record(self, field: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.root_dir, _WATERMARK_FILE_NAME)) as watermark_file:
+                record = json.load(watermark_file)
+        except (FileNotFoundError, ValueError):
+            return None
+        if record["field"] != field:
+            logging.warning(f"Feature store watermark is on {record['field']}, not {field}; ingesting everything")
+            return None
+        return record
+
+    def read_watermark(self, field: str) -> Optional[object]:
+        """
+        Returns the highest value of field ingested so far, or None when nothing was ingested by it yet.
+        """
+        record = self._read_record(field)
+        return None if record is None else decode_watermark(record)
+
+    def read_last_full_sync(self, field: str) -> Optional[datetime]:
+        """
+        Returns when the store was last rebuilt from the whole collection by field, or None if never.
+        """
+        record = self._read_record(field)
+        if record is None or record.get("full_sync_at") is None:
+            return None
+        return datetime.fromisoformat(record["full_sync_at"])
+
+    def _write_watermark(self, field: str, value: object, full_sync_at: Optional[datetime]) -> None:
+        record = encode_watermark(field, value)
+        record["full_sync_at"] = None if full_sync_at is None else full_sync_at.isoformat()
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.root_dir, prefix=".tmp-")
+        with os.fdopen(descriptor, "w") as watermark_file:
+            json.dump(record, watermark_file)
+        os.replace(temporary_path, os.path.join(self.root_dir, _WATERMARK_FILE_NAME))
+
+    def _write_new_partition(self, chunks: Iterable[pd.DataFrame], watermark_field: str) -> Tuple[str, int, object]:
+        """
+        Writes chunks, sorted ascending by watermark_field, as the next partition; nothing is kept for no rows.
+        :return: partition path, number of rows and watermark_field value of the last row
+        """
+        os.makedirs(self.root_dir, exist_ok=True)
+        partition_path = self._partition_path(self._next_partition_number())
+        last_values = [None]
+
+        def track_watermark(chunks: Iterable[pd.DataFrame]) -> Iterable[pd.DataFrame]:
+            for chunk in chunks:
+                if len(chunk):
+                    last_values[0] = chunk[watermark_field].iloc[-1]
+                yield chunk
+
+        rows = write_dataframe_chunks(partition_path, track_watermark(chunks), self.column_types,
+                                      compression=self.compression)
+        if not rows:
+            os.remove(partition_path)
+        return partition_path, rows, last_values[0]
+
+    def append(self, chunks: Iterable[pd.DataFrame], watermark_field: str) -> int:
+        """
+        Writes chunks, sorted ascending by watermark_field, as a new partition and advances the
+        high-water mark to the watermark_field value of the last row. Nothing is written for no rows.
+        :return: number of rows appended
+        """
+        try:
+            full_sync_at = self.read_last_full_sync(watermark_field)
+            partition_path, rows, watermark = self._write_new_partition(chunks, watermark_field)
+            if rows:
+                self._write_watermark(watermark_field, watermark, full_sync_at)
+                logging.info(f"Appended {rows} rows to feature store as {partition_path}, "
+                             f"watermark {watermark_field} = {watermark}")
+            else:
+                logging.info("No new documents to append to the feature store")
+            return rows
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def resync(self, chunks: Iterable[pd.DataFrame], watermark_field: str) -> int:
+        """
+        Replaces the store with chunks of the whole collection, sorted ascending by watermark_field,
+        which drops deleted documents and any drift of earlier increments. The new partition and
+        watermark are in place before the older partitions are removed, so an interrupted resync
+        leaves a store that reads the new rows.
+        :return: number of rows in the store
+        """
+        try:
+            older_partitions = self.list_partitions()
+            partition_path, rows, watermark = self._write_new_partition(chunks, watermark_field)
+            self._write_watermark(watermark_field, watermark, full_sync_at=datetime.now(timezone.utc))
+            for older_partition in older_partitions:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(older_partition)
+            logging.info(f"Resynchronized feature store with {rows} rows, replacing {len(older_partitions)} "
+                         f"partitions, watermark {watermark_field} = {watermark}")
+            return rows
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def read(self) -> pd.DataFrame:
+        """
+        Reads all partitions into one DataFrame with a single row per key, the one from the newest
+        partition. Partitions are read newest first and rows of keys already seen are dropped before
+        the next one is read, so memory holds the deduplicated data plus one partition.
+        """
+        try:
+            string_columns = [column for column, dtype in self.column_types.items() if dtype == "category"]
+            frames, seen = [], set()
+            for partition_path in reversed(self.list_partitions()):
+                partition = read_dataframe(partition_path)
+                partition = partition.drop_duplicates(subset=self.key_column, keep="last")
+                partition = partition[~partition[self.key_column].isin(seen)]
+                seen.update(partition[self.key_column])
+                frames.append(partition)
+            if not frames:
+                return pd.DataFrame({column: pd.Series(dtype="object") for column in self.column_types})
+            # Oldest partition first, as ingested
+            dataframe = pd.concat(reversed(frames), ignore_index=True)
+            return dataframe.astype({column: "category" for column in string_columns})
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def compact(self, dataframe: pd.DataFrame) -> None:
+        """
+        Replaces all partitions with the deduplicated dataframe returned by read(), written as the
+        newest partition number first, so an interrupted compaction leaves a store that still reads
+        the same.
+        """
+        try:
+            partitions = self.list_partitions()
+            if len(partitions) < 2 or dataframe.empty:
+                return
+            number = int(_PARTITION_NAME.match(os.path.basename(partitions[-1])).group(1))
+            compacted_path = self._partition_path(number)
+            write_dataframe(compacted_path, dataframe[list(self.column_types)], compression=self.compression)
+            for partition_path in partitions:
+                if partition_path != compacted_path:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(partition_path)
+            logging.info(f"Compacted {len(partitions)} feature store partitions into {compacted_path}")
+        except Exception as e:
+            raise CustomException(e, sys) from e
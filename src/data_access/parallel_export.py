@@ -0,0 +1,110 @@
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from src.configuration.mongo_db_connection import MongoDBClient
+from src.data_access.CustomerData import CustomerData
+from src.exception import CustomException
+from src.logger import logging
+from src.utils.main_utils import write_dataframe_chunks
+
+
+@dataclass(frozen=True)
+class ExportedRange:
+    file_path: str
+    rows: int
+
+
+def _range_query(query: Optional[dict], lower: object, upper: object) -> dict:
+    bounds = {}
+    if lower is not None:
+        bounds["$gte"] = lower
+    if upper is not None:
+        bounds["$lt"] = upper
+    range_query = {"_id": bounds} if bounds else {}
+    if query and range_query:
+        return {"$and": [query, range_query]}
+    return query or range_query
+
+
+def _export_range(mongo_client_factory: Callable, collection_name: str, database_name: Optional[str],
+                  column_types: Dict[str, str], query: dict, chunk_size: int, batch_size: int,
+                  file_path: str, compression: Optional[str], raw_batches: bool) -> ExportedRange:
+    """
+    Runs in a worker process: streams one _id range through its own MongoClient into a file.
+    """
+    # A fresh client per process; MongoClient instances must not be shared across processes
+    customer_data = CustomerData(mongo_client=mongo_client_factory())
+    chunks = customer_data.iter_collection_as_typed_chunks(
+        collection_name=collection_name, column_types=column_types, chunk_size=chunk_size, batch_size=batch_size,
+        query=query, sort_field="_id", database_name=database_name, raw_batches=raw_batches)
+    rows = write_dataframe_chunks(file_path, chunks, column_types, compression=compression)
+    return ExportedRange(file_path=file_path, rows=rows)
+
+
+class ParallelExporter:
+    """
+    Exports a collection with several worker processes, each decoding the BSON of its own _id range.
+
+    A single cursor decodes every document on one core. Here split points are sampled from the
+    matching documents, and each [lower, upper) _id range is streamed by a spawned worker process
+    with its own MongoClient into its own file, typed as in the schema. The files are the output:
+    callers concatenate them, so no process ever builds a dataframe of the other workers' data.
+    """
+
+    def __init__(self, max_workers: int, chunk_size: int, batch_size: int,
+                 mongo_client_factory: Callable = MongoDBClient, customer_data: Optional[CustomerData] = None,
+                 file_format: str = "parquet", compression: Optional[str] = "zstd", raw_batches: bool = False):
+        """
+        :param max_workers: Number of worker processes; the collection is split into as many ranges
+        :param chunk_size: Documents per DataFrame chunk in a worker
+        :param batch_size: Documents per cursor round trip in a worker
+        :param mongo_client_factory: Picklable callable creating a client (an object exposing `client` and
+                                     `database`) in a worker process
+        :param customer_data: Access used to sample the split points, created from the factory when omitted
+        :param file_format: Format of the range files, "parquet", "feather" or "csv"
+        :param compression: Codec of columnar range files
+        :param raw_batches: Decode raw BSON batches column by column in the workers (needs pymongoarrow)
+        """
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.mongo_client_factory = mongo_client_factory
+        self.customer_data = customer_data
+        self.file_format = file_format
+        self.compression = compression
+        self.raw_batches = raw_batches
+
+    def export(self, collection_name: str, column_types: Dict[str, str], output_dir: str,
+               query: Optional[dict] = None, database_name: Optional[str] = None) -> List[ExportedRange]:
+        """
+        Exports the documents matching query into one file per _id range under output_dir.
+        :return: the exported ranges in ascending _id order
+        """
+        try:
+            customer_data = self.customer_data or CustomerData(mongo_client=self.mongo_client_factory())
+            split_points = customer_data.sample_split_points(collection_name=collection_name, parts=self.max_workers,
+                                                             query=query, database_name=database_name)
+            bounds = [None] + split_points + [None]
+            os.makedirs(output_dir, exist_ok=True)
+            logging.info(f"Exporting {collection_name} in {len(bounds) - 1} _id ranges with "
+                         f"{self.max_workers} worker processes")
+
+            with ProcessPoolExecutor(max_workers=self.max_workers,
+                                     mp_context=multiprocessing.get_context("spawn")) as executor:
+                futures = [
+                    executor.submit(_export_range, self.mongo_client_factory, collection_name, database_name,
+                                    column_types, _range_query(query, lower, upper), self.chunk_size,
+                                    self.batch_size, os.path.join(output_dir, f"range-{index:04d}.{self.file_format}"),
+                                    self.compression, self.raw_batches)
+                    for index, (lower, upper) in enumerate(zip(bounds[:-1], bounds[1:]))]
+                exported_ranges = [future.result() for future in futures]
+            logging.info(f"Exported {sum(exported.rows for exported in exported_ranges)} rows "
+                         f"in {len(exported_ranges)} ranges")
+            return exported_ranges
+
+        except Exception as e:
+            raise CustomException(e, sys) from e
@@ -0,0 +1,145 @@
+from typing import Dict, Optional
+
+import pandas as pd
+from bson import ObjectId, decode_all
+from bson.codec_options import DEFAULT_CODEC_OPTIONS, CodecOptions
+
+try:
+    import pyarrow as pa
+    from pymongoarrow.api import Schema
+    from pymongoarrow.context import PyMongoArrowContext
+except ImportError:  # optional dependency, raw batches are then decoded into documents by bson
+    PyMongoArrowContext = None
+
+from src.logger import logging
+
+
+def _arrow_candidates(column: str, dtype: str) -> Optional[list]:
+    """
+    Returns the Arrow types a schema column may be decoded as, preferred first, or None when it
+    has none. Numbers stored as strings (e.g. TotalCharges exported from CSV) are read as strings.
+    Any other 'object' column is the watermark field of incremental ingestion, an update time
+    stored as a BSON date or as epoch seconds.
+    """
+    if dtype == "category":
+        return [pa.string()]
+    if dtype == "int":
+        return [pa.int64(), pa.float64(), pa.string()]
+    if dtype == "float":
+        return [pa.float64(), pa.string()]
+    if dtype == "object" and column == "_id":
+        return [ObjectId]
+    if dtype == "object":
+        return [pa.timestamp("ms"), pa.float64()]
+    return None
+
+
+class RawBatchDecoder:
+    """
+    Decodes raw BSON batches of a find_raw_batches cursor into columns of the schema types.
+
+    With pymongoarrow installed, the documents of a batch are decoded in C straight into Arrow
+    column buffers and never become Python dicts. The Arrow type of a column is the one of its
+    schema type until a batch holds a value of another BSON type; the columns are then probed
+    once on that batch and read as the type their values actually have. A batch no Arrow type
+    fits (a field mixing numbers and strings) is decoded into documents by bson, like every
+    batch is without pymongoarrow.
+    """
+
+    def __init__(self, column_types: Dict[str, str], codec_options: CodecOptions = DEFAULT_CODEC_OPTIONS):
+        """
+        :param column_types: Column name to schema type ('int', 'float', 'category' or 'object'), in output order
+        :param codec_options: Codec options of the collection the batches come from
+        """
+        self.column_types = column_types
+        self.codec_options = codec_options
+        # Arrow type per column, None while batches are decoded into documents
+        self._arrow_types = None
+        if self.is_available(column_types):
+            self._arrow_types = {column: _arrow_candidates(column, dtype)[0] for column, dtype in column_types.items()}
+
+    @staticmethod
+    def is_available(column_types: Dict[str, str]) -> bool:
+        """
+        Returns True if batches of these columns can be decoded without building documents.
+        """
+        return PyMongoArrowContext is not None and all(
+            _arrow_candidates(column, dtype) for column, dtype in column_types.items())
+
+    def _decode_arrow(self, batch: bytes, arrow_types: dict) -> "pa.Table":
+        context = PyMongoArrowContext(Schema(arrow_types), codec_options=self.codec_options)
+        context.process_bson_stream(batch)
+        return context.finish()
+
+    def _probe_arrow_types(self, batch: bytes) -> bool:
+        """
+        Picks for every column the first candidate Arrow type all values of the batch decode as.
+        :return: False if some column has none
+        """
+        arrow_types = {}
+        for column, dtype in self.column_types.items():
+            for arrow_type in _arrow_candidates(column, dtype):
+                try:
+                    self._decode_arrow(batch, {column: arrow_type})
+                except TypeError:
+                    continue
+                arrow_types[column] = arrow_type
+                break
+            else:
+                logging.warning(f"Values of {column} have mixed BSON types, decoding the batch into documents")
+                return False
+        changed = {column: str(arrow_type) for column, arrow_type in arrow_types.items()
+                   if str(arrow_type) != str(self._arrow_types[column])}
+        logging.info(f"Decoding raw BSON batch columns as {changed}")
+        self._arrow_types = arrow_types
+        return True
+
+    def _decode_documents(self, batch: bytes) -> pd.DataFrame:
+        documents = decode_all(batch, self.codec_options)
+        columns = {}
+        for column, dtype in self.column_types.items():
+            values = pd.Series([document.get(column) for document in documents], dtype="object")
+            columns[column] = pd.to_numeric(values, errors="coerce") if dtype in ("int", "float") else values
+        return pd.DataFrame(columns)
+
+    def decode(self, batch: bytes) -> pd.DataFrame:
+        """
+        Decodes one raw batch into a DataFrame with numeric columns as int64 or float64 (nulls as NaN)
+        and category columns as strings; to_typed_chunk() gives the final dtypes.
+        """
+        if self._arrow_types is None:
+            return self._decode_documents(batch)
+        try:
+            table = self._decode_arrow(batch, self._arrow_types)
+        except TypeError:
+            if not self._probe_arrow_types(batch):
+                return self._decode_documents(batch)
+            table = self._decode_arrow(batch, self._arrow_types)
+
+        frame = table.to_pandas()
+        for column, dtype in self.column_types.items():
+            if dtype == "object":
+                # Missing values are None, as in documents, rather than NaT or NaN
+                values = frame[column].astype("object")
+                frame[column] = values.where(values.notna(), None)
+            elif dtype in ("int", "float") and self._arrow_types[column] == pa.string():
+                frame[column] = pd.to_numeric(frame[column], errors="coerce")
+        return frame
+
+    def to_typed_chunk(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Gives a DataFrame of decoded batches the dtypes of CustomerData._typed_column(): 'na' and
+        missing values are NaN, 'int' columns are int64 unless they hold NaN.
+        """
+        columns = {}
+        for column, dtype in self.column_types.items():
+            values = frame[column]
+            if dtype == "category":
+                # Stays an Arrow backed string column until factorized, unlike a replace() on objects
+                values = values.mask(values == "na").astype("category")
+            elif dtype == "int":
+                values = values.astype("int64") if not values.isna().any() else values.astype("float64")
+            elif dtype == "float":
+                values = values.astype("float64")
+            columns[column] = values.reset_index(drop=True)
+        return pd.DataFrame(columns)
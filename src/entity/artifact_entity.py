@@ -41,4 +41,27 @@ class ModelEvaluationArtifact:
 @dataclass
 class ModelPusherArtifact:
     bucket_name:str
-    s3_model_path:str
\ No newline at end of file
+    s3_model_path:str
+
+@dataclass
+class BatchScoringArtifact:
+    collection_name:str
+    model_version:str
+    scored_count:int
+    chunk_count:int
+    scored_at:str
+
+@dataclass
+class LoadTestArtifact:
+    route:str
+    target:str
+    concurrency:int
+    requests:int
+    rows_per_request:int
+    errors:int
+    error_rate:float
+    status_codes:dict
+    duration_seconds:float
+    throughput_rps:float
+    rows_per_second:float
+    latency_ms:dict
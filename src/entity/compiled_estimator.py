@@ -0,0 +1,285 @@
+import math
+import sys
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from src.entity.estimator import MyModel
+from src.exception import CustomException
+from src.logger import logging
+
+
+def _to_float(value) -> float:
+    """Numeric coercion matching pd.to_numeric(errors='coerce') for a single value."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class CompiledModel:
+    """
+    Pandas-free predictor compiled from a fitted MyModel.
+
+    The StandardScaler mean/scale vectors and a category -> one-hot column lookup per feature
+    are precomputed, and every tree of the random forest is flattened into shared node arrays.
+    A single record (dict or tuple) is scored with plain Python lookups; a DataFrame is scored
+    with a vectorized traversal of all trees at once. Both return exactly what MyModel.predict
+    returns for the same input.
+    """
+
+    def __init__(self, metadata: dict, arrays: Dict[str, np.ndarray]):
+        """
+        :param metadata: Preprocessing parameters and forest description (JSON serializable)
+        :param arrays: Flattened forest node arrays
+        """
+        self.metadata = metadata
+        self.arrays = arrays
+
+        self.input_columns: List[str] = metadata["input_columns"]
+        self.n_features: int = metadata["n_features"]
+        self.classes = np.asarray(metadata["classes"])
+        self.handle_unknown: str = metadata["handle_unknown"]
+        self.max_depth: int = metadata["max_depth"]
+        self.numerical = [(column, index, mean, scale) for column, index, mean, scale in metadata["numerical"]]
+        self.categorical = [(column, {category: offset + position for position, category in enumerate(categories)})
+                            for column, offset, categories in metadata["categorical"]]
+
+        self.roots = arrays["roots"]
+        self.children_left = arrays["children_left"]
+        self.children_right = arrays["children_right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.missing_go_to_left = arrays["missing_go_to_left"]
+        self.value = arrays["value"]
+        self._node_lists: Optional[tuple] = None
+
+    @property
+    def classes_(self) -> np.ndarray:
+        """
+        Class labels in the column order of predict_proba, like MyModel.classes_.
+        """
+        return self.classes
+
+    @classmethod
+    def from_model(cls, model: MyModel) -> "CompiledModel":
+        """
+        Compiles a fitted MyModel whose preprocessor is a ColumnTransformer of StandardScaler and
+        OneHotEncoder and whose trained model is a RandomForestClassifier.
+        Raises ValueError for any other layout.
+        """
+        # scikit-learn is already loaded once a model has been unpickled; importing it here keeps
+        # it off the import path of the serving app
+        from sklearn.compose import ColumnTransformer
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+        try:
+            preprocessor = model.preprocessing_object
+            if isinstance(preprocessor, Pipeline):
+                if len(preprocessor.steps) != 1:
+                    raise ValueError("Only single-step preprocessing pipelines can be compiled")
+                preprocessor = preprocessor.steps[0][1]
+            if not isinstance(preprocessor, ColumnTransformer):
+                raise ValueError(f"Cannot compile preprocessor of type {type(preprocessor).__name__}")
+            forest = model.trained_model_object
+            if not isinstance(forest, RandomForestClassifier) or forest.n_outputs_ != 1:
+                raise ValueError(f"Cannot compile trained model of type {type(forest).__name__}")
+
+            input_columns, numerical, categorical = [], [], []
+            handle_unknown = "ignore"
+            offset = 0
+            for name, transformer, columns in preprocessor.transformers_:
+                if transformer == "drop":
+                    continue
+                columns = list(columns)
+                if isinstance(transformer, StandardScaler):
+                    means = transformer.mean_ if transformer.mean_ is not None else np.zeros(len(columns))
+                    scales = transformer.scale_ if transformer.scale_ is not None else np.ones(len(columns))
+                    for position, column in enumerate(columns):
+                        numerical.append([column, offset + position, float(means[position]), float(scales[position])])
+                    offset += len(columns)
+                elif isinstance(transformer, OneHotEncoder):
+                    if transformer.drop_idx_ is not None or getattr(transformer, "infrequent_categories_", None):
+                        raise ValueError("OneHotEncoder with dropped or infrequent categories cannot be compiled")
+                    handle_unknown = "ignore" if transformer.handle_unknown != "error" else "error"
+                    for column, categories in zip(columns, transformer.categories_):
+                        categorical.append([column, offset, categories.tolist()])
+                        offset += len(categories)
+                else:
+                    raise ValueError(f"Cannot compile transformer {name} of type {type(transformer).__name__}")
+                input_columns.extend(columns)
+
+            if offset != forest.n_features_in_:
+                raise ValueError(f"Preprocessor yields {offset} features, forest expects {forest.n_features_in_}")
+
+            roots, lefts, rights, features, thresholds, missing_left, values = [], [], [], [], [], [], []
+            node_offset = 0
+            for estimator in forest.estimators_:
+                tree = estimator.tree_
+                is_leaf = tree.children_left == -1
+                roots.append(node_offset)
+                lefts.append(np.where(is_leaf, -1, tree.children_left + node_offset))
+                rights.append(np.where(is_leaf, -1, tree.children_right + node_offset))
+                features.append(tree.feature)
+                thresholds.append(tree.threshold)
+                missing_left.append(getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8)))
+                leaf_value = tree.value[:, 0, :]
+                values.append(leaf_value / leaf_value.sum(axis=1, keepdims=True))
+                node_offset += tree.node_count
+
+            arrays = {
+                "roots": np.asarray(roots, dtype=np.int64),
+                "children_left": np.concatenate(lefts).astype(np.int64),
+                "children_right": np.concatenate(rights).astype(np.int64),
+                "feature": np.concatenate(features).astype(np.int64),
+                "threshold": np.concatenate(thresholds).astype(np.float64),
+                "missing_go_to_left": np.concatenate(missing_left).astype(bool),
+                "value": np.concatenate(values).astype(np.float64),
+            }
+            metadata = {
+                "input_columns": input_columns,
+                "numerical": numerical,
+                "categorical": categorical,
+                "handle_unknown": handle_unknown,
+                "n_features": offset,
+                "classes": forest.classes_.tolist(),
+                "max_depth": max(estimator.tree_.max_depth for estimator in forest.estimators_),
+            }
+            return cls(metadata=metadata, arrays=arrays)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def _get_node_lists(self) -> tuple:
+        # Python lists index much faster than numpy arrays for one-element lookups
+        if self._node_lists is None:
+            self._node_lists = (self.roots.tolist(), self.children_left.tolist(), self.children_right.tolist(),
+                                self.feature.tolist(), self.threshold.tolist(),
+                                self.missing_go_to_left.tolist(), self.value.tolist())
+        return self._node_lists
+
+    def _encode_record(self, record: Union[dict, Sequence]) -> list:
+        if not isinstance(record, dict):
+            record = dict(zip(self.input_columns, record))
+        missing_columns = [column for column in self.input_columns if column not in record]
+        if missing_columns:
+            raise ValueError(f"Record is missing fields: {missing_columns}")
+
+        row = [0.0] * self.n_features
+        for column, index, mean, scale in self.numerical:
+            row[index] = (_to_float(record[column]) - mean) / scale
+        for column, lookup in self.categorical:
+            index = lookup.get(record[column])
+            if index is not None:
+                row[index] = 1.0
+            elif self.handle_unknown == "error":
+                raise ValueError(f"Found unknown category {record[column]!r} in column {column}")
+        # The forest compares float32 features against float64 thresholds
+        return np.asarray(row, dtype=np.float32).tolist()
+
+    def predict_proba_one(self, record: Union[dict, Sequence]) -> List[float]:
+        """
+        Returns class probabilities for a single record given as a dict or a tuple in input_columns order.
+        """
+        row = self._encode_record(record)
+        roots, left, right, feature, threshold, missing_go_to_left, value = self._get_node_lists()
+        n_classes = len(self.classes)
+        total = [0.0] * n_classes
+        for node in roots:
+            while left[node] != -1:
+                x = row[feature[node]]
+                if x <= threshold[node] or (x != x and missing_go_to_left[node]):
+                    node = left[node]
+                else:
+                    node = right[node]
+            leaf = value[node]
+            for class_index in range(n_classes):
+                total[class_index] += leaf[class_index]
+        return [probability / len(roots) for probability in total]
+
+    def predict_one(self, record: Union[dict, Sequence]):
+        """
+        Returns the predicted class for a single record given as a dict or a tuple in input_columns order.
+        """
+        probabilities = self.predict_proba_one(record)
+        return self.classes[probabilities.index(max(probabilities))]
+
+    def _encode_frame(self, dataframe: pd.DataFrame) -> np.ndarray:
+        n_rows = len(dataframe)
+        features = np.zeros((n_rows, self.n_features), dtype=np.float64)
+        for column, index, mean, scale in self.numerical:
+            values = pd.to_numeric(dataframe[column], errors="coerce").to_numpy(dtype=np.float64)
+            features[:, index] = (values - mean) / scale
+        for column, lookup in self.categorical:
+            indexes = dataframe[column].map(lookup).to_numpy(dtype=np.float64)
+            known = ~np.isnan(indexes)
+            if self.handle_unknown == "error" and not known.all():
+                raise ValueError(f"Found unknown categories in column {column}")
+            features[np.flatnonzero(known), indexes[known].astype(np.int64)] = 1.0
+        return features.astype(np.float32)
+
+    def predict_proba(self, dataframe: pd.DataFrame) -> np.ndarray:
+        """
+        Returns class probabilities for every row of the DataFrame.
+        """
+        try:
+            features = self._encode_frame(dataframe)
+            n_rows = len(features)
+            row_index = np.arange(n_rows)[:, None]
+            nodes = np.tile(self.roots, (n_rows, 1))
+            for _ in range(self.max_depth):
+                left = self.children_left[nodes]
+                internal = left != -1
+                if not internal.any():
+                    break
+                x = features[row_index, self.feature[nodes]]
+                go_left = (x <= self.threshold[nodes]) | (np.isnan(x) & self.missing_go_to_left[nodes])
+                nodes = np.where(internal, np.where(go_left, left, self.children_right[nodes]), nodes)
+
+            # Accumulate tree by tree, in the same order as RandomForestClassifier
+            total = np.zeros((n_rows, len(self.classes)), dtype=np.float64)
+            for tree_index in range(len(self.roots)):
+                total += self.value[nodes[:, tree_index]]
+            return total / len(self.roots)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def predict(self, dataframe: pd.DataFrame) -> np.ndarray:
+        """
+        Returns the predicted class for every row of the DataFrame.
+        """
+        return self.classes.take(np.argmax(self.predict_proba(dataframe), axis=1))
+
+    def sample_frame(self, n_rows: int = 64) -> pd.DataFrame:
+        """
+        Builds a synthetic input frame that covers every category and a spread of numeric values.
+        """
+        data = {}
+        for position, (column, _, mean, scale) in enumerate(self.numerical):
+            spread = np.linspace(-2.0, 2.0, n_rows)
+            data[column] = mean + scale * np.roll(spread, position * 7)
+        for position, (column, lookup) in enumerate(self.categorical):
+            categories = list(lookup)
+            data[column] = [categories[(row + position) % len(categories)] for row in range(n_rows)]
+        return pd.DataFrame(data, columns=self.input_columns)
+
+    def is_equivalent_to(self, model: MyModel, dataframe: Optional[pd.DataFrame] = None) -> bool:
+        """
+        Checks that both the single-record and the DataFrame path return the same predictions
+        as model.predict on the given (or a synthetic) frame.
+        """
+        try:
+            if dataframe is None:
+                dataframe = self.sample_frame()
+            expected = np.asarray(model.predict(dataframe))
+            if not np.array_equal(self.predict(dataframe), expected):
+                return False
+            records = dataframe[self.input_columns].to_dict("records")
+            return all(self.predict_one(record) == value for record, value in zip(records, expected))
+        except Exception as e:
+            logging.warning(f"Compiled model equivalence check failed: {e}")
+            return False
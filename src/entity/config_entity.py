@@ -1,50 +1,114 @@
 import os
 from src.constants import *
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Callable, Optional
 
-TIMESTAMP: str = datetime.now().strftime("%m_%d_%Y_%H_%M_%S")
+
+def get_timestamp() -> str:
+    return datetime.now().strftime("%m_%d_%Y_%H_%M_%S")
 
 @dataclass
 class TrainingPipelineConfig:
     pipeline_name: str = PIPELINE_NAME
-    artifact_dir: str = os.path.join(ARTIFACT_DIR, TIMESTAMP)
-    timestamp: str = TIMESTAMP
+    timestamp: str = field(default_factory=get_timestamp)
+    artifact_dir: str = None
+
+    def __post_init__(self):
+        if self.artifact_dir is None:
+            self.artifact_dir = os.path.join(ARTIFACT_DIR, self.timestamp)
+
+
+_training_pipeline_config: Optional[TrainingPipelineConfig] = None
 
+def get_training_pipeline_config() -> TrainingPipelineConfig:
+    """
+    Returns the training run config of this process. It is created, and its timestamp taken, when a
+    training config is first instantiated rather than when this module is imported, so all stage
+    configs of a run share one artifact directory.
+    """
+    global _training_pipeline_config
+    if _training_pipeline_config is None:
+        _training_pipeline_config = TrainingPipelineConfig()
+    return _training_pipeline_config
 
-training_pipeline_config: TrainingPipelineConfig = TrainingPipelineConfig()
+def artifact_path(*parts: str) -> Callable[[], str]:
+    """
+    Returns a default factory for a path inside the artifact directory of the current training run.
+    """
+    return lambda: os.path.join(get_training_pipeline_config().artifact_dir, *parts)
 
 @dataclass
 class DataIngestionConfig:
-    data_ingestion_dir: str = os.path.join(training_pipeline_config.artifact_dir, DATA_INGESTION_DIR_NAME)
-    feature_store_file_path: str = os.path.join(data_ingestion_dir, DATA_INGESTION_FEATURE_STORE_DIR, FILE_NAME)
-    training_file_path: str = os.path.join(data_ingestion_dir, DATA_INGESTION_INGESTED_DIR, TRAIN_FILE_NAME)
-    testing_file_path: str = os.path.join(data_ingestion_dir, DATA_INGESTION_INGESTED_DIR, TEST_FILE_NAME)
+    data_ingestion_dir: str = field(default_factory=artifact_path(DATA_INGESTION_DIR_NAME))
+    # File paths default to the artifact directory of the run, with the extension of artifact_format;
+    # the format of a given path follows from its extension
+    feature_store_file_path: str = None
+    training_file_path: str = None
+    testing_file_path: str = None
+    artifact_format: str = DATA_INGESTION_ARTIFACT_FORMAT
+    artifact_compression: str = DATA_INGESTION_ARTIFACT_COMPRESSION
     train_test_split_ratio: float = DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO
     collection_name:str = DATA_INGESTION_COLLECTION_NAME
+    streaming_export: bool = DATA_INGESTION_STREAMING_EXPORT
+    export_chunk_size: int = DATA_INGESTION_EXPORT_CHUNK_SIZE
+    export_batch_size: int = DATA_INGESTION_EXPORT_BATCH_SIZE
+    raw_batch_decoding: bool = DATA_INGESTION_RAW_BATCH_DECODING
+    export_workers: int = DATA_INGESTION_EXPORT_WORKERS
+    parallel_min_documents: int = DATA_INGESTION_PARALLEL_MIN_DOCUMENTS
+    incremental: bool = DATA_INGESTION_INCREMENTAL
+    persistent_feature_store_dir: str = None
+    watermark_field: str = DATA_INGESTION_WATERMARK_FIELD
+    watermark_lookback_seconds: int = DATA_INGESTION_WATERMARK_LOOKBACK_SECONDS
+    full_resync_days: int = DATA_INGESTION_FULL_RESYNC_DAYS
+    force_full_resync: bool = DATA_INGESTION_FORCE_FULL_RESYNC
+    key_column: str = DATA_INGESTION_KEY_COLUMN
+    max_partitions: int = DATA_INGESTION_MAX_PARTITIONS
+
+    def __post_init__(self):
+        def default_path(directory: str, file_name: str) -> str:
+            file_name = os.path.splitext(file_name)[0] + "." + self.artifact_format
+            return artifact_path(DATA_INGESTION_DIR_NAME, directory, file_name)()
+
+        if self.feature_store_file_path is None:
+            self.feature_store_file_path = default_path(DATA_INGESTION_FEATURE_STORE_DIR, FILE_NAME)
+        if self.training_file_path is None:
+            self.training_file_path = default_path(DATA_INGESTION_INGESTED_DIR, TRAIN_FILE_NAME)
+        if self.testing_file_path is None:
+            self.testing_file_path = default_path(DATA_INGESTION_INGESTED_DIR, TEST_FILE_NAME)
+        if self.persistent_feature_store_dir is None:
+            self.persistent_feature_store_dir = os.path.join(DATA_INGESTION_PERSISTENT_FEATURE_STORE_DIR,
+                                                             self.collection_name)
+        if self.incremental and self.watermark_field == "_id":
+            raise ValueError("Incremental ingestion needs an update timestamp as watermark field: _id never "
+                             "changes on updates and ObjectIds of several writers are not ascending")
 
 @dataclass
 class DataValidationConfig:
-    data_validation_dir: str = os.path.join(training_pipeline_config.artifact_dir, DATA_VALIDATION_DIR_NAME)
-    validation_report_file_path: str = os.path.join(data_validation_dir, DATA_VALIDATION_REPORT_FILE_NAME)
+    data_validation_dir: str = field(default_factory=artifact_path(DATA_VALIDATION_DIR_NAME))
+    validation_report_file_path: str = field(default_factory=artifact_path(DATA_VALIDATION_DIR_NAME,
+                                                                           DATA_VALIDATION_REPORT_FILE_NAME))
 
 @dataclass
 class DataTransformationConfig:
-    data_transformation_dir: str = os.path.join(training_pipeline_config.artifact_dir, DATA_TRANSFORMATION_DIR_NAME)
-    transformed_train_file_path: str = os.path.join(data_transformation_dir, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
-                                                    TRAIN_FILE_NAME.replace("csv", "npy"))
-    transformed_test_file_path: str = os.path.join(data_transformation_dir, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
-                                                   TEST_FILE_NAME.replace("csv", "npy"))
-    transformed_object_file_path: str = os.path.join(data_transformation_dir,
-                                                     DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
-                                                     PREPROCSSING_OBJECT_FILE_NAME)
-    transformed_encoder_file_path: str = os.path.join(data_transformation_dir,
-                                                      DATA_TRANSFORMATION_ENCODER_DIR,
-                                                        ENCODER_OBJECT_FILE_NAME)
+    data_transformation_dir: str = field(default_factory=artifact_path(DATA_TRANSFORMATION_DIR_NAME))
+    transformed_train_file_path: str = field(default_factory=artifact_path(DATA_TRANSFORMATION_DIR_NAME,
+                                                                           DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
+                                                                           TRAIN_FILE_NAME.replace("csv", "npy")))
+    transformed_test_file_path: str = field(default_factory=artifact_path(DATA_TRANSFORMATION_DIR_NAME,
+                                                                          DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
+                                                                          TEST_FILE_NAME.replace("csv", "npy")))
+    transformed_object_file_path: str = field(default_factory=artifact_path(DATA_TRANSFORMATION_DIR_NAME,
+                                                                            DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
+                                                                            PREPROCSSING_OBJECT_FILE_NAME))
+    transformed_encoder_file_path: str = field(default_factory=artifact_path(DATA_TRANSFORMATION_DIR_NAME,
+                                                                             DATA_TRANSFORMATION_ENCODER_DIR,
+                                                                             ENCODER_OBJECT_FILE_NAME))
 @dataclass
 class ModelTrainerConfig:
-    model_trainer_dir: str = os.path.join(training_pipeline_config.artifact_dir, MODEL_TRAINER_DIR_NAME)
-    trained_model_file_path: str = os.path.join(model_trainer_dir, MODEL_TRAINER_TRAINED_MODEL_DIR, MODEL_FILE_NAME)
+    model_trainer_dir: str = field(default_factory=artifact_path(MODEL_TRAINER_DIR_NAME))
+    trained_model_file_path: str = field(default_factory=artifact_path(MODEL_TRAINER_DIR_NAME,
+                                                                       MODEL_TRAINER_TRAINED_MODEL_DIR, MODEL_FILE_NAME))
     expected_accuracy: float = MODEL_TRAINER_EXPECTED_SCORE
     model_config_file_path: str = MODEL_TRAINER_MODEL_CONFIG_FILE_PATH
     _n_estimators = MODEL_TRAINER_N_ESTIMATORS
@@ -64,8 +128,45 @@ class ModelEvaluationConfig:
 class ModelPusherConfig:
     bucket_name: str = MODEL_BUCKET_NAME
     s3_model_key_path: str = MODEL_FILE_NAME
+    artifact_format: str = MODEL_PUSHER_ARTIFACT_FORMAT
 
 @dataclass
 class VehiclePredictorConfig:
     model_file_path: str = MODEL_FILE_NAME
-    model_bucket_name: str = MODEL_BUCKET_NAME
\ No newline at end of file
+    model_bucket_name: str = MODEL_BUCKET_NAME
+
+@dataclass
+class ShadowConfig:
+    enabled: bool = SHADOW_ENABLED
+    model_bucket_name: str = MODEL_BUCKET_NAME
+    model_file_path: str = SHADOW_MODEL_FILE_PATH
+    sample_rate: float = SHADOW_SAMPLE_RATE
+    max_workers: int = SHADOW_MAX_WORKERS
+    max_queue_depth: int = SHADOW_MAX_QUEUE_DEPTH
+    latency_window: int = SHADOW_LATENCY_WINDOW
+    retry_seconds: int = SHADOW_RETRY_SECONDS
+
+@dataclass
+class BatchScoringConfig:
+    collection_name: str = BATCH_SCORING_COLLECTION_NAME
+    chunk_size: int = BATCH_SCORING_CHUNK_SIZE
+    max_workers: int = BATCH_SCORING_MAX_WORKERS
+    prediction_field: str = BATCH_SCORING_PREDICTION_FIELD
+    scored_at_field: str = BATCH_SCORING_SCORED_AT_FIELD
+    model_bucket_name: str = MODEL_BUCKET_NAME
+    model_file_path: str = MODEL_FILE_NAME
+
+@dataclass
+class LoadTestConfig:
+    data_file_path: str = LOAD_TEST_DATA_FILE_PATH
+    storage_dir: str = LOAD_TEST_STORAGE_DIR
+    route: str = LOAD_TEST_ROUTE
+    concurrency: int = LOAD_TEST_CONCURRENCY
+    requests: int = LOAD_TEST_REQUESTS
+    warmup_requests: int = LOAD_TEST_WARMUP_REQUESTS
+    batch_size: int = LOAD_TEST_BATCH_SIZE
+    random_state: int = LOAD_TEST_RANDOM_STATE
+    # Local model file published to the fake storage; a model is fitted on data_file_path when omitted
+    model_file_path: Optional[str] = None
+    # URL of a running server to test instead of the in-process app
+    base_url: Optional[str] = None
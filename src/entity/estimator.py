@@ -1,11 +1,15 @@
 import sys
+from typing import TYPE_CHECKING
 
 import pandas as pd
 from pandas import DataFrame
-from sklearn.pipeline import Pipeline
 
 from src.exception import CustomException
-from src.logger import logging
+from src.logger import hot_path_logger, logging
+from src.metrics import stage_timer
+
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
 
 class TargetValueMapping:
     def __init__(self):
@@ -18,7 +22,7 @@ class TargetValueMapping:
         return dict(zip(mapping_response.values(),mapping_response.keys()))
 
 class MyModel:
-    def __init__(self, preprocessing_object: Pipeline, trained_model_object: object):
+    def __init__(self, preprocessing_object: "Pipeline", trained_model_object: object):
         """
         :param preprocessing_object: Input Object of preprocesser
         :param trained_model_object: Input Object of trained model 
@@ -32,14 +36,16 @@ class MyModel:
         applies scaling using preprocessing_object, and performs prediction on transformed features.
         """
         try:
-            logging.info("Starting prediction process.")
+            hot_path_logger.info("Starting prediction process.")
 
             # Step 1: Apply scaling transformations using the pre-trained preprocessing object
-            transformed_feature = self.preprocessing_object.transform(dataframe)
+            with stage_timer("preprocess"):
+                transformed_feature = self.preprocessing_object.transform(dataframe)
 
             # Step 2: Perform prediction using the trained model
-            logging.info("Using the trained model to get predictions")
-            predictions = self.trained_model_object.predict(transformed_feature)
+            hot_path_logger.info("Using the trained model to get predictions")
+            with stage_timer("model_predict"):
+                predictions = self.trained_model_object.predict(transformed_feature)
 
             return predictions
 
@@ -47,6 +53,33 @@ class MyModel:
             logging.error("Error occurred in predict method", exc_info=True)
             raise CustomException(e, sys) from e
 
+    @property
+    def classes_(self):
+        """
+        Class labels of the trained model, in the column order of predict_proba.
+        """
+        return self.trained_model_object.classes_
+
+    def predict_proba(self, dataframe: pd.DataFrame):
+        """
+        Function accepts the same inputs as predict and returns an array of shape (n_rows, n_classes)
+        holding the probability of every class, in the order of classes_.
+        """
+        try:
+            hot_path_logger.info("Starting probability prediction process.")
+
+            with stage_timer("preprocess"):
+                transformed_feature = self.preprocessing_object.transform(dataframe)
+
+            with stage_timer("model_predict_proba"):
+                probabilities = self.trained_model_object.predict_proba(transformed_feature)
+
+            return probabilities
+
+        except Exception as e:
+            logging.error("Error occurred in predict_proba method", exc_info=True)
+            raise CustomException(e, sys) from e
+
 
     def __repr__(self):
         return f"{type(self.trained_model_object).__name__}()"
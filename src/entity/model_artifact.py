@@ -0,0 +1,158 @@
+"""
+Compiled model artifact: a single file holding a CompiledModel without pickle.
+
+    magic (8 bytes) | header length (uint64, little endian) | JSON header | padding | buffers
+
+The JSON header carries the format version, the CompiledModel metadata (scaler parameters,
+one-hot categories, forest description) and for every forest node array its dtype, shape and
+byte offset. Buffers are raw little-endian numpy data, each starting on a 64-byte boundary, so
+a local copy of the file can be memory-mapped and the arrays used in place, without parsing,
+copying or importing scikit-learn.
+"""
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import tempfile
+from typing import Union
+
+import numpy as np
+
+from src.entity.compiled_estimator import CompiledModel
+from src.exception import CustomException
+from src.logger import logging
+
+MODEL_ARTIFACT_MAGIC = b"CHURNMDL"
+MODEL_ARTIFACT_FORMAT_VERSION = 1
+MODEL_ARTIFACT_ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sQ")
+
+
+def _align(offset: int) -> int:
+    return -(-offset // MODEL_ARTIFACT_ALIGNMENT) * MODEL_ARTIFACT_ALIGNMENT
+
+
+def is_model_artifact(content: bytes) -> bool:
+    """
+    Tells a compiled model artifact from a pickle by its first bytes.
+    """
+    return bytes(content[:len(MODEL_ARTIFACT_MAGIC)]) == MODEL_ARTIFACT_MAGIC
+
+
+def write_model_artifact(file_path: str, compiled_model: CompiledModel) -> None:
+    """
+    Writes the compiled model artifact to file_path. The file is written under a temporary name
+    and renamed into place, so readers (and processes mapping the previous file) never see a
+    partially written artifact.
+    """
+    try:
+        arrays = [(name, np.ascontiguousarray(array, dtype=np.asarray(array).dtype.newbyteorder("<")))
+                  for name, array in sorted(compiled_model.arrays.items())]
+        # Buffer offsets depend on the header length, which depends on the offsets: lay the buffers
+        # out after a header sized with placeholder offsets, then pad the real header to that size
+        entries = [{"name": name, "dtype": array.dtype.str, "shape": list(array.shape), "offset": 0}
+                   for name, array in arrays]
+        header = {"format_version": MODEL_ARTIFACT_FORMAT_VERSION, "metadata": compiled_model.metadata,
+                  "arrays": entries}
+        header_size = len(json.dumps(header).encode("utf-8")) + 32 * len(entries)
+        offset = _align(_PREFIX.size + header_size)
+        for entry, (_, array) in zip(entries, arrays):
+            entry["offset"] = offset
+            offset = _align(offset + array.nbytes)
+        header_bytes = json.dumps(header).encode("utf-8").ljust(header_size)
+
+        directory = os.path.dirname(file_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(prefix=".model-", dir=directory)
+        try:
+            with os.fdopen(descriptor, "wb") as artifact_file:
+                artifact_file.write(_PREFIX.pack(MODEL_ARTIFACT_MAGIC, header_size))
+                artifact_file.write(header_bytes)
+                for entry, (_, array) in zip(entries, arrays):
+                    artifact_file.seek(entry["offset"])
+                    artifact_file.write(array.tobytes())
+                artifact_file.truncate(offset)
+            os.replace(temporary_path, file_path)
+        except Exception:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+def model_from_buffer(buffer: Union[bytes, memoryview, mmap.mmap]) -> CompiledModel:
+    """
+    Builds a CompiledModel whose node arrays are read-only views into the given artifact buffer.
+    """
+    try:
+        magic, header_size = _PREFIX.unpack_from(buffer, 0)
+        if magic != MODEL_ARTIFACT_MAGIC:
+            raise ValueError("Not a compiled model artifact")
+        header = json.loads(bytes(buffer[_PREFIX.size:_PREFIX.size + header_size]))
+        if header["format_version"] != MODEL_ARTIFACT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported model artifact format version {header['format_version']}")
+        arrays = {}
+        for entry in header["arrays"]:
+            dtype = np.dtype(entry["dtype"])
+            count = int(np.prod(entry["shape"], dtype=np.int64))
+            arrays[entry["name"]] = np.frombuffer(buffer, dtype=dtype, count=count,
+                                                  offset=entry["offset"]).reshape(entry["shape"])
+        return CompiledModel(metadata=header["metadata"], arrays=arrays)
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+def read_model_artifact(file_path: str) -> CompiledModel:
+    """
+    Memory-maps a compiled model artifact. Pages are loaded on first access and shared with every
+    other process mapping the same file.
+    """
+    try:
+        with open(file_path, "rb") as artifact_file:
+            buffer = mmap.mmap(artifact_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return model_from_buffer(buffer)
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+def load_model_file(file_path: str) -> object:
+    """
+    Loads a model file stored either as a compiled model artifact, which is memory-mapped, or as a pickle.
+    """
+    try:
+        with open(file_path, "rb") as model_file:
+            if is_model_artifact(model_file.read(len(MODEL_ARTIFACT_MAGIC))):
+                return read_model_artifact(file_path)
+            model_file.seek(0)
+            return pickle.load(model_file)
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+def convert_model_file(model_file_path: str, artifact_file_path: str) -> bool:
+    """
+    Converts a dill/pickle MyModel file into a compiled model artifact.
+    :return: False, without writing anything, if the model cannot be compiled or the compiled
+             model disagrees with MyModel.predict
+    """
+    # Imported here so reading artifacts never pulls in the training utilities
+    from src.utils.main_utils import load_object
+
+    try:
+        model = load_object(file_path=model_file_path)
+        try:
+            compiled_model = CompiledModel.from_model(model)
+        except ValueError as e:
+            logging.warning(f"Model {model_file_path} cannot be compiled: {e}")
+            return False
+        if not compiled_model.is_equivalent_to(model):
+            logging.warning(f"Compiled model disagrees with {model_file_path}, keeping the pickle")
+            return False
+        write_model_artifact(artifact_file_path, compiled_model)
+        logging.info(f"Converted {model_file_path} to compiled model artifact {artifact_file_path}")
+        return True
+    except Exception as e:
+        raise CustomException(e, sys) from e
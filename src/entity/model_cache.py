@@ -0,0 +1,225 @@
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
+
+from src.constants import (APP_WORKERS, MODEL_CACHE_COMPILE_ENABLED, MODEL_CACHE_REFRESH_INTERVAL_SECONDS,
+                           MODEL_CACHE_SHARED_MEMORY_DIR)
+from src.entity.compiled_estimator import CompiledModel
+from src.entity.estimator import MyModel
+from src.entity.s3_estimator import Proj1Estimator
+from src.entity.shared_model_store import SharedModelStore
+from src.exception import CustomException
+from src.logger import logging
+from src.metrics import MODEL_LOADS, stage_timer
+
+
+@dataclass(frozen=True)
+class ModelSnapshot:
+    # A CompiledModel mapped from shared memory serves predict/predict_proba like MyModel
+    model: Union[MyModel, CompiledModel]
+    version: str
+    loaded_at: float
+    compiled_model: Optional[CompiledModel] = None
+
+
+class ModelCache:
+    """
+    Process-wide, thread-safe holder for the production model.
+
+    The model is downloaded and unpickled once and then served from memory. A background
+    watcher compares the version tag (S3 version id / ETag) of the object in the bucket with
+    the one in memory and swaps in a freshly loaded model when ModelPusher publishes a new one.
+    Readers always see a complete snapshot, never a half-loaded model. Each snapshot also carries
+    a CompiledModel for the single-record fast path when the model compiles and passes the
+    equivalence check against MyModel.predict. When ModelPusher pushed a compiled model artifact
+    next to the pickle, that artifact is what gets loaded and whose version is watched.
+
+    With a SharedModelStore (multi-worker serving) the compiled model is published once per host
+    and every worker serves from the shared read-only arrays, so workers that find the segment of
+    the current version skip the download and unpickle. Models that cannot be compiled are still
+    loaded privately per worker.
+    """
+
+    def __init__(self, bucket_name: str, model_path: str,
+                 refresh_interval: float = MODEL_CACHE_REFRESH_INTERVAL_SECONDS, storage=None,
+                 shared_store: Optional[SharedModelStore] = None):
+        """
+        :param bucket_name: Name of your model bucket
+        :param model_path: Location of your model in bucket
+        :param refresh_interval: Seconds between version checks of the background watcher
+        :param storage: Storage service to load from instead of S3; may be set until the model is first used
+        :param shared_store: Host-wide store to share the compiled model through across worker processes
+        """
+        self.bucket_name = bucket_name
+        self.model_path = model_path
+        self.refresh_interval = refresh_interval
+        self.storage = storage
+        self.shared_store = shared_store
+        self._estimator: Optional[Proj1Estimator] = None
+        self._snapshot: Optional[ModelSnapshot] = None
+        self._load_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    @property
+    def estimator(self) -> Proj1Estimator:
+        if self._estimator is None:
+            self._estimator = Proj1Estimator(bucket_name=self.bucket_name, model_path=self.model_path,
+                                             storage=self.storage)
+        return self._estimator
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def version(self) -> Optional[str]:
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else None
+
+    def _load(self) -> ModelSnapshot:
+        if self.shared_store is not None and MODEL_CACHE_COMPILE_ENABLED:
+            return self._load_shared()
+        return self._load_private()
+
+    def _load_private(self) -> ModelSnapshot:
+        start = time.perf_counter()
+        with stage_timer("model_load"):
+            model, version = self.estimator.load_model_with_version()
+        MODEL_LOADS.inc(self.model_path)
+        logging.info(f"Loaded model {self.model_path} version {version} in {time.perf_counter() - start:.3f}s")
+        compiled_model = self._compile(model) if MODEL_CACHE_COMPILE_ENABLED else None
+        return ModelSnapshot(model=model, version=version, loaded_at=time.time(), compiled_model=compiled_model)
+
+    def _map_shared(self, version: str) -> Optional[ModelSnapshot]:
+        start = time.perf_counter()
+        with stage_timer("model_load"):
+            compiled_model = self.shared_store.load(version)
+        if compiled_model is None:
+            return None
+        MODEL_LOADS.inc(self.model_path)
+        logging.info(f"Mapped shared model {self.model_path} version {version} "
+                     f"in {time.perf_counter() - start:.3f}s")
+        return ModelSnapshot(model=compiled_model, version=version, loaded_at=time.time(),
+                             compiled_model=compiled_model)
+
+    def _load_shared(self) -> ModelSnapshot:
+        try:
+            version = self.estimator.get_model_version()
+        except Exception as e:
+            # Storage unreachable: the private load can still serve the last good cached version
+            logging.warning(f"Cannot look up the model version, loading {self.model_path} privately: {e}")
+            return self._load_private()
+        snapshot = self._map_shared(version) if version is not None else None
+        if snapshot is not None:
+            return snapshot
+        with self.shared_store.lock():
+            # Another worker may have published the segment while this one waited for the lock
+            snapshot = self._map_shared(version) if version is not None else None
+            if snapshot is not None:
+                return snapshot
+            snapshot = self._load_private()
+            if snapshot.compiled_model is None:
+                return snapshot
+            self.shared_store.publish(snapshot.version, snapshot.compiled_model)
+            self.shared_store.remove_stale(snapshot.version)
+        # Serve from the shared segment as well, so the private copy can be freed
+        return self._map_shared(snapshot.version) or snapshot
+
+    @staticmethod
+    def _compile(model: Union[MyModel, CompiledModel]) -> Optional[CompiledModel]:
+        if isinstance(model, CompiledModel):
+            # Loaded from a compiled model artifact
+            return model
+        try:
+            compiled_model = CompiledModel.from_model(model)
+        except Exception as e:
+            logging.info(f"Model cannot be compiled, serving through MyModel only: {e}")
+            return None
+        if not compiled_model.is_equivalent_to(model):
+            logging.warning("Compiled model disagrees with MyModel.predict, serving through MyModel only")
+            return None
+        return compiled_model
+
+    def get_snapshot(self) -> ModelSnapshot:
+        """
+        Returns the in-memory model snapshot, loading it on first use.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        try:
+            with self._load_lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load()
+                return self._snapshot
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_model(self) -> MyModel:
+        return self.get_snapshot().model
+
+    def refresh(self) -> bool:
+        """
+        Reloads the model if the object in the bucket has a different version than the one in memory.
+        :return: True if a new model was swapped in
+        """
+        try:
+            remote_version = self.estimator.get_model_version()
+            if remote_version is None or remote_version == self.version:
+                return False
+            with self._load_lock:
+                if remote_version == self.version:
+                    return False
+                snapshot = self._load()
+                previous_version = self.version
+                self._snapshot = snapshot
+            logging.info(f"Swapped model {self.model_path} from version {previous_version} to {snapshot.version}")
+            return True
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def _watch(self) -> None:
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.warning(f"Model version check failed, keeping version {self.version}: {e}")
+
+    def start_watcher(self) -> None:
+        """
+        Starts the background thread that polls the bucket for new model versions.
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-cache-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.refresh_interval)
+            self._watcher = None
+
+
+_model_caches: Dict[Tuple[str, str], ModelCache] = {}
+_model_caches_lock = threading.Lock()
+
+
+def get_model_cache(bucket_name: str, model_path: str) -> ModelCache:
+    """
+    Returns the process-wide ModelCache for the given bucket and model path.
+    When serving with several workers, the caches of all workers share the model through a SharedModelStore.
+    """
+    key = (bucket_name, model_path)
+    with _model_caches_lock:
+        if key not in _model_caches:
+            shared_store = None
+            if APP_WORKERS > 1:
+                shared_store = SharedModelStore(root_dir=MODEL_CACHE_SHARED_MEMORY_DIR, bucket_name=bucket_name,
+                                                model_path=model_path)
+            _model_caches[key] = ModelCache(bucket_name=bucket_name, model_path=model_path, shared_store=shared_store)
+        return _model_caches[key]
@@ -1,23 +1,35 @@
 from src.cloud_storage.aws_storage import SimpleStorageService
+from src.constants import COMPILED_MODEL_FILE_EXTENSION
 from src.exception import CustomException
 from src.entity.estimator import MyModel
+from src.entity.model_artifact import convert_model_file
+from src.logger import logging
+import os
 import sys
+import tempfile
+from typing import Optional, Tuple
 from pandas import DataFrame
 
 
 class Proj1Estimator:
     """
     This class is used to save and retrieve our model from s3 bucket and to do prediction
+
+    The dill pickle of MyModel always lives at model_path. A compiled model artifact, when pushed,
+    lives under its own key next to it (compiled_model_path) and is preferred by
+    load_model_with_version() and get_model_version(), which serving uses.
     """
 
-    def __init__(self,bucket_name,model_path,):
+    def __init__(self,bucket_name,model_path,storage=None):
         """
         :param bucket_name: Name of your model bucket
         :param model_path: Location of your model in bucket
+        :param storage: Storage service to use instead of S3, e.g. LocalStorageService
         """
         self.bucket_name = bucket_name
-        self.s3 = SimpleStorageService()
+        self.s3 = storage if storage is not None else SimpleStorageService()
         self.model_path = model_path
+        self.compiled_model_path = os.path.splitext(model_path)[0] + COMPILED_MODEL_FILE_EXTENSION
         self.loaded_model:MyModel=None
 
 
@@ -37,19 +49,67 @@ class Proj1Estimator:
 
         return self.s3.load_model(self.model_path,bucket_name=self.bucket_name)
 
-    def save_model(self,from_file,remove:bool=False)->None:
+    def get_model_version(self) -> Optional[str]:
+        """
+        Returns the version tag of the model load_model_with_version() currently loads
+        :return: S3 version id / ETag of the compiled artifact if present, else of the pickle, or None if no model is present
+        """
+        try:
+            version = self.s3.get_object_version(self.compiled_model_path, bucket_name=self.bucket_name)
+            if version is None:
+                version = self.s3.get_object_version(self.model_path, bucket_name=self.bucket_name)
+            return version
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def load_model_with_version(self) -> Tuple[MyModel, str]:
+        """
+        Load the model along with its version tag, from the compiled artifact if one was pushed, else from model_path
+        :return: loaded model and version tag
+        """
+        try:
+            model_path = self.model_path
+            if self.s3.get_object_version(self.compiled_model_path, bucket_name=self.bucket_name) is not None:
+                model_path = self.compiled_model_path
+            return self.s3.load_model_with_version(model_path, bucket_name=self.bucket_name)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def save_model(self,from_file,remove:bool=False,artifact_format:str="pickle")->None:
         """
         Save the model to the model_path
         :param from_file: Your local system model path
         :param remove: By default it is false that mean you will have your model locally available in your system folder
+        :param artifact_format: "pickle" uploads from_file as is, "compiled" also uploads it converted to the
+                                mmap-friendly compiled model artifact to compiled_model_path (only the pickle
+                                is uploaded if it cannot be compiled)
         :return:
         """
         try:
+            compiled_file = None
+            if artifact_format == "compiled":
+                descriptor, compiled_file = tempfile.mkstemp(suffix=COMPILED_MODEL_FILE_EXTENSION)
+                os.close(descriptor)
+                if not convert_model_file(from_file, compiled_file):
+                    os.remove(compiled_file)
+                    compiled_file = None
+            elif artifact_format != "pickle":
+                raise ValueError(f"Unknown model artifact format {artifact_format!r}")
+
+            # The pickle stays at model_path, for readers that predate the compiled artifact
             self.s3.upload_file(from_file,
                                 to_filename=self.model_path,
                                 bucket_name=self.bucket_name,
                                 remove=remove
                                 )
+            if compiled_file is None:
+                # Readers prefer the compiled artifact, one of an earlier model must not outlive it. Deleted
+                # only once the new pickle is in place, so a failed upload still leaves a model to serve
+                self.s3.delete_file(self.compiled_model_path, bucket_name=self.bucket_name)
+            else:
+                logging.info(f"Uploading {from_file} as compiled model artifact {self.compiled_model_path}")
+                self.s3.upload_file(compiled_file, to_filename=self.compiled_model_path, bucket_name=self.bucket_name,
+                                    remove=True)
         except Exception as e:
             raise CustomException(e, sys)
 
@@ -64,4 +124,16 @@ class Proj1Estimator:
                 self.loaded_model = self.load_model()
             return self.loaded_model.predict(dataframe=dataframe)
         except Exception as e:
-            raise CustomException(e, sys)
\ No newline at end of file
+            raise CustomException(e, sys)
+
+    def predict_proba(self,dataframe:DataFrame):
+        """
+        :param dataframe:
+        :return: probability of every class, in the order of the model classes
+        """
+        try:
+            if self.loaded_model is None:
+                self.loaded_model = self.load_model()
+            return self.loaded_model.predict_proba(dataframe=dataframe)
+        except Exception as e:
+            raise CustomException(e, sys)
@@ -0,0 +1,104 @@
+import contextlib
+import hashlib
+import os
+import sys
+from typing import Iterator, Optional
+
+from src.entity.compiled_estimator import CompiledModel
+from src.entity.model_artifact import read_model_artifact, write_model_artifact
+from src.exception import CustomException
+from src.logger import logging
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+def _digest(value: str, length: int) -> str:
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()[:length]
+
+
+class SharedModelStore:
+    """
+    Host-wide store of CompiledModel segments shared by every serving worker.
+
+    A segment is one compiled model artifact file per model version (see model_artifact). Workers
+    memory-map it read-only, so N workers share a single copy in the page cache instead of each
+    holding its own unpickled forest and preprocessor, and a worker that finds the segment of the
+    current version never downloads or unpickles the model at all.
+
+    Segments are written under a temporary name and renamed into place, so a segment is either
+    complete or absent. Publishing a new version swaps the segment: workers map the new file and
+    stale ones are unlinked, which leaves existing mappings valid until they are dropped.
+    An exclusive lock file makes a single worker build a missing segment while the others wait.
+    """
+
+    def __init__(self, root_dir: str, bucket_name: str, model_path: str):
+        """
+        :param root_dir: Directory holding the segments, preferably on tmpfs such as /dev/shm
+        :param bucket_name: Name of the model bucket, part of the segment key
+        :param model_path: Location of the model in the bucket, part of the segment key
+        """
+        self.root_dir = root_dir
+        self.namespace = _digest(f"{bucket_name}/{model_path}", 12)
+
+    def segment_path(self, version: str) -> str:
+        # Version tags (quoted ETags, version ids) are hashed into a safe file name
+        return os.path.join(self.root_dir, f"{self.namespace}-{_digest(version, 16)}.model")
+
+    @contextlib.contextmanager
+    def lock(self) -> Iterator[None]:
+        """
+        Holds the host-wide lock of this model while building and publishing a segment.
+        """
+        os.makedirs(self.root_dir, exist_ok=True)
+        with open(os.path.join(self.root_dir, f"{self.namespace}.lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self, version: str) -> Optional[CompiledModel]:
+        """
+        Maps the segment of the given model version.
+        :return: CompiledModel backed by read-only shared arrays, or None if the segment does not exist
+        """
+        segment_path = self.segment_path(version)
+        if not os.path.exists(segment_path):
+            return None
+        try:
+            return read_model_artifact(segment_path)
+        except Exception as e:
+            # Unlinked by a newer version between the check and the mapping
+            if not os.path.exists(segment_path):
+                return None
+            raise CustomException(e, sys) from e
+
+    def publish(self, version: str, compiled_model: CompiledModel) -> None:
+        """
+        Writes the segment of the given model version and moves it into place atomically.
+        """
+        try:
+            segment_path = self.segment_path(version)
+            if os.path.exists(segment_path):
+                return
+            write_model_artifact(segment_path, compiled_model)
+            logging.info(f"Published shared model segment {segment_path} for version {version}")
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def remove_stale(self, version: str) -> None:
+        """
+        Unlinks the segments of every other version of this model.
+        """
+        keep = os.path.basename(self.segment_path(version))
+        for name in os.listdir(self.root_dir):
+            if name.startswith(f"{self.namespace}-") and name != keep:
+                path = os.path.join(self.root_dir, name)
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+                logging.info(f"Removed stale shared model segment {path}")
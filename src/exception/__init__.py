@@ -1,5 +1,22 @@
 import sys
 import logging
+from typing import Tuple
+
+# Template of the detailed error message; arguments are file name, line number and error
+ERROR_MESSAGE_TEMPLATE = "Error occurred in python script: [%s] at line number [%s]: %s"
+
+def error_location(error_detail: sys) -> Tuple[str, int]:
+    """
+    Returns the file name and line number where the exception currently being handled occurred.
+
+    :param error_detail: The sys module to access traceback details.
+    :return: (file name, line number)
+    """
+    # Extract traceback details (exception information)
+    _, _, exc_tb = error_detail.exc_info()
+    if exc_tb is None:
+        return "<unknown>", 0
+    return exc_tb.tb_frame.f_code.co_filename, exc_tb.tb_lineno
 
 def error_message_detail(error: Exception, error_detail: sys) -> str:
     """
@@ -9,20 +26,12 @@ def error_message_detail(error: Exception, error_detail: sys) -> str:
     :param error_detail: The sys module to access traceback details.
     :return: A formatted error message string.
     """
-    # Extract traceback details (exception information)
-    _, _, exc_tb = error_detail.exc_info()
-
-    # Get the file name where the exception occurred
-    file_name = exc_tb.tb_frame.f_code.co_filename
+    file_name, line_number = error_location(error_detail)
 
-    # Create a formatted error message string with file name, line number, and the actual error
-    line_number = exc_tb.tb_lineno
-    error_message = f"Error occurred in python script: [{file_name}] at line number [{line_number}]: {str(error)}"
-    
     # Log the error for better tracking
-    logging.error(error_message)
-    
-    return error_message
+    logging.error(ERROR_MESSAGE_TEMPLATE, file_name, line_number, error)
+
+    return ERROR_MESSAGE_TEMPLATE % (file_name, line_number, error)
 
 class CustomException(Exception):
     """
@@ -32,17 +41,41 @@ class CustomException(Exception):
         """
         Initializes the USvisaException with a detailed error message.
 
+        Only the location is captured here; the detailed message is formatted on first use. When the
+        error is already a CustomException raised by a nested stage, its location and message are kept
+        and it is not logged again.
+
         :param error_message: A string describing the error.
         :param error_detail: The sys module to access traceback details.
         """
         # Call the base class constructor with the error message
         super().__init__(error_message)
 
-        # Format the detailed error message using the error_message_detail function
-        self.error_message = error_message_detail(error_message, error_detail)
+        if isinstance(error_message, CustomException):
+            self.error = error_message.error
+            self.file_name = error_message.file_name
+            self.line_number = error_message.line_number
+            self._error_message = error_message._error_message
+            return
+
+        self.error = error_message
+        self.file_name, self.line_number = error_location(error_detail)
+        self._error_message = None
+
+        # Log the error for better tracking; the handler formats it only if the record is emitted
+        logging.error(ERROR_MESSAGE_TEMPLATE, self.file_name, self.line_number, self.error)
+
+    @property
+    def error_message(self) -> str:
+        """
+        The detailed error message, formatted once on first access.
+        """
+        if self._error_message is None:
+            self._error_message = ERROR_MESSAGE_TEMPLATE % (self.file_name, self.line_number, self.error)
+        return self._error_message
 
     def __str__(self) -> str:
         """
         Returns the string representation of the error message.
         """
-        return self.error_message
\ No newline at end of file
+        return self.error_message
@@ -1,6 +1,10 @@
+import atexit
+import itertools
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
 from from_root import from_root
 from datetime import datetime
 
@@ -11,24 +15,78 @@ MAX_LOG_SIZE = 5 * 1024 * 1024  # 5 MB
 BACKUP_COUNT = 3  # Number of backup log files to keep
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
 
-# Construct log file path
+# Runtime settings, overridable through environment variables
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Hand records to a background thread that does the formatting and disk writes
+LOG_QUEUE_ENABLED = os.getenv("LOG_QUEUE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Only every Nth record of the per-request hot-path logger is kept
+HOT_PATH_LOG_SAMPLE_EVERY = int(os.getenv("HOT_PATH_LOG_SAMPLE_EVERY", "100"))
+HOT_PATH_LOGGER_NAME = "hot_path"
+
+# Construct log file path; the directory and file are only created when the first record is written
 log_dir_path = os.path.join(ROOT_DIR, LOG_DIR)
-os.makedirs(log_dir_path, exist_ok=True)
 log_file_path = os.path.join(log_dir_path, LOG_FILE)
 
-def configure_logger():
+class LazyRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotating file handler that creates its log directory and file on the first emitted record
+    instead of at import time.
+    """
+    def __init__(self, filename, *args, **kwargs):
+        super().__init__(filename, *args, delay=True, **kwargs)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one record out of every `every`, so per-request messages cost almost nothing under load
+    while still showing up in the log.
+    """
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return next(self._counter) % self.every == 0
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that enqueues records as they are. Unlike QueueHandler it does not format the
+    message in the calling thread; the listener thread formats it when writing it out.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+_queue_listener: Optional[QueueListener] = None
+
+def _stop_queue_listener():
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+def configure_logger(level: str = LOG_LEVEL, use_queue: bool = LOG_QUEUE_ENABLED,
+                     hot_path_sample_every: int = HOT_PATH_LOG_SAMPLE_EVERY):
     """
     Configures logging with a rotating file handler and a console handler.
+    In queue mode the root logger only enqueues records and a QueueListener thread writes them,
+    so request threads never block on disk or console I/O.
     """
+    global _queue_listener
+    _stop_queue_listener()
+
     # Create a custom logger
     logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(level)
     
     # Define formatter
     formatter = logging.Formatter("[ %(asctime)s ] %(name)s - %(levelname)s - %(message)s")
 
     # File handler with rotation
-    file_handler = RotatingFileHandler(log_file_path, maxBytes=MAX_LOG_SIZE, backupCount=BACKUP_COUNT)
+    file_handler = LazyRotatingFileHandler(log_file_path, maxBytes=MAX_LOG_SIZE, backupCount=BACKUP_COUNT)
     file_handler.setFormatter(formatter)
     file_handler.setLevel(logging.DEBUG)
     
@@ -41,8 +99,24 @@ def configure_logger():
         logger.handlers.clear()
     
     # Add handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(DeferredQueueHandler(log_queue))
+        _queue_listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        _queue_listener.start()
+    else:
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
+
+    # Per-request messages go through a sampled child of the root logger
+    hot_path_logger = logging.getLogger(HOT_PATH_LOGGER_NAME)
+    hot_path_logger.filters.clear()
+    hot_path_logger.addFilter(SamplingFilter(hot_path_sample_every))
 
 # Configure the logger
-configure_logger()
\ No newline at end of file
+configure_logger()
+# Flush queued records on interpreter exit
+atexit.register(_stop_queue_listener)
+
+# Logger for messages emitted on every prediction request; only a sample of them is kept
+hot_path_logger = logging.getLogger(HOT_PATH_LOGGER_NAME)
@@ -0,0 +1,170 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Sequence, Tuple
+
+# Default latency buckets in seconds, from 50us up to 10s
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """
+    Monotonically increasing counter, optionally split by label values.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labelvalues, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed buckets, optionally split by label values.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labelvalues -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labelvalues)
+            if series is None:
+                series = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labelvalues: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labelvalues, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    labels = _format_labels(self.labelnames, labelvalues, 'le="' + le + '"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, labelvalues)
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds every metric of the process and renders them in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_LATENCY = registry.histogram(
+    "churn_request_stage_seconds",
+    "Time spent in each stage of a prediction request.",
+    labelnames=("stage",))
+INFERENCE_POOL_WAIT = registry.histogram(
+    "churn_inference_pool_wait_seconds",
+    "Time inference tasks waited for a free pool thread.")
+INFERENCE_POOL_COMPUTE = registry.histogram(
+    "churn_inference_pool_compute_seconds",
+    "Time inference tasks spent running on a pool thread.")
+MODEL_LOADS = registry.counter(
+    "churn_model_loads_total",
+    "Number of models loaded from storage.",
+    labelnames=("model_path",))
+PREDICTION_CACHE_LOOKUPS = registry.counter(
+    "churn_prediction_cache_lookups_total",
+    "Prediction cache lookups by result.",
+    labelnames=("result",))
+ERRORS = registry.counter(
+    "churn_errors_total",
+    "Number of failed requests by route.",
+    labelnames=("route",))
+SHADOW_PREDICTIONS = registry.counter(
+    "churn_shadow_predictions_total",
+    "Shadow model predictions compared with production, by agreement.",
+    labelnames=("result",))
+SHADOW_LATENCY = registry.histogram(
+    "churn_shadow_predict_seconds",
+    "Time the shadow model took to score a sampled request.")
+
+_stage_timing = threading.local()
+
+
+def disable_stage_timers() -> None:
+    """
+    Stops stage_timer from recording on the calling thread, for threads whose work is not part
+    of a request (e.g. shadow scoring) and would skew the request stage latencies.
+    """
+    _stage_timing.disabled = True
+
+
+def stage_timer(stage: str):
+    """
+    Context manager recording the duration of a request stage, e.g. `with stage_timer("render"):`.
+    """
+    if getattr(_stage_timing, "disabled", False):
+        return nullcontext()
+    return STAGE_LATENCY.time(stage)
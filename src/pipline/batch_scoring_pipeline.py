@@ -0,0 +1,148 @@
+import multiprocessing
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Deque, Optional, Tuple
+
+import dill
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+
+from src.constants import SCHEMA_FILE_PATH
+from src.data_access.CustomerData import CustomerData
+from src.entity.artifact_entity import BatchScoringArtifact
+from src.entity.config_entity import BatchScoringConfig
+from src.entity.estimator import MyModel
+from src.entity.s3_estimator import Proj1Estimator
+from src.exception import CustomException
+from src.logger import logging
+from src.utils.main_utils import read_yaml_file
+
+# Model held by each worker process of the scoring pool
+_worker_model: Optional[MyModel] = None
+
+
+def _init_worker(model_bytes: bytes) -> None:
+    global _worker_model
+    _worker_model = dill.loads(model_bytes)
+
+
+def _score_chunk(features: pd.DataFrame) -> np.ndarray:
+    return np.asarray(_worker_model.predict(features))
+
+
+class BatchScoringPipeline:
+    def __init__(self, batch_scoring_config: BatchScoringConfig = BatchScoringConfig(),
+                 customer_data: Optional[CustomerData] = None,
+                 model: Optional[MyModel] = None, model_version: Optional[str] = None):
+        """
+        :param batch_scoring_config: Configuration for batch scoring
+        :param customer_data: Access to the customer collection, created from MONGODB_URL when omitted
+        :param model: Model to score with, the production model from S3 is loaded when omitted
+        :param model_version: Version tag recorded for an explicitly given model
+        """
+        try:
+            self.batch_scoring_config = batch_scoring_config
+            self.customer_data = customer_data
+            self.model = model
+            self.model_version = model_version
+            self._schema_config = read_yaml_file(file_path=SCHEMA_FILE_PATH)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def get_model(self) -> Tuple[MyModel, str]:
+        """
+        Method Name :   get_model
+        Description :   This method returns the model to score with and its version tag
+
+        Output      :   Returns the explicitly given model or the production model from S3
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            if self.model is None:
+                estimator = Proj1Estimator(bucket_name=self.batch_scoring_config.model_bucket_name,
+                                           model_path=self.batch_scoring_config.model_file_path)
+                self.model, self.model_version = estimator.load_model_with_version()
+            return self.model, self.model_version or "local"
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def _get_features(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        numerical_features = self._schema_config["numerical_features"]
+        features = chunk[numerical_features + self._schema_config["categorical_features"]].copy()
+        for column in numerical_features:
+            features[column] = pd.to_numeric(features[column], errors="coerce")
+        return features
+
+    def _write_predictions(self, collection, ids: np.ndarray, predictions: np.ndarray, scored_at: datetime) -> int:
+        operations = [
+            UpdateOne({"_id": _id}, {"$set": {self.batch_scoring_config.prediction_field: int(prediction),
+                                              self.batch_scoring_config.scored_at_field: scored_at}})
+            for _id, prediction in zip(ids, predictions)
+        ]
+        if not operations:
+            return 0
+        collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    def run_pipeline(self) -> BatchScoringArtifact:
+        """
+        Method Name :   run_pipeline
+        Description :   This method scores the whole customer collection chunk by chunk. Chunks are read
+                        through one server-side cursor, scored on a process pool and the predictions are
+                        written back with unordered bulk writes. At most two chunks per worker are in
+                        flight, so memory stays bounded by the chunk size.
+
+        Output      :   Returns batch scoring artifact
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        logging.info("Entered run_pipeline method of BatchScoringPipeline class")
+        try:
+            config = self.batch_scoring_config
+            if self.customer_data is None:
+                self.customer_data = CustomerData()
+            collection = self.customer_data.get_collection(config.collection_name)
+            model, model_version = self.get_model()
+            scored_at = datetime.now(timezone.utc)
+            logging.info(f"Scoring collection {config.collection_name} with model version {model_version}")
+
+            columns = self._schema_config["numerical_features"] + self._schema_config["categorical_features"]
+            chunks = self.customer_data.iter_collection_chunks(collection_name=config.collection_name,
+                                                               chunk_size=config.chunk_size, columns=columns)
+            scored_count, chunk_count = 0, 0
+
+            if config.max_workers <= 1:
+                for chunk in chunks:
+                    predictions = np.asarray(model.predict(self._get_features(chunk)))
+                    scored_count += self._write_predictions(collection, chunk["_id"].to_numpy(), predictions, scored_at)
+                    chunk_count += 1
+            else:
+                in_flight: Deque[Tuple[np.ndarray, Future]] = deque()
+                # Spawned (not forked) workers: forking a parent whose OpenMP/BLAS thread pools are
+                # already running can deadlock the children
+                with ProcessPoolExecutor(max_workers=config.max_workers,
+                                         mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_init_worker,
+                                         initargs=(dill.dumps(model),)) as executor:
+                    for chunk in chunks:
+                        in_flight.append((chunk["_id"].to_numpy(), executor.submit(_score_chunk, self._get_features(chunk))))
+                        chunk_count += 1
+                        if len(in_flight) >= 2 * config.max_workers:
+                            ids, future = in_flight.popleft()
+                            scored_count += self._write_predictions(collection, ids, future.result(), scored_at)
+                    while in_flight:
+                        ids, future = in_flight.popleft()
+                        scored_count += self._write_predictions(collection, ids, future.result(), scored_at)
+
+            batch_scoring_artifact = BatchScoringArtifact(collection_name=config.collection_name,
+                                                          model_version=model_version,
+                                                          scored_count=scored_count,
+                                                          chunk_count=chunk_count,
+                                                          scored_at=scored_at.isoformat())
+            logging.info(f"Batch scoring artifact: {batch_scoring_artifact}")
+            logging.info("Exited run_pipeline method of BatchScoringPipeline class")
+            return batch_scoring_artifact
+        except Exception as e:
+            raise CustomException(e, sys) from e
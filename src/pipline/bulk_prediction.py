@@ -0,0 +1,205 @@
+import asyncio
+import csv
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import anyio
+from pandas import DataFrame
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from src.constants import PREDICTION_CSV_CHUNK_ROWS
+from src.logger import logging
+from src.pipline.inference_executor import InferenceExecutor
+from src.pipline.prediction_pipeline import get_feature_decoder
+from src.pipline.request_decoder import FeatureDecoder, RequestValidationError
+
+ID_COLUMN = "customerID"
+
+
+class CsvStreamScorer:
+    """
+    Scores a CSV upload while it is still arriving.
+
+    The byte stream is cut at line boundaries into chunks of roughly `chunk_rows` rows; each
+    chunk is parsed, validated by the FeatureDecoder of the JSON routes, scored with one model
+    call and turned into CSV output before the next chunk is read. Memory therefore stays bounded
+    by the chunk size no matter how large the upload is. Rows the decoder rejects are not scored;
+    their output line has no prediction and lists the problems in the error column instead.
+    Records must not contain line breaks inside quoted fields.
+    """
+
+    def __init__(self, byte_stream: AsyncIterator[bytes], predict_fn: Callable[[DataFrame], Sequence],
+                 executor: Optional[InferenceExecutor] = None, chunk_rows: int = PREDICTION_CSV_CHUNK_ROWS,
+                 feature_decoder: Optional[FeatureDecoder] = None):
+        """
+        :param byte_stream: Incoming request body
+        :param predict_fn: Function scoring a DataFrame of model inputs
+        :param executor: Optional pool the chunks are parsed and scored on
+        :param chunk_rows: Approximate number of rows scored per model call
+        :param feature_decoder: Decoder validating the rows, defaults to the one generated from the schema
+        """
+        self.byte_stream = byte_stream
+        self.predict_fn = predict_fn
+        self.executor = executor
+        self.chunk_rows = chunk_rows
+        self.feature_decoder = feature_decoder if feature_decoder is not None else get_feature_decoder()
+        self.columns: List[str] = []
+        self.rows_scored = 0
+        self.rows_rejected = 0
+        # Set once the whole request body is read, from then on a client disconnect can be listened for
+        self.body_read = asyncio.Event()
+        self._lines_read = 0
+        self._buffer = b""
+
+    async def read_header(self) -> List[str]:
+        """
+        Reads and validates the header line. Must be awaited before iter_predictions.
+        """
+        async for block in self.byte_stream:
+            self._buffer += block
+            if b"\n" in self._buffer:
+                break
+        header_line, _, self._buffer = self._buffer.partition(b"\n")
+        self.columns = next(csv.reader([header_line.decode("utf-8-sig").strip()]), [])
+        missing_columns = [column for column in self.feature_decoder.input_columns if column not in self.columns]
+        if missing_columns:
+            raise ValueError(f"CSV header is missing columns: {missing_columns}")
+        return self.columns
+
+    def _decode_chunk(self, payloads: List[dict]) -> Tuple[List[dict], Dict[int, List[str]]]:
+        """
+        Returns the typed records of the valid rows of a chunk and the problems of every rejected row by index.
+        """
+        try:
+            return self.feature_decoder.decode_many(payloads), {}
+        except RequestValidationError as e:
+            rejected = e.record_errors
+            valid_payloads = [payload for index, payload in enumerate(payloads) if index not in rejected]
+            return self.feature_decoder.decode_many(valid_payloads), rejected
+
+    def _score_chunk(self, data: bytes, first_row: int) -> Tuple[str, int, int, int]:
+        """
+        Scores the lines of one chunk. Rows are numbered by their line in the upload (header excluded,
+        first_row lines before this chunk), so skipped blank lines do not shift the numbers of later rows.
+        Returns: CSV output, number of lines, of rows and of rejected rows
+        """
+        lines = data.decode("utf-8", errors="replace").split("\n")
+        if not lines[-1]:
+            # Every chunk but the last one ends at a line break
+            lines.pop()
+        row_numbers, ids, row_errors = [], [], []
+        # Values stay strings, blanks included, so they are decoded exactly like JSON payloads
+        payloads, payload_rows = [], []
+        for line_number, line in enumerate(lines, start=first_row):
+            # Each line is parsed on its own: a malformed one is rejected without shifting the others
+            fields = next(csv.reader([line.rstrip("\r")]), [])
+            if not fields:
+                continue
+            row_numbers.append(line_number)
+            if len(fields) != len(self.columns):
+                ids.append("")
+                row_errors.append([f"expected {len(self.columns)} fields, got {len(fields)}"])
+                continue
+            row = dict(zip(self.columns, fields))
+            ids.append(row.get(ID_COLUMN, ""))
+            row_errors.append([])
+            payloads.append({column: row[column] for column in self.feature_decoder.input_columns})
+            payload_rows.append(len(row_numbers) - 1)
+
+        records, rejected = self._decode_chunk(payloads)
+        for index, problems in rejected.items():
+            row_errors[payload_rows[index]] = problems
+
+        predictions = [""] * len(row_numbers)
+        if records:
+            scored = self.predict_fn(DataFrame(records, columns=list(self.feature_decoder.input_columns)))
+            valid_rows = [row for index, row in enumerate(payload_rows) if index not in rejected]
+            for row, prediction in zip(valid_rows, scored):
+                predictions[row] = int(prediction)
+
+        output = DataFrame({"row": row_numbers})
+        if ID_COLUMN in self.columns:
+            output[ID_COLUMN] = ids
+        output["prediction"] = predictions
+        output["error"] = ["; ".join(problems) for problems in row_errors]
+        n_rejected = sum(1 for problems in row_errors if problems)
+        return output.to_csv(index=False, header=False), len(lines), len(row_numbers), n_rejected
+
+    async def _run_chunk(self, data: bytes) -> str:
+        if self.executor is None:
+            text, n_lines, n_rows, n_rejected = self._score_chunk(data, self._lines_read)
+        else:
+            text, n_lines, n_rows, n_rejected = await self.executor.run(self._score_chunk, data, self._lines_read)
+        self._lines_read += n_lines
+        self.rows_scored += n_rows
+        self.rows_rejected += n_rejected
+        return text
+
+    async def iter_predictions(self) -> AsyncIterator[str]:
+        """
+        Yields CSV text with row, customerID (when present), prediction and error columns, chunk by chunk.
+        """
+        yield "row," + (ID_COLUMN + "," if ID_COLUMN in self.columns else "") + "prediction,error\n"
+
+        async for block in self.byte_stream:
+            self._buffer += block
+            if self._buffer.count(b"\n") < self.chunk_rows:
+                continue
+            cut = self._buffer.rfind(b"\n") + 1
+            data, self._buffer = self._buffer[:cut], self._buffer[cut:]
+            yield await self._run_chunk(data)
+        self.body_read.set()
+
+        if self._buffer.strip():
+            data, self._buffer = self._buffer, b""
+            yield await self._run_chunk(data)
+        logging.info(f"Scored {self.rows_scored - self.rows_rejected} rows from streamed CSV upload, "
+                     f"rejected {self.rows_rejected}")
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that lets the body iterator keep reading the request while the response
+    is sent. The stock response listens for client disconnects on `receive`, which would
+    swallow the request body chunks that CsvStreamScorer is still consuming. Until the body
+    is read, a disconnect surfaces as ClientDisconnect from the request stream; after that,
+    `receive` is listened on as usual. Either way the body iterator is stopped, so an
+    abandoned upload is not scored to the end.
+    """
+
+    def __init__(self, content, body_read: asyncio.Event, **kwargs):
+        """
+        :param content: Body iterator, reading the request body
+        :param body_read: Event set once the body iterator has read the whole request body
+        """
+        super().__init__(content, **kwargs)
+        self.body_read = body_read
+
+    async def _listen_for_disconnect_after_body(self, receive: Receive) -> None:
+        await self.body_read.wait()
+        await self.listen_for_disconnect(receive)
+        logging.info("Client disconnected, stopped streaming the response")
+
+    async def _stream_response(self, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except ClientDisconnect:
+            logging.info("Client disconnected during the upload, stopped streaming the response")
+        except OSError:
+            # Sending to a closed connection
+            logging.info("Client disconnected, stopped streaming the response")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async with anyio.create_task_group() as task_group:
+
+            async def wrap(func: Callable[[], Awaitable[None]]) -> None:
+                await func()
+                task_group.cancel_scope.cancel()
+
+            task_group.start_soon(wrap, partial(self._stream_response, send))
+            await wrap(partial(self._listen_for_disconnect_after_body, receive))
+
+        if self.background is not None:
+            await self.background()
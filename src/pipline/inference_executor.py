@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from src.constants import INFERENCE_POOL_MAX_QUEUE_DEPTH, INFERENCE_POOL_MAX_WORKERS
+from src.metrics import INFERENCE_POOL_COMPUTE, INFERENCE_POOL_WAIT
+
+
+class InferencePoolFullError(Exception):
+    """
+    Raised when the inference pool already holds as many tasks as it is allowed to queue.
+    """
+
+
+class InferenceExecutor:
+    """
+    Bounded thread pool that keeps blocking model calls (S3 load, unpickling, scikit-learn
+    inference) off the asyncio event loop.
+
+    At most `max_workers` tasks run at once and at most `max_queue_depth` more wait for a
+    worker; further submissions are rejected immediately instead of piling up. For every
+    task the time spent waiting for a worker and the time spent computing are recorded
+    separately.
+    """
+
+    def __init__(self, max_workers: int = INFERENCE_POOL_MAX_WORKERS,
+                 max_queue_depth: int = INFERENCE_POOL_MAX_QUEUE_DEPTH):
+        """
+        :param max_workers: Number of inference threads
+        :param max_queue_depth: Number of tasks allowed to wait for a free thread
+        """
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue_depth)
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds_total = 0.0
+        self._compute_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._compute_seconds_max = 0.0
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs) on the pool and awaits its result without blocking the event loop.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._rejected += 1
+            raise InferencePoolFullError(
+                f"Inference pool is full ({self.max_workers} running, {self.max_queue_depth} queued)")
+
+        submitted_at = time.perf_counter()
+        with self._stats_lock:
+            self._in_flight += 1
+
+        def task():
+            started_at = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._record(wait_seconds=started_at - submitted_at,
+                             compute_seconds=time.perf_counter() - started_at)
+
+        try:
+            future = self._executor.submit(task)
+        except Exception:
+            self._release_slot()
+            raise
+        # Released when the task is done rather than when the caller stops waiting: a cancelled caller
+        # leaves a running task behind, and it keeps its worker until it returns
+        future.add_done_callback(lambda _: self._release_slot())
+        return await asyncio.wrap_future(future)
+
+    def _release_slot(self) -> None:
+        with self._stats_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _record(self, wait_seconds: float, compute_seconds: float) -> None:
+        INFERENCE_POOL_WAIT.observe(wait_seconds)
+        INFERENCE_POOL_COMPUTE.observe(compute_seconds)
+        with self._stats_lock:
+            self._completed += 1
+            self._wait_seconds_total += wait_seconds
+            self._compute_seconds_total += compute_seconds
+            self._wait_seconds_max = max(self._wait_seconds_max, wait_seconds)
+            self._compute_seconds_max = max(self._compute_seconds_max, compute_seconds)
+
+    def get_stats(self) -> dict:
+        """
+        Returns pool configuration plus the accumulated pool-wait versus compute split.
+        """
+        with self._stats_lock:
+            completed = self._completed
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_depth": self.max_queue_depth,
+                "in_flight": self._in_flight,
+                "completed": completed,
+                "rejected": self._rejected,
+                "wait_seconds_total": self._wait_seconds_total,
+                "compute_seconds_total": self._compute_seconds_total,
+                "wait_seconds_avg": self._wait_seconds_total / completed if completed else 0.0,
+                "compute_seconds_avg": self._compute_seconds_total / completed if completed else 0.0,
+                "wait_seconds_max": self._wait_seconds_max,
+                "compute_seconds_max": self._compute_seconds_max,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
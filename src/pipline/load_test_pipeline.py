@@ -0,0 +1,258 @@
+import asyncio
+import itertools
+import json
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import List, Optional, Tuple
+from urllib.parse import urlencode
+
+import dill
+import numpy as np
+import pandas as pd
+
+from src.cloud_storage.local_storage import LocalStorageService
+from src.constants import TARGET_COLUMN
+from src.entity.artifact_entity import LoadTestArtifact
+from src.entity.config_entity import LoadTestConfig, ModelTrainerConfig
+from src.entity.estimator import MyModel
+from src.entity.s3_estimator import Proj1Estimator
+from src.exception import CustomException
+from src.logger import logging
+
+# route name -> (HTTP path, payload shape)
+LOAD_TEST_ROUTES = {
+    "form": ("/", "form"),
+    "predict": ("/predict", "record"),
+    "batch": ("/predict/batch", "records"),
+    "rank": ("/predict/rank", "rank"),
+}
+
+# Seconds to wait for the in-process app to report ready
+READY_TIMEOUT_SECONDS = 120
+
+
+def fit_model(dataframe: pd.DataFrame, n_estimators: Optional[int] = None) -> MyModel:
+    """
+    Fits a model with the production preprocessing and RandomForest hyperparameters on the given
+    rows, so the load test serves a model of realistic size without S3 or MongoDB.
+    n_estimators overrides the number of trees, e.g. to benchmark larger forests.
+    """
+    # Training-only imports, kept off the import path of the load test itself
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import LabelEncoder
+    from src.components.data_transformation import DataTransformation
+
+    transformation = DataTransformation(data_ingestion_artifact=None, data_transformation_config=None,
+                                        data_validation_artifact=None)
+    features = transformation._drop_column(transformation._change_dtype(dataframe.drop(columns=[TARGET_COLUMN])))
+    target = LabelEncoder().fit_transform(dataframe[TARGET_COLUMN])
+    preprocessor = transformation.get_data_transformer_object()
+    trained_model = RandomForestClassifier(
+        n_estimators=n_estimators or ModelTrainerConfig._n_estimators,
+        min_samples_split=ModelTrainerConfig._min_samples_split,
+        min_samples_leaf=ModelTrainerConfig._min_samples_leaf,
+        max_depth=ModelTrainerConfig._max_depth,
+        criterion=ModelTrainerConfig._criterion,
+        random_state=ModelTrainerConfig._random_state,
+    )
+    trained_model.fit(preprocessor.fit_transform(features), target)
+    return MyModel(preprocessing_object=preprocessor, trained_model_object=trained_model)
+
+
+class LoadTestPipeline:
+    def __init__(self, load_test_config: LoadTestConfig = LoadTestConfig()):
+        """
+        :param load_test_config: Configuration for the load test
+        """
+        try:
+            if load_test_config.route not in LOAD_TEST_ROUTES:
+                raise ValueError(f"Unknown route {load_test_config.route!r}, expected one of {sorted(LOAD_TEST_ROUTES)}")
+            self.load_test_config = load_test_config
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_rows(self) -> pd.DataFrame:
+        """
+        Method Name :   get_rows
+        Description :   This method reads the customer rows requests are sampled from
+
+        Output      :   Returns the rows of the data file, target column included
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            return pd.read_csv(self.load_test_config.data_file_path)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def build_requests(self, dataframe: pd.DataFrame, n_requests: int) -> List[Tuple[bytes, str, int]]:
+        """
+        Method Name :   build_requests
+        Description :   This method samples rows (with replacement) into pre-encoded request bodies, so
+                        client-side serialization is not part of the measured latency
+
+        Output      :   Returns (body, content type, rows in request) per request
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            config = self.load_test_config
+            rows = dataframe.drop(columns=[TARGET_COLUMN])
+            rows["TotalCharges"] = pd.to_numeric(rows["TotalCharges"], errors="coerce")
+            records = [{key: (None if isinstance(value, float) and np.isnan(value) else value)
+                        for key, value in record.items()} for record in rows.to_dict("records")]
+            rng = np.random.default_rng(config.random_state)
+            shape = LOAD_TEST_ROUTES[config.route][1]
+            rows_per_request = config.batch_size if shape in ("records", "rank") else 1
+
+            requests = []
+            for sample in rng.integers(0, len(records), size=(n_requests, rows_per_request)):
+                sampled = [records[index] for index in sample]
+                if shape == "form":
+                    form = {key: "" if value is None else str(value) for key, value in sampled[0].items()}
+                    requests.append((urlencode(form).encode(), "application/x-www-form-urlencoded", 1))
+                elif shape == "record":
+                    requests.append((json.dumps(sampled[0]).encode(), "application/json", 1))
+                elif shape == "records":
+                    requests.append((json.dumps(sampled).encode(), "application/json", rows_per_request))
+                else:
+                    body = {"records": sampled, "k": max(1, rows_per_request // 10)}
+                    requests.append((json.dumps(body).encode(), "application/json", rows_per_request))
+            return requests
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def _is_error(response) -> bool:
+        if response.status_code >= 400:
+            return True
+        if response.headers.get("content-type", "").startswith("application/json"):
+            body = response.json()
+            return isinstance(body, dict) and body.get("status") is False
+        return False
+
+    async def _drive(self, client, requests: List[Tuple[bytes, str, int]]) -> Tuple[list, Counter, float]:
+        path = LOAD_TEST_ROUTES[self.load_test_config.route][0]
+        latencies, status_codes = [], Counter()
+        next_request = itertools.count()
+
+        async def worker():
+            while True:
+                index = next(next_request)
+                if index >= len(requests):
+                    return
+                body, content_type, _ = requests[index]
+                start = time.perf_counter()
+                try:
+                    response = await client.post(path, content=body, headers={"content-type": content_type})
+                    status = "error" if self._is_error(response) else str(response.status_code)
+                except Exception as e:
+                    logging.warning(f"Load test request failed: {e}")
+                    status = "exception"
+                latencies.append(time.perf_counter() - start)
+                status_codes[status] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.load_test_config.concurrency)))
+        return latencies, status_codes, time.perf_counter() - start
+
+    async def _wait_until_ready(self, client) -> None:
+        deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+        while (await client.get("/health/ready")).status_code != 200:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"App did not become ready within {READY_TIMEOUT_SECONDS}s")
+            await asyncio.sleep(0.1)
+
+    async def _run(self, client, dataframe: pd.DataFrame) -> LoadTestArtifact:
+        config = self.load_test_config
+        await self._wait_until_ready(client)
+        if config.warmup_requests:
+            await self._drive(client, self.build_requests(dataframe, config.warmup_requests))
+
+        requests = self.build_requests(dataframe, config.requests)
+        latencies, status_codes, duration = await self._drive(client, requests)
+
+        errors = sum(count for status, count in status_codes.items() if not status.startswith("2"))
+        latencies_ms = np.asarray(latencies) * 1000
+        p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+        rows_per_request = requests[0][2]
+        return LoadTestArtifact(
+            route=config.route,
+            target=config.base_url or "in-process",
+            concurrency=config.concurrency,
+            requests=len(requests),
+            rows_per_request=rows_per_request,
+            errors=errors,
+            error_rate=errors / len(requests),
+            status_codes=dict(status_codes),
+            duration_seconds=duration,
+            throughput_rps=len(requests) / duration,
+            rows_per_second=len(requests) * rows_per_request / duration,
+            latency_ms={"p50": float(p50), "p95": float(p95), "p99": float(p99),
+                        "mean": float(latencies_ms.mean()), "max": float(latencies_ms.max())},
+        )
+
+    def publish_model(self, dataframe: pd.DataFrame, bucket_name: str, model_path: str) -> LocalStorageService:
+        """
+        Method Name :   publish_model
+        Description :   This method puts the model to serve into the local storage stand-in for S3
+
+        Output      :   Returns the local storage service
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            storage = LocalStorageService(root_dir=self.load_test_config.storage_dir)
+            # Uploaded as is; save_model also drops a compiled artifact left over from an earlier run
+            estimator = Proj1Estimator(bucket_name=bucket_name, model_path=model_path, storage=storage)
+            if self.load_test_config.model_file_path is not None:
+                estimator.save_model(self.load_test_config.model_file_path, remove=False)
+            else:
+                logging.info("Fitting a model for the load test")
+                with tempfile.NamedTemporaryFile(suffix=".pkl", delete=False) as model_file:
+                    dill.dump(fit_model(dataframe), model_file)
+                estimator.save_model(model_file.name, remove=True)
+            return storage
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    async def _run_in_process(self, dataframe: pd.DataFrame) -> LoadTestArtifact:
+        import httpx
+        # The serving app is imported only for in-process runs
+        import app as serving_app
+
+        serving_app.model_cache.storage = self.publish_model(dataframe, bucket_name=serving_app.model_cache.bucket_name,
+                                                             model_path=serving_app.model_cache.model_path)
+        async with serving_app.app.router.lifespan_context(serving_app.app):
+            transport = httpx.ASGITransport(app=serving_app.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+                return await self._run(client, dataframe)
+
+    async def _run_remote(self, dataframe: pd.DataFrame) -> LoadTestArtifact:
+        import httpx
+
+        limits = httpx.Limits(max_connections=self.load_test_config.concurrency)
+        async with httpx.AsyncClient(base_url=self.load_test_config.base_url, limits=limits, timeout=None) as client:
+            return await self._run(client, dataframe)
+
+    def run_pipeline(self) -> LoadTestArtifact:
+        """
+        Method Name :   run_pipeline
+        Description :   This method drives the configured prediction route with rows sampled from the data
+                        file at the configured concurrency, either against the in-process app backed by
+                        local model storage or against a running server, and measures every request
+
+        Output      :   Returns load test artifact with latency percentiles, throughput and error rate
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        logging.info("Entered run_pipeline method of LoadTestPipeline class")
+        try:
+            dataframe = self.get_rows()
+            if self.load_test_config.base_url:
+                load_test_artifact = asyncio.run(self._run_remote(dataframe))
+            else:
+                load_test_artifact = asyncio.run(self._run_in_process(dataframe))
+            logging.info(f"Load test artifact: {load_test_artifact}")
+            logging.info("Exited run_pipeline method of LoadTestPipeline class")
+            return load_test_artifact
+        except Exception as e:
+            raise CustomException(e, sys) from e
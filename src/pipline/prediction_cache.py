@@ -0,0 +1,108 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Sequence, Tuple
+
+from src.constants import PREDICTION_CACHE_MAX_SIZE, PREDICTION_CACHE_TTL_SECONDS
+from src.metrics import PREDICTION_CACHE_LOOKUPS
+
+
+class PredictionCache:
+    """
+    Bounded, thread-safe LRU cache of predictions keyed on a canonical tuple of the input features.
+
+    Entries expire after `ttl_seconds` and the whole cache is dropped as soon as it is used with a
+    different model version, so a hot-reloaded model never serves predictions of its predecessor.
+    """
+
+    def __init__(self, input_columns: Sequence[str], numerical_columns: Sequence[str],
+                 max_size: int = PREDICTION_CACHE_MAX_SIZE, ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS):
+        """
+        :param input_columns: Model input columns, in the order used for the cache key
+        :param numerical_columns: Columns normalized to float so that "34", 34 and 34.0 share an entry
+        :param max_size: Maximum number of cached predictions
+        :param ttl_seconds: Lifetime of a cached prediction
+        """
+        self.input_columns = tuple(input_columns)
+        self.numerical_columns = frozenset(numerical_columns)
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, Tuple[Any, float]]" = OrderedDict()
+        self._model_version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def make_key(self, record: dict) -> Optional[tuple]:
+        """
+        Returns the canonical key of a record, or None if the record cannot be cached.
+        """
+        key = []
+        for column in self.input_columns:
+            if column not in record:
+                return None
+            value = record[column]
+            if column in self.numerical_columns:
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    value = None
+                if value is not None and math.isnan(value):
+                    value = None
+            key.append(value)
+        return tuple(key)
+
+    def _check_version(self, model_version: str) -> None:
+        if model_version != self._model_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._model_version = model_version
+
+    def get(self, key: Optional[tuple], model_version: str) -> Tuple[bool, Any]:
+        """
+        Looks up a prediction made by the given model version.
+        :return: (hit, prediction)
+        """
+        with self._lock:
+            self._check_version(model_version)
+            entry = self._entries.get(key) if key is not None else None
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                PREDICTION_CACHE_LOOKUPS.inc("miss")
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            PREDICTION_CACHE_LOOKUPS.inc("hit")
+            return True, entry[0]
+
+    def put(self, key: Optional[tuple], model_version: str, prediction: Any) -> None:
+        if key is None:
+            return
+        with self._lock:
+            self._check_version(model_version)
+            self._entries[key] = (prediction, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "model_version": self._model_version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
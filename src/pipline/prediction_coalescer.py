@@ -0,0 +1,105 @@
+import asyncio
+from typing import Callable, List, Optional, Sequence, Set, Tuple
+
+from src.constants import PREDICTION_COALESCER_MAX_BATCH_SIZE, PREDICTION_COALESCER_WINDOW_MS
+from src.logger import logging
+from src.pipline.inference_executor import InferenceExecutor, InferencePoolFullError
+
+
+class PredictionCoalescer:
+    """
+    Coalesces concurrent single-record predictions into one vectorized model call.
+
+    Records are queued for at most `window_ms` milliseconds or until `max_batch_size` records
+    are waiting, whichever comes first. The whole batch is then scored with a single call to
+    `predict_fn` and every caller receives the prediction for its own record. When an
+    InferenceExecutor is given, the batch runs on its thread pool instead of the event loop.
+    """
+
+    def __init__(self, predict_fn: Callable[[List[dict]], Sequence],
+                 window_ms: float = PREDICTION_COALESCER_WINDOW_MS,
+                 max_batch_size: int = PREDICTION_COALESCER_MAX_BATCH_SIZE,
+                 executor: Optional[InferenceExecutor] = None):
+        """
+        :param predict_fn: Function scoring a list of records, returning predictions in input order
+        :param window_ms: Maximum time a record waits for others to join its batch
+        :param max_batch_size: Number of queued records that triggers an immediate flush
+        :param executor: Optional pool the batch is scored on
+        """
+        self.predict_fn = predict_fn
+        self.executor = executor
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The event loop only keeps weak references to tasks, so batches in flight are held here
+        self._batch_tasks: Set[asyncio.Task] = set()
+
+    async def predict(self, record: dict):
+        """
+        Queues one record and waits for its prediction.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((record, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def shutdown(self) -> None:
+        """
+        Scores the records still queued and waits for every batch in flight to finish.
+        """
+        self._flush()
+        while self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+
+    async def _run_batch(self, batch: List[Tuple[dict, asyncio.Future]]) -> None:
+        records = [record for record, _ in batch]
+        try:
+            predictions = await self._score(records)
+        except Exception as e:
+            if len(batch) == 1 or isinstance(e, InferencePoolFullError):
+                for _, future in batch:
+                    self._set_exception(future, e)
+                return
+            # Score records one by one so a single bad record only fails its own caller
+            logging.warning(f"Batch of {len(batch)} records failed, scoring individually: {e}")
+            for record, future in batch:
+                try:
+                    self._set_result(future, (await self._score([record]))[0])
+                except Exception as record_error:
+                    self._set_exception(future, record_error)
+            return
+
+        for (_, future), prediction in zip(batch, predictions):
+            self._set_result(future, prediction)
+
+    async def _score(self, records: List[dict]) -> Sequence:
+        if self.executor is None:
+            return self.predict_fn(records)
+        return await self.executor.run(self.predict_fn, records)
+
+    @staticmethod
+    def _set_result(future: asyncio.Future, value) -> None:
+        if not future.done():
+            future.set_result(value)
+
+    @staticmethod
+    def _set_exception(future: asyncio.Future, error: Exception) -> None:
+        if not future.done():
+            future.set_exception(error)
@@ -1,134 +1,261 @@
 import sys
+import threading
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+import numpy as np
+from src.constants import PREDICTION_CACHE_ENABLED, SCHEMA_FILE_PATH
 from src.entity.config_entity import VehiclePredictorConfig
-from src.entity.s3_estimator import Proj1Estimator
+from src.entity.model_cache import ModelCache, ModelSnapshot, get_model_cache
 from src.exception import CustomException
-from src.logger import logging
+from src.logger import hot_path_logger, logging
+from src.metrics import stage_timer
+from src.pipline.prediction_cache import PredictionCache
+from src.pipline.request_decoder import FeatureDecoder, coerce_number
+from src.utils.main_utils import read_yaml_file
 from pandas import DataFrame
 
 
-class VehicleData:
-    def __init__(self,
-                gender,                                 
-                SeniorCitizen,
-                Partner,
-                Dependents,
-                tenure,
-                PhoneService,
-                MultipleLines,
-                InternetService,
-                OnlineSecurity,
-                OnlineBackup,
-                DeviceProtection,
-                TechSupport,
-                StreamingTV,
-                StreamingMovies,
-                Contract,
-                PaperlessBilling,
-                PaymentMethod,
-                MonthlyCharges,
-                TotalCharges,
-                ):
-        """
-        Vehicle Data constructor
-        Input: all features of the trained model for prediction
-        """
-        try:
-            self.gender = gender
-            self.SeniorCitizen = SeniorCitizen
-            self.Partner = Partner
-            self.Dependents = Dependents
-            self.tenure = tenure
-            self.PhoneService = PhoneService
-            self.MultipleLines = MultipleLines
-            self.InternetService = InternetService
-            self.OnlineSecurity = OnlineSecurity
-            self.OnlineBackup = OnlineBackup
-            self.DeviceProtection = DeviceProtection
-            self.TechSupport = TechSupport
-            self.StreamingTV = StreamingTV
-            self.StreamingMovies = StreamingMovies
-            self.Contract = Contract
-            self.PaperlessBilling = PaperlessBilling
-            self.PaymentMethod = PaymentMethod
-            self.MonthlyCharges = MonthlyCharges
-            self.TotalCharges = TotalCharges
+@lru_cache(maxsize=1)
+def get_prediction_schema() -> dict:
+    """
+    Returns the schema config, read once per process for the prediction path
+    """
+    return read_yaml_file(file_path=SCHEMA_FILE_PATH)
 
-        except Exception as e:
-            raise CustomException(e, sys) from e
 
-    def get_vehicle_input_data_frame(self)-> DataFrame:
+@lru_cache(maxsize=1)
+def get_feature_decoder() -> FeatureDecoder:
+    """
+    Returns the request decoder generated from the schema config, built once per process
+    """
+    return FeatureDecoder(schema_config=get_prediction_schema())
+
+
+class VehicleBatchData:
+    def __init__(self, records: List[dict]):
         """
-        This function returns a DataFrame from USvisaData class input
+        Vehicle Batch Data constructor
+        Input: list of records, each holding all features of the trained model for prediction
         """
         try:
-            
-            vehicle_input_dict = self.get_vehicle_data_as_dict()
-            return DataFrame(vehicle_input_dict)
-        
+            self.records = records
+            schema_config = get_prediction_schema()
+            self.numerical_columns = schema_config["numerical_features"]
+            self.categorical_columns = schema_config["categorical_features"]
+            self.input_columns = self.numerical_columns + self.categorical_columns
         except Exception as e:
             raise CustomException(e, sys) from e
 
-
-    def get_vehicle_data_as_dict(self):
+    def get_vehicle_input_data_frame(self) -> DataFrame:
         """
-        This function returns a dictionary from VehicleData class input
+        This function returns one columnar DataFrame holding every record, in input order.
+        Each column is filled straight into a preallocated array: float64 for numerical features
+        (coerced like pd.to_numeric(errors="coerce"), a no-op for records from FeatureDecoder)
+        and object for categorical ones.
         """
-        logging.info("Entered get_usvisa_data_as_dict method as VehicleData class")
-
         try:
-            input_data = {
-                "gender": [self.gender],
-                "SeniorCitizen": [self.SeniorCitizen],
-                "Partner": [self.Partner],
-                "Dependents": [self.Dependents],
-                "tenure": [self.tenure],
-                "PhoneService": [self.PhoneService],
-                "MultipleLines": [self.MultipleLines],
-                "InternetService": [self.InternetService],
-                "OnlineSecurity": [self.OnlineSecurity],
-                "OnlineBackup": [self.OnlineBackup],
-                "DeviceProtection": [self.DeviceProtection],
-                "TechSupport": [self.TechSupport],
-                "StreamingTV": [self.StreamingTV],
-                "StreamingMovies": [self.StreamingMovies],
-                "Contract": [self.Contract],
-                "PaperlessBilling": [self.PaperlessBilling],
-                "PaymentMethod": [self.PaymentMethod],
-                "MonthlyCharges": [self.MonthlyCharges],
-                "TotalCharges": [self.TotalCharges],
-            }
-
-            logging.info("Created vehicle data dict")
-            logging.info("Exited get_vehicle_data_as_dict method as VehicleData class")
-            return input_data
+            with stage_timer("dataframe_build"):
+                records = self.records
+                n_rows = len(records)
+                columns = {}
+                try:
+                    for column in self.numerical_columns:
+                        columns[column] = np.fromiter((coerce_number(record[column]) for record in records),
+                                                      dtype=np.float64, count=n_rows)
+                    for column in self.categorical_columns:
+                        values = np.empty(n_rows, dtype=object)
+                        values[:] = [record[column] for record in records]
+                        columns[column] = values
+                except KeyError:
+                    for index, record in enumerate(records):
+                        missing_columns = [column for column in self.input_columns if column not in record]
+                        if missing_columns:
+                            raise ValueError(f"Record {index} is missing fields: {missing_columns}")
+                    raise
+
+                dataframe = DataFrame(columns, columns=self.input_columns, copy=False)
+            hot_path_logger.info("Created vehicle batch dataframe with %d rows", len(dataframe))
+            return dataframe
 
         except Exception as e:
             raise CustomException(e, sys) from e
 
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Returns the indices of the k highest scores, highest first; equal scores keep input order.
+    Uses a partial selection (O(n)) to find the k-th highest score and sorts only the k selected
+    scores, instead of sorting all n scores.
+    """
+    scores = np.asarray(scores)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        kth_score = -np.partition(-scores, k - 1)[k - 1]
+        above = np.flatnonzero(scores > kth_score)
+        # Scores tied with the k-th one are taken in input order, as a stable full sort would
+        ties = np.flatnonzero(scores == kth_score)[:k - len(above)]
+        selected = np.concatenate([above, ties])
+    else:
+        selected = np.arange(len(scores))
+    return selected[np.argsort(-scores[selected], kind="stable")]
+
+
 class VehicleDataClassifier:
-    def __init__(self,prediction_pipeline_config: VehiclePredictorConfig = VehiclePredictorConfig(),) -> None:
+    def __init__(self,prediction_pipeline_config: VehiclePredictorConfig = VehiclePredictorConfig(),
+                 prediction_cache: Optional[PredictionCache] = None) -> None:
         """
         :param prediction_pipeline_config: Configuration for prediction the value
+        :param prediction_cache: Cache of earlier predictions, defaults to the process-wide one when enabled
         """
         try:
             self.prediction_pipeline_config = prediction_pipeline_config
+            if prediction_cache is None and PREDICTION_CACHE_ENABLED:
+                prediction_cache = get_prediction_cache()
+            self.prediction_cache = prediction_cache
         except Exception as e:
             raise CustomException(e, sys)
 
+    def get_model_cache(self) -> ModelCache:
+        return get_model_cache(
+            bucket_name=self.prediction_pipeline_config.model_bucket_name,
+            model_path=self.prediction_pipeline_config.model_file_path,
+        )
+
     def predict(self, dataframe) -> str:
         """
         This is the method of VehicleDataClassifier
         Returns: Prediction in string format
         """
         try:
-            logging.info("Entered predict method of VehicleDataClassifier class")
-            model = Proj1Estimator(
-                bucket_name=self.prediction_pipeline_config.model_bucket_name,
-                model_path=self.prediction_pipeline_config.model_file_path,
-            )
+            hot_path_logger.info("Entered predict method of VehicleDataClassifier class")
+            model = self.get_model_cache().get_model()
             result =  model.predict(dataframe)
             
             return result
         
         except Exception as e:
-            raise CustomException(e, sys)
\ No newline at end of file
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def score_records(snapshot: ModelSnapshot, records: List[dict]) -> list:
+        """
+        Scores records with the given model snapshot, bypassing the prediction cache.
+        """
+        if len(records) == 1 and snapshot.compiled_model is not None:
+            # Single record: skip DataFrame construction and the sklearn pipeline entirely
+            with stage_timer("compiled_predict"):
+                return [snapshot.compiled_model.predict_one(records[0])]
+
+        dataframe = VehicleBatchData(records=records).get_vehicle_input_data_frame()
+        return list(snapshot.model.predict(dataframe))
+
+    def warm_up(self) -> ModelSnapshot:
+        """
+        This is the method of VehicleDataClassifier
+        Loads the production model and runs a synthetic record through both the single-record
+        and the batch path, so the first real request does not pay for the S3 client, the model
+        download and unpickle or first-call scikit-learn overhead. The prediction cache is bypassed.
+        Returns: The loaded model snapshot
+        """
+        try:
+            logging.info("Entered warm_up method of VehicleDataClassifier class")
+            snapshot = self.get_model_cache().get_snapshot()
+            schema_config = get_prediction_schema()
+            # Unknown categories are ignored by the one-hot encoder, so any value is a valid input
+            record = {column: 0.0 for column in schema_config["numerical_features"]}
+            record.update({column: "" for column in schema_config["categorical_features"]})
+            self.score_records(snapshot, [record])
+            self.score_records(snapshot, [record, record])
+            logging.info(f"Warmed up model version {snapshot.version}")
+            return snapshot
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def predict_proba_records(self, records: List[dict]) -> np.ndarray:
+        """
+        This is the method of VehicleDataClassifier
+        Returns: Churn probability (probability of class 1) of every record, in input order
+        """
+        try:
+            model = self.get_model_cache().get_model()
+            dataframe = VehicleBatchData(records=records).get_vehicle_input_data_frame()
+            probabilities = model.predict_proba(dataframe)
+            churn_column = list(model.classes_).index(1)
+            return probabilities[:, churn_column]
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def rank_records(self, records: List[dict], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        This is the method of VehicleDataClassifier
+        Returns: Indices of the k records most likely to churn, most at-risk first, and their churn probabilities
+        """
+        try:
+            churn_probabilities = self.predict_proba_records(records)
+            with stage_timer("rank"):
+                indices = top_k_indices(churn_probabilities, k)
+            return indices, churn_probabilities[indices]
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def get_cached_prediction(self, record: dict) -> Tuple[bool, Any]:
+        """
+        This is the method of VehicleDataClassifier
+        Looks a record up in the prediction cache for the model version in memory, without loading the model.
+        Returns: (True, prediction) on a hit, (False, None) on a miss or when the cache is disabled
+        """
+        model_version = self.get_model_cache().version
+        if self.prediction_cache is None or model_version is None:
+            return False, None
+        return self.prediction_cache.get(self.prediction_cache.make_key(record), model_version)
+
+    def predict_records(self, records: List[dict], check_cache: bool = True) -> list:
+        """
+        This is the method of VehicleDataClassifier
+        :param check_cache: False when the records already missed get_cached_prediction; they are then
+            scored without a second lookup, which would count each miss twice, and still cached
+        Returns: Predictions for a list of records, in input order
+        """
+        try:
+            snapshot = self.get_model_cache().get_snapshot()
+            if self.prediction_cache is None:
+                return self.score_records(snapshot, records)
+
+            keys = [self.prediction_cache.make_key(record) for record in records]
+            predictions = [None] * len(records)
+            missing_indexes = []
+            for index, key in enumerate(keys):
+                hit, prediction = self.prediction_cache.get(key, snapshot.version) if check_cache else (False, None)
+                if hit:
+                    predictions[index] = prediction
+                else:
+                    missing_indexes.append(index)
+
+            if missing_indexes:
+                scored = self.score_records(snapshot, [records[index] for index in missing_indexes])
+                for index, prediction in zip(missing_indexes, scored):
+                    predictions[index] = prediction
+                    self.prediction_cache.put(keys[index], snapshot.version, prediction)
+            return predictions
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+_prediction_cache: Optional[PredictionCache] = None
+_prediction_cache_lock = threading.Lock()
+
+
+def get_prediction_cache() -> PredictionCache:
+    """
+    Returns the process-wide PredictionCache for the model input columns in the schema.
+    """
+    global _prediction_cache
+    with _prediction_cache_lock:
+        if _prediction_cache is None:
+            schema_config = get_prediction_schema()
+            _prediction_cache = PredictionCache(
+                input_columns=schema_config["numerical_features"] + schema_config["categorical_features"],
+                numerical_columns=schema_config["numerical_features"],
+            )
+        return _prediction_cache
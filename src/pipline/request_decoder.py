@@ -0,0 +1,189 @@
+import math
+from collections.abc import Mapping, Sequence
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Placeholder for a field that is absent from a payload
+_MISSING = object()
+
+
+class RequestValidationError(ValueError):
+    """
+    Raised when a prediction payload is missing fields or holds values the model cannot take.
+    For a list of payloads, record_errors maps the index of every rejected record to its problems.
+    """
+
+    def __init__(self, errors: List[str], record_errors: Optional[Dict[int, List[str]]] = None):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+        self.record_errors = record_errors or {}
+
+
+def coerce_number(value) -> float:
+    """
+    Numeric coercion matching pd.to_numeric(errors='coerce') for a single value.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _number_parser(nullable: bool) -> Callable:
+    def parse(value) -> float:
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                value = None
+        if value is None:
+            if nullable:
+                return math.nan
+            raise ValueError("must not be blank")
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"expected a number, got {value!r}") from None
+        if math.isnan(number) and not nullable:
+            raise ValueError("must not be blank")
+        return number
+    return parse
+
+
+def _category_parser(allowed_values: Optional[Sequence[str]]) -> Callable:
+    allowed = frozenset(allowed_values) if allowed_values else None
+
+    def parse(value) -> str:
+        if not isinstance(value, str):
+            raise ValueError(f"expected a string, got {value!r}")
+        value = value.strip()
+        if allowed is not None and value not in allowed:
+            raise ValueError(f"{value!r} is not one of {sorted(allowed)}")
+        return value
+    return parse
+
+
+class FeatureDecoder:
+    """
+    Decodes prediction payloads (a JSON object or submitted form data) into typed model input
+    records in a single pass.
+
+    The field list, numeric versus categorical typing, nullable numerics and the allowed values
+    of every categorical feature come from config/schema.yaml, so the decoder always matches the
+    model inputs. Numerics are coerced to float exactly once, unknown categories are rejected up
+    front and all problems of a payload are reported together.
+    """
+
+    def __init__(self, schema_config: dict):
+        """
+        :param schema_config: Parsed config/schema.yaml
+        """
+        self.numerical_columns: Tuple[str, ...] = tuple(schema_config["numerical_features"])
+        self.categorical_columns: Tuple[str, ...] = tuple(schema_config["categorical_features"])
+        self.input_columns: Tuple[str, ...] = self.numerical_columns + self.categorical_columns
+        nullable_columns = frozenset(schema_config.get("nullable_features") or ())
+        feature_values = schema_config.get("feature_values") or {}
+        self._parsers: List[Tuple[str, Callable]] = (
+            [(column, _number_parser(column in nullable_columns)) for column in self.numerical_columns]
+            + [(column, _category_parser(feature_values.get(column))) for column in self.categorical_columns]
+        )
+        # Whole-column checks used by decode_many; a column that fails one is decoded value by value
+        self._column_decoders: List[Callable] = (
+            [self._number_column_decoder(column in nullable_columns) for column in self.numerical_columns]
+            + [self._category_column_decoder(feature_values.get(column)) for column in self.categorical_columns]
+        )
+
+    @staticmethod
+    def _number_column_decoder(nullable: bool) -> Callable:
+        def decode_column(values: list) -> Optional[list]:
+            if _MISSING in values:
+                return None
+            try:
+                numbers = np.array(values, dtype=np.float64)
+            except (TypeError, ValueError):
+                return None
+            if not nullable and np.isnan(numbers).any():
+                return None
+            return numbers.tolist()
+        return decode_column
+
+    @staticmethod
+    def _category_column_decoder(allowed_values: Optional[Sequence[str]]) -> Callable:
+        allowed = frozenset(allowed_values) if allowed_values else None
+
+        def decode_column(values: list) -> Optional[list]:
+            try:
+                if allowed is not None and allowed.issuperset(values):
+                    return values
+            except TypeError:
+                pass
+            return None
+        return decode_column
+
+    def _decode(self, payload: Mapping, errors: List[str], prefix: str = "") -> dict:
+        record = {}
+        for column, parse in self._parsers:
+            if column not in payload:
+                errors.append(f"{prefix}{column}: is required")
+                continue
+            try:
+                record[column] = parse(payload[column])
+            except ValueError as e:
+                errors.append(f"{prefix}{column}: {e}")
+        return record
+
+    def decode(self, payload: Mapping) -> dict:
+        """
+        Returns the typed record of a single payload.
+        :raises RequestValidationError: listing every missing or invalid field
+        """
+        if not isinstance(payload, Mapping):
+            raise RequestValidationError([f"expected an object, got {type(payload).__name__}"])
+        errors: List[str] = []
+        record = self._decode(payload, errors)
+        if errors:
+            raise RequestValidationError(errors)
+        return record
+
+    @staticmethod
+    def _many_error(record_errors: Dict[int, List[str]]) -> RequestValidationError:
+        # Report problems in record order
+        record_errors = dict(sorted(record_errors.items()))
+        return RequestValidationError([f"record {index}: {error}" for index, errors in record_errors.items()
+                                       for error in errors], record_errors=record_errors)
+
+    def decode_many(self, payloads: Sequence[Mapping]) -> List[dict]:
+        """
+        Returns the typed records of a list of payloads, in input order.
+        Each column is first checked as a whole (numeric conversion in one numpy call, category
+        membership in one set operation); only columns failing that check are decoded value by
+        value, with the same result and error messages as decode.
+        :raises RequestValidationError: listing every missing or invalid field, prefixed by record index,
+                                        with the problems of every rejected record in record_errors
+        """
+        if not isinstance(payloads, Sequence) or isinstance(payloads, (str, bytes)):
+            raise RequestValidationError([f"expected a list of objects, got {type(payloads).__name__}"])
+        record_errors: Dict[int, List[str]] = {
+            index: [f"expected an object, got {type(payload).__name__}"]
+            for index, payload in enumerate(payloads) if not isinstance(payload, Mapping)}
+        if record_errors:
+            raise self._many_error(record_errors)
+
+        columns = []
+        for (column, parse), decode_column in zip(self._parsers, self._column_decoders):
+            values = [payload.get(column, _MISSING) for payload in payloads]
+            decoded = decode_column(values)
+            if decoded is None:
+                decoded = []
+                for index, value in enumerate(values):
+                    if value is _MISSING:
+                        record_errors.setdefault(index, []).append(f"{column}: is required")
+                        continue
+                    try:
+                        decoded.append(parse(value))
+                    except ValueError as e:
+                        record_errors.setdefault(index, []).append(f"{column}: {e}")
+            columns.append(decoded)
+        if record_errors:
+            raise self._many_error(record_errors)
+        return [dict(zip(self.input_columns, row)) for row in zip(*columns)]
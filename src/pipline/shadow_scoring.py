@@ -0,0 +1,152 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from src.entity.config_entity import ShadowConfig
+from src.entity.model_cache import ModelCache
+from src.logger import logging
+from src.metrics import SHADOW_LATENCY, SHADOW_PREDICTIONS, disable_stage_timers
+from src.pipline.prediction_pipeline import VehicleDataClassifier
+
+
+def _latency_summary(samples: Sequence[float]) -> dict:
+    if not samples:
+        return {"count": 0}
+    milliseconds = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(milliseconds, [50, 95, 99])
+    return {"count": len(milliseconds), "mean_ms": float(milliseconds.mean()),
+            "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+
+
+class ShadowScorer:
+    """
+    Scores a challenger ("shadow") model on a sample of live requests next to production.
+
+    The request path only calls submit() after the production predictions are ready. submit()
+    draws the sample and hands the records and production predictions to a dedicated, bounded
+    thread pool without waiting on it: when the pool is busy the sample is dropped rather than
+    queued. On the pool the shadow model (its own ModelCache, e.g. on a staging key) scores the
+    same records and agreement and latency are aggregated in memory. Shadow work never touches
+    the inference pool, the prediction cache or the request stage latencies, and a missing or
+    broken shadow model never fails a request.
+    """
+
+    def __init__(self, model_cache: ModelCache, shadow_config: ShadowConfig = ShadowConfig()):
+        """
+        :param model_cache: Cache of the shadow model
+        :param shadow_config: Sampling rate, pool size and statistics window
+        """
+        self.model_cache = model_cache
+        self.shadow_config = shadow_config
+        self._executor = ThreadPoolExecutor(max_workers=shadow_config.max_workers, thread_name_prefix="shadow",
+                                            initializer=disable_stage_timers)
+        self._slots = threading.BoundedSemaphore(shadow_config.max_workers + shadow_config.max_queue_depth)
+        self._random = random.Random()
+        self._unavailable_until = 0.0
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {"requests": 0, "sampled": 0, "dropped": 0, "unavailable": 0,
+                                        "scored": 0, "errors": 0, "records": 0, "agreements": 0}
+        # production prediction -> shadow prediction -> number of records
+        self._confusion: Dict[str, Dict[str, int]] = {}
+        self._primary_latency: deque = deque(maxlen=shadow_config.latency_window)
+        self._shadow_latency: deque = deque(maxlen=shadow_config.latency_window)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += amount
+
+    def submit(self, records: List[dict], primary_predictions: Sequence, primary_seconds: float) -> bool:
+        """
+        Samples a scored request for shadow scoring. Never blocks and never raises.
+        :param records: Decoded records of the request
+        :param primary_predictions: Production predictions, in record order
+        :param primary_seconds: Time production took to answer the request
+        :return: True if the request was handed to the shadow pool
+        """
+        try:
+            self._count("requests")
+            if self._random.random() >= self.shadow_config.sample_rate:
+                return False
+            self._count("sampled")
+            if time.monotonic() < self._unavailable_until:
+                self._count("unavailable")
+                return False
+            if not self._slots.acquire(blocking=False):
+                self._count("dropped")
+                return False
+            try:
+                self._executor.submit(self._score, list(records), list(primary_predictions), primary_seconds)
+            except RuntimeError:
+                # Pool already shut down
+                self._slots.release()
+                return False
+            return True
+        except Exception as e:
+            logging.warning(f"Could not submit shadow scoring: {e}")
+            return False
+
+    def _score(self, records: List[dict], primary_predictions: list, primary_seconds: float) -> None:
+        try:
+            try:
+                snapshot = self.model_cache.get_snapshot()
+            except Exception as e:
+                self._unavailable_until = time.monotonic() + self.shadow_config.retry_seconds
+                self._count("unavailable")
+                logging.warning(f"Shadow model {self.model_cache.model_path} is unavailable, retrying in "
+                                f"{self.shadow_config.retry_seconds}s: {e}")
+                return
+
+            start = time.perf_counter()
+            shadow_predictions = VehicleDataClassifier.score_records(snapshot, records)
+            shadow_seconds = time.perf_counter() - start
+            SHADOW_LATENCY.observe(shadow_seconds)
+
+            agreements = 0
+            with self._lock:
+                for primary, shadow in zip(primary_predictions, shadow_predictions):
+                    primary, shadow = str(int(primary)), str(int(shadow))
+                    row = self._confusion.setdefault(primary, {})
+                    row[shadow] = row.get(shadow, 0) + 1
+                    agreements += primary == shadow
+                self._counts["scored"] += 1
+                self._counts["records"] += len(records)
+                self._counts["agreements"] += agreements
+                self._primary_latency.append(primary_seconds)
+                self._shadow_latency.append(shadow_seconds)
+            SHADOW_PREDICTIONS.inc("agree", amount=agreements)
+            SHADOW_PREDICTIONS.inc("disagree", amount=len(records) - agreements)
+        except Exception as e:
+            self._count("errors")
+            logging.warning(f"Shadow scoring failed: {e}")
+        finally:
+            self._slots.release()
+
+    def get_stats(self) -> dict:
+        """
+        Returns sampling counters, the agreement rate and confusion counts of shadow versus production
+        predictions, and latency percentiles of both over the most recent sampled requests.
+        """
+        with self._lock:
+            counts = dict(self._counts)
+            confusion = {primary: dict(row) for primary, row in self._confusion.items()}
+            primary_latency = list(self._primary_latency)
+            shadow_latency = list(self._shadow_latency)
+        return {
+            "model_path": self.model_cache.model_path,
+            "model_version": self.model_cache.version,
+            "sample_rate": self.shadow_config.sample_rate,
+            **counts,
+            "agreement_rate": counts["agreements"] / counts["records"] if counts["records"] else None,
+            "confusion": confusion,
+            "primary_latency": _latency_summary(primary_latency),
+            "shadow_latency": _latency_summary(shadow_latency),
+        }
+
+    def shutdown(self) -> None:
+        # Pending shadow work is dropped, it must not delay shutdown
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,301 @@
+import contextlib
+import json
+import multiprocessing
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+from src.constants import TRAINING_JOB_HISTORY_SIZE, TRAINING_JOB_NICENESS, TRAINING_JOB_STATE_DIR
+from src.logger import logging
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+_LOCK_FILE_NAME = "training.lock"
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class TrainingJobRunningError(Exception):
+    """
+    Raised when a training job is submitted while another one is still running.
+    """
+
+    def __init__(self, job_id: str):
+        super().__init__(f"Training job {job_id} is still running")
+        self.job_id = job_id
+
+
+@dataclass
+class TrainingJob:
+    job_id: str
+    status: str = QUEUED
+    current_stage: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    # stage -> {"started_at", "elapsed_seconds", "completed"}
+    stages: Dict[str, dict] = field(default_factory=dict)
+    # stage -> stage artifact as a dict
+    artifacts: Dict[str, dict] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+def _run_training_job(events: multiprocessing.Queue, niceness: int) -> None:
+    """
+    Entry point of the training process: runs TrainPipeline and reports progress through `events`.
+    """
+    # Imported here so the serving process never pays for the training stack
+    from src.pipline.training_pipeline import TrainPipeline
+
+    try:
+        # Yield the CPU to the serving workers
+        os.nice(niceness)
+    except (AttributeError, OSError):
+        pass
+    try:
+        train_pipeline = TrainPipeline(
+            progress_callback=lambda event, stage, artifact: events.put((event, stage, artifact, time.time())))
+        train_pipeline.run_pipeline()
+        events.put((SUCCEEDED, None, None, time.time()))
+    except Exception as e:
+        events.put((FAILED, None, f"{e}", time.time()))
+
+
+class TrainingJobManager:
+    """
+    Runs TrainPipeline as a background job in a separate process, one job at a time per host.
+
+    The training process reports stage progress over a queue that a listener thread folds into
+    the job status, so submitting a job and polling its status never block the event loop and
+    training never competes with serving for the interpreter lock. The process is not daemonic,
+    as data ingestion starts export worker processes of its own; shutdown() ends it instead.
+
+    Serving workers each have their own manager, so the state is shared through state_dir:
+
+        <state_dir>/training.lock     exclusively locked (flock) while a job runs, holds its id and
+                                      the pid of the worker running it
+        <state_dir>/<job_id>.json     status of a job, rewritten on every stage event
+
+    Any worker can thus reject a second job and answer the status of a job another worker started.
+    A job whose status was left running by a worker that died without releasing the lock is
+    reported as failed. Polls tell this from the holder named in the lock file rather than by
+    taking the lock, which would make a concurrent submission fail.
+    """
+
+    def __init__(self, on_success: Optional[Callable[[], None]] = None,
+                 history_size: int = TRAINING_JOB_HISTORY_SIZE, niceness: int = TRAINING_JOB_NICENESS,
+                 state_dir: str = TRAINING_JOB_STATE_DIR):
+        """
+        :param on_success: Called on the listener thread after a job succeeded, e.g. to pick up the pushed model
+        :param history_size: Number of jobs whose status is kept
+        :param niceness: Scheduling niceness added to the training process
+        :param state_dir: Directory of the host-wide lock and the job status files
+        """
+        self.on_success = on_success
+        self.history_size = history_size
+        self.niceness = niceness
+        self.state_dir = state_dir
+        # Held from submission until the training process has exited, with the lock file of the host
+        self._run_lock = threading.Lock()
+        self._lock_file = None
+        self._process: Optional[multiprocessing.Process] = None
+
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.state_dir, f"{job_id}.json")
+
+    def _write_job(self, job: TrainingJob) -> None:
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.state_dir, prefix=".tmp-")
+        with os.fdopen(descriptor, "w") as job_file:
+            json.dump(asdict(job), job_file)
+        os.replace(temporary_path, self._job_path(job.job_id))
+
+    def _read_job(self, job_id: str) -> Optional[dict]:
+        if not _JOB_ID.match(job_id):
+            return None
+        try:
+            with open(self._job_path(job_id)) as job_file:
+                return json.load(job_file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _prune_jobs(self) -> None:
+        job_paths = [entry.path for entry in os.scandir(self.state_dir)
+                     if entry.name.endswith(".json") and _JOB_ID.match(entry.name[:-len(".json")])]
+        job_paths.sort(key=os.path.getmtime)
+        for job_path in job_paths[:max(len(job_paths) - self.history_size, 0)]:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(job_path)
+
+    def _acquire_host_lock(self) -> bool:
+        """
+        Takes the lock of the host without waiting. :return: False if another job holds it
+        """
+        os.makedirs(self.state_dir, exist_ok=True)
+        lock_file = open(os.path.join(self.state_dir, _LOCK_FILE_NAME), "a+")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+        self._lock_file = lock_file
+        return True
+
+    def _release_host_lock(self) -> None:
+        lock_file, self._lock_file = self._lock_file, None
+        if lock_file is not None:
+            # The lock file names no holder once the job is over; closing the file releases the flock
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.close()
+
+    def _read_lock_holder(self) -> Tuple[Optional[str], Optional[int]]:
+        """
+        :return: id of the job named in the lock file and pid of the worker running it, or (None, None)
+        """
+        try:
+            with open(os.path.join(self.state_dir, _LOCK_FILE_NAME)) as lock_file:
+                job_id, _, pid = lock_file.read().strip().partition(" ")
+        except FileNotFoundError:
+            return None, None
+        return job_id or None, int(pid) if pid.isdigit() else None
+
+    def _running_job_id(self) -> Optional[str]:
+        return self._read_lock_holder()[0]
+
+    def _holds_host_lock(self, job_id: str) -> bool:
+        """
+        Tells whether job_id still runs, without touching the lock: it must be the holder named in the
+        lock file and the worker that runs it must be alive (a dead worker's flock is released).
+        """
+        if fcntl is None:
+            return self._run_lock.locked()
+        holder_job_id, pid = self._read_lock_holder()
+        if holder_job_id != job_id or pid is None:
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            # Alive, run by another user
+            pass
+        return True
+
+    def submit(self) -> TrainingJob:
+        """
+        Starts a training job and returns immediately.
+        :raises TrainingJobRunningError: if a job is already running on this host
+        """
+        if not self._run_lock.acquire(blocking=False):
+            raise TrainingJobRunningError(self._running_job_id())
+        if not self._acquire_host_lock():
+            self._run_lock.release()
+            raise TrainingJobRunningError(self._running_job_id())
+        try:
+            job = TrainingJob(job_id=uuid.uuid4().hex)
+            self._lock_file.seek(0)
+            self._lock_file.truncate()
+            self._lock_file.write(f"{job.job_id} {os.getpid()}")
+            self._lock_file.flush()
+            self._write_job(job)
+            self._prune_jobs()
+
+            # Spawned (not forked) so the child does not inherit the server's threads and sockets
+            context = multiprocessing.get_context("spawn")
+            events = context.Queue()
+            process = context.Process(target=_run_training_job, args=(events, self.niceness),
+                                      name=f"training-{job.job_id}", daemon=False)
+            process.start()
+            self._process = process
+            logging.info(f"Started training job {job.job_id} in process {process.pid}")
+            threading.Thread(target=self._listen, args=(job, process, events),
+                             name=f"training-listener-{job.job_id}", daemon=True).start()
+            return job
+        except Exception:
+            self._release_host_lock()
+            self._run_lock.release()
+            raise
+
+    def _apply(self, job: TrainingJob, event: str, stage: Optional[str], payload, timestamp: float) -> None:
+        if event == "started":
+            job.status = RUNNING
+            job.current_stage = stage
+            job.stages[stage] = {"started_at": timestamp, "elapsed_seconds": 0.0, "completed": False}
+        elif event == "completed":
+            job.stages[stage].update(elapsed_seconds=timestamp - job.stages[stage]["started_at"], completed=True)
+            job.artifacts[stage] = payload
+        elif event in (SUCCEEDED, FAILED):
+            if job.current_stage is not None and not job.stages[job.current_stage]["completed"]:
+                job.stages[job.current_stage]["elapsed_seconds"] = timestamp - job.stages[job.current_stage]["started_at"]
+            job.status = event
+            job.error = payload if event == FAILED else None
+            job.finished_at = timestamp
+        self._write_job(job)
+
+    def _listen(self, job: TrainingJob, process: multiprocessing.Process, events: multiprocessing.Queue) -> None:
+        try:
+            while job.status not in (SUCCEEDED, FAILED):
+                try:
+                    event, stage, payload, timestamp = events.get(timeout=1.0)
+                except queue.Empty:
+                    if not process.is_alive():
+                        self._apply(job, FAILED, None, f"Training process exited with code {process.exitcode}",
+                                    time.time())
+                    continue
+                self._apply(job, event, stage, payload, timestamp)
+            process.join()
+            logging.info(f"Training job {job.job_id} {job.status}")
+            if job.status == SUCCEEDED and self.on_success is not None:
+                try:
+                    self.on_success()
+                except Exception as e:
+                    logging.warning(f"Post-training hook of job {job.job_id} failed: {e}")
+        finally:
+            events.close()
+            self._process = None
+            self._release_host_lock()
+            self._run_lock.release()
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """
+        Returns the status of a job started by any worker of the host, with per-stage elapsed time
+        and artifacts, or None if it is unknown.
+        """
+        status = self._read_job(job_id)
+        if status is None:
+            return None
+        if status["status"] in (QUEUED, RUNNING) and not self._holds_host_lock(job_id):
+            # Read again: the job may have finished and released the lock in between
+            status = self._read_job(job_id) or status
+            if status["status"] in (QUEUED, RUNNING):
+                status.update(status=FAILED, error="Training job was abandoned by the worker that ran it")
+        # Report live elapsed time for the stage in progress
+        if status["status"] == RUNNING and status["current_stage"] is not None:
+            stage = status["stages"][status["current_stage"]]
+            if not stage["completed"]:
+                stage["elapsed_seconds"] = time.time() - stage["started_at"]
+        return status
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """
+        Terminates the running training process, if any, and waits up to timeout seconds for it to exit.
+        """
+        process = self._process
+        if process is not None and process.is_alive():
+            logging.warning(f"Terminating training process {process.pid} on shutdown")
+            process.terminate()
+            process.join(timeout)
@@ -1,4 +1,7 @@
 import sys
+from dataclasses import asdict
+from typing import Callable, Optional
+
 from src.exception import CustomException
 from src.logger import logging
 
@@ -15,7 +18,12 @@ from src.entity.artifact_entity import (DataIngestionArtifact, DataValidationArt
 
 
 class TrainPipeline:
-    def __init__(self):
+    def __init__(self, progress_callback: Optional[Callable[[str, str, Optional[dict]], None]] = None):
+        """
+        :param progress_callback: Called as progress_callback(event, stage, artifact) with event "started"
+                                  or "completed" around every stage; artifact is the stage artifact as a dict
+        """
+        self.progress_callback = progress_callback
         self.data_ingestion_config = DataIngestionConfig()
         self.data_validation_config = DataValidationConfig()
         self.data_transformation_config = DataTransformationConfig()
@@ -115,23 +123,38 @@ class TrainPipeline:
         except Exception as e:
             raise CustomException(e, sys)
         
+    def run_stage(self, stage: str, start_stage: Callable, **kwargs):
+        """
+        This method of TrainPipeline class runs one stage and reports its progress
+        """
+        if self.progress_callback is not None:
+            self.progress_callback("started", stage, None)
+        artifact = start_stage(**kwargs)
+        if self.progress_callback is not None:
+            self.progress_callback("completed", stage, asdict(artifact))
+        return artifact
+
     def run_pipeline(self, ) -> None:
         """
         This method of TrainPipeline class is responsible for running complete pipeline
         """
         try:
-            data_ingestion_artifact = self.start_data_ingestion()
-            data_validation_artifact = self.start_data_validation(data_ingestion_artifact=data_ingestion_artifact)
-            data_transformation_artifact = self.start_data_transformation(
+            data_ingestion_artifact = self.run_stage("data_ingestion", self.start_data_ingestion)
+            data_validation_artifact = self.run_stage("data_validation", self.start_data_validation,
+                                                      data_ingestion_artifact=data_ingestion_artifact)
+            data_transformation_artifact = self.run_stage("data_transformation", self.start_data_transformation,
                 data_ingestion_artifact=data_ingestion_artifact, data_validation_artifact=data_validation_artifact)
-            model_trainer_artifact = self.start_model_trainer(data_transformation_artifact=data_transformation_artifact)
-            model_evaluation_artifact = self.start_model_evaluation(data_ingestion_artifact=data_ingestion_artifact,
-                                                                    model_trainer_artifact=model_trainer_artifact,
-                                                                    data_transformation_artifact=data_transformation_artifact)
+            model_trainer_artifact = self.run_stage("model_trainer", self.start_model_trainer,
+                                                    data_transformation_artifact=data_transformation_artifact)
+            model_evaluation_artifact = self.run_stage("model_evaluation", self.start_model_evaluation,
+                                                       data_ingestion_artifact=data_ingestion_artifact,
+                                                       model_trainer_artifact=model_trainer_artifact,
+                                                       data_transformation_artifact=data_transformation_artifact)
             if not model_evaluation_artifact.is_model_accepted:
                 logging.info(f"Model not accepted.")
                 return None
-            model_pusher_artifact = self.start_model_pusher(model_evaluation_artifact=model_evaluation_artifact)
+            model_pusher_artifact = self.run_stage("model_pusher", self.start_model_pusher,
+                                                   model_evaluation_artifact=model_evaluation_artifact)
             
         except Exception as e:
             raise CustomException(e, sys)
\ No newline at end of file
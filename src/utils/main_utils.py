@@ -1,8 +1,13 @@
+import contextlib
 import os
+import shutil
 import sys
+import tempfile
+from typing import Dict, Iterable, List, Optional
 
 import numpy as np
 import dill
+import pandas as pd
 import yaml
 from pandas import DataFrame
 
@@ -86,6 +91,180 @@ def save_object(file_path: str, obj: object) -> None:
         raise CustomException(e, sys) from e
 
 
+# Tabular artifact formats by file extension
+DATAFRAME_FILE_FORMATS = {".csv": "csv", ".parquet": "parquet", ".feather": "feather"}
+
+
+def dataframe_file_format(file_path: str) -> str:
+    """
+    Returns the tabular format of a file ('csv', 'parquet' or 'feather') from its extension.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in DATAFRAME_FILE_FORMATS:
+        raise ValueError(f"Unsupported dataframe file extension {extension!r} of {file_path}")
+    return DATAFRAME_FILE_FORMATS[extension]
+
+
+def dataframe_file_name(file_name: str, file_format: str) -> str:
+    """
+    Returns file_name with the extension of the given format, e.g. data.csv -> data.parquet.
+    """
+    if file_format not in DATAFRAME_FILE_FORMATS.values():
+        raise ValueError(f"Unsupported dataframe file format {file_format!r}")
+    return os.path.splitext(file_name)[0] + "." + file_format
+
+
+def _arrow_schema(column_types: Dict[str, str], file_format: str):
+    import pyarrow as pa
+
+    # Parquet keeps one dictionary per row group, so categories are stored dictionary-encoded and read
+    # back as categoricals; Arrow IPC (feather) files allow a single dictionary per column, so strings
+    types = {"int": pa.int64(), "float": pa.float64(),
+             "category": pa.dictionary(pa.int32(), pa.string()) if file_format == "parquet" else pa.string()}
+    return pa.schema([(column, types[dtype]) for column, dtype in column_types.items()])
+
+
+@contextlib.contextmanager
+def _atomic_path(file_path: str):
+    """
+    Yields a temporary path next to file_path that is renamed to file_path once the block completes.
+    """
+    directory = os.path.dirname(file_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    os.close(descriptor)
+    try:
+        yield temporary_path
+        os.replace(temporary_path, file_path)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temporary_path)
+
+
+def write_dataframe(file_path: str, dataframe: DataFrame, compression: Optional[str] = "zstd") -> None:
+    """
+    Writes a dataframe as CSV, Parquet or Feather depending on the extension of file_path.
+    Columnar files keep the column dtypes (categoricals, ints, floats) and are compressed.
+    file_path: str location of file to write
+    compression: codec of columnar files, e.g. 'zstd', 'lz4', 'snappy' or None
+    """
+    try:
+        file_format = dataframe_file_format(file_path)
+        with _atomic_path(file_path) as temporary_path:
+            if file_format == "csv":
+                dataframe.to_csv(temporary_path, index=False, header=True)
+            elif file_format == "parquet":
+                dataframe.to_parquet(temporary_path, index=False, compression=compression)
+            else:
+                dataframe.reset_index(drop=True).to_feather(temporary_path, compression=compression)
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+def write_dataframe_chunks(file_path: str, chunks: Iterable[DataFrame], column_types: Dict[str, str],
+                           compression: Optional[str] = "zstd") -> int:
+    """
+    Writes dataframe chunks one by one into a single CSV, Parquet or Feather file, depending on the
+    extension of file_path; only one chunk is held in memory. Columnar files get a fixed schema from
+    column_types (schema type 'int', 'float' or 'category' per column) and one row group per chunk.
+    file_path: str location of file to write
+    return: number of rows written
+    """
+    try:
+        file_format = dataframe_file_format(file_path)
+        columns = list(column_types)
+        rows = 0
+        with _atomic_path(file_path) as temporary_path:
+            if file_format == "csv":
+                with open(temporary_path, "w", newline="") as csv_file:
+                    for chunk in chunks:
+                        chunk[columns].to_csv(csv_file, index=False, header=rows == 0)
+                        rows += len(chunk)
+                    if rows == 0:
+                        csv_file.write(",".join(columns) + "\n")
+                return rows
+
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = _arrow_schema(column_types, file_format)
+            if file_format == "parquet":
+                writer = pq.ParquetWriter(temporary_path, schema, compression=compression)
+            else:
+                writer = pa.ipc.new_file(temporary_path, schema,
+                                         options=pa.ipc.IpcWriteOptions(compression=compression))
+            with writer:
+                for chunk in chunks:
+                    writer.write_table(pa.Table.from_pandas(chunk[columns], schema=schema, preserve_index=False))
+                    rows += len(chunk)
+        return rows
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+def read_dataframe(file_path: str, columns: Optional[List[str]] = None) -> DataFrame:
+    """
+    Reads a CSV, Parquet or Feather file depending on its extension. Columnar files are read with
+    their stored dtypes and only the requested columns are decoded.
+    file_path: str location of file to read
+    columns: columns to read, all when omitted
+    """
+    try:
+        file_format = dataframe_file_format(file_path)
+        if file_format == "csv":
+            return pd.read_csv(file_path, usecols=columns)
+        if file_format == "parquet":
+            return pd.read_parquet(file_path, columns=columns)
+        return pd.read_feather(file_path, columns=columns)
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+def concatenate_dataframe_files(file_paths: List[str], output_file_path: str,
+                                compression: Optional[str] = "zstd") -> None:
+    """
+    Concatenates files of one format and schema into output_file_path without building a dataframe:
+    CSV files are copied byte-wise after their header line, columnar files batch by batch.
+    """
+    try:
+        file_format = dataframe_file_format(output_file_path)
+        with _atomic_path(output_file_path) as temporary_path:
+            if file_format == "csv":
+                with open(temporary_path, "w", newline="") as output_file:
+                    for index, file_path in enumerate(file_paths):
+                        with open(file_path, newline="") as input_file:
+                            header = input_file.readline()
+                            if index == 0:
+                                output_file.write(header)
+                            shutil.copyfileobj(input_file, output_file)
+                return
+
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            def read_table(file_path):
+                if file_format == "parquet":
+                    return pq.read_table(file_path)
+                with pa.memory_map(file_path) as source:
+                    return pa.ipc.open_file(source).read_all()
+
+            if not file_paths:
+                raise ValueError("No files to concatenate")
+            tables = (read_table(file_path) for file_path in file_paths)
+            first = next(tables)
+            if file_format == "parquet":
+                writer = pq.ParquetWriter(temporary_path, first.schema, compression=compression)
+            else:
+                writer = pa.ipc.new_file(temporary_path, first.schema,
+                                         options=pa.ipc.IpcWriteOptions(compression=compression))
+            with writer:
+                writer.write_table(first)
+                for table in tables:
+                    writer.write_table(table)
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
 # def drop_columns(df: DataFrame, cols: list)-> DataFrame:
 
 #     """
@@ -0,0 +1,49 @@
+import os
+from typing import List, Optional
+
+import pandas as pd
+import pytest
+from bson import ObjectId
+
+from src.constants import DATA_INGESTION_COLLECTION_NAME, DATABASE_NAME
+
+DATA_FILE_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "notebook", "Telco-Customer-Churn.csv")
+
+
+def load_customer_documents(n_rows: Optional[int] = None) -> List[dict]:
+    """
+    Rows of the Telco sample as MongoDB documents, with the same ascending _ids on every call.
+    """
+    records = pd.read_csv(DATA_FILE_PATH, nrows=n_rows).to_dict("records")
+    for index, record in enumerate(records):
+        record["_id"] = ObjectId(f"{index:024x}")
+    return records
+
+
+class MockMongoClient:
+    """
+    Stand-in for MongoDBClient over a mongomock client. Created without a client, it holds the whole
+    Telco sample in a client built once per process, so export worker processes see the same documents.
+    """
+
+    _sample_client = None
+
+    def __init__(self, client=None):
+        if client is None:
+            if MockMongoClient._sample_client is None:
+                import mongomock
+                sample_client = mongomock.MongoClient()
+                sample_client[DATABASE_NAME][DATA_INGESTION_COLLECTION_NAME].insert_many(load_customer_documents())
+                MockMongoClient._sample_client = sample_client
+            client = MockMongoClient._sample_client
+        self.client = client
+        self.database = client[DATABASE_NAME]
+
+
+@pytest.fixture
+def customer_collection():
+    """
+    An empty customer collection in a fresh mongomock client.
+    """
+    mongomock = pytest.importorskip("mongomock")
+    return mongomock.MongoClient()[DATABASE_NAME][DATA_INGESTION_COLLECTION_NAME]
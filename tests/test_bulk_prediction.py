@@ -0,0 +1,151 @@
+import asyncio
+import io
+
+import pandas as pd
+import pytest
+from starlette.requests import ClientDisconnect
+
+from conftest import DATA_FILE_PATH
+from src.pipline.bulk_prediction import CsvStreamScorer, DuplexStreamingResponse
+from src.pipline.prediction_pipeline import get_feature_decoder
+
+
+def _churn_after_a_year(dataframe):
+    return (dataframe["tenure"] > 12).astype(int)
+
+
+def _score(upload: bytes, chunk_rows: int, predict_fn=_churn_after_a_year):
+    scored_frames = []
+
+    def record_and_predict(dataframe):
+        scored_frames.append(dataframe)
+        return predict_fn(dataframe)
+
+    async def byte_stream():
+        for start in range(0, len(upload), 1000):
+            yield upload[start:start + 1000]
+
+    async def run():
+        scorer = CsvStreamScorer(byte_stream=byte_stream(), predict_fn=record_and_predict, chunk_rows=chunk_rows)
+        await scorer.read_header()
+        return scorer, "".join([text async for text in scorer.iter_predictions()])
+
+    scorer, output = asyncio.run(run())
+    return scorer, pd.read_csv(io.StringIO(output), keep_default_na=False), scored_frames
+
+
+def test_upload_is_scored_chunk_by_chunk_in_input_order():
+    upload = pd.read_csv(DATA_FILE_PATH, nrows=95)
+    scorer, output, scored_frames = _score(upload.to_csv(index=False).encode(), chunk_rows=20)
+
+    assert output["row"].tolist() == list(range(95))
+    assert output["customerID"].tolist() == upload["customerID"].tolist()
+    assert output["prediction"].tolist() == (upload["tenure"] > 12).astype(int).tolist()
+    assert len(scored_frames) > 1 and all(len(frame) <= 40 for frame in scored_frames)
+    assert scorer.rows_scored == 95
+
+
+def test_header_without_model_columns_is_rejected():
+    async def byte_stream():
+        yield b"customerID,gender\n0001,Female\n"
+
+    scorer = CsvStreamScorer(byte_stream=byte_stream(), predict_fn=len)
+    with pytest.raises(ValueError, match="missing columns"):
+        asyncio.run(scorer.read_header())
+
+
+def test_rejected_rows_are_reported_and_not_scored():
+    upload = pd.read_csv(DATA_FILE_PATH, nrows=30, dtype=str, keep_default_na=False)
+    upload.loc[3, "gender"] = "Other"
+    upload.loc[12, "tenure"] = ""
+    upload.loc[12, "Contract"] = "Weekly"
+    # Blank TotalCharges is nullable, so row 20 is scored
+    upload.loc[20, "TotalCharges"] = " "
+    # Every row of the second chunk (rows 10-19 with chunk_rows=10) but one is valid
+    scorer, output, scored_frames = _score(upload.to_csv(index=False).encode(), chunk_rows=10,
+                                           predict_fn=lambda dataframe: [1] * len(dataframe))
+
+    assert output["row"].tolist() == list(range(30))
+    assert output["customerID"].tolist() == upload["customerID"].tolist()
+    rejected = output[output["error"] != ""]
+    assert rejected["row"].tolist() == [3, 12]
+    assert rejected["prediction"].tolist() == ["", ""]
+    assert rejected["error"].tolist()[0].startswith("gender: 'Other' is not one of")
+    assert rejected["error"].tolist()[1].startswith("tenure: must not be blank; Contract: 'Weekly' is not one of")
+    assert (output.loc[output["error"] == "", "prediction"] == "1").all()
+    assert scorer.rows_scored == 30 and scorer.rows_rejected == 2
+
+    # The model sees exactly the decoded valid rows
+    valid = upload.drop(index=[3, 12]).to_dict("records")
+    expected = pd.DataFrame(get_feature_decoder().decode_many(valid))
+    pd.testing.assert_frame_equal(pd.concat(scored_frames, ignore_index=True), expected)
+
+
+def test_chunk_without_valid_rows_is_not_scored():
+    upload = pd.read_csv(DATA_FILE_PATH, nrows=3, dtype=str, keep_default_na=False)
+    upload["SeniorCitizen"] = "yes"
+    scorer, output, scored_frames = _score(upload.to_csv(index=False).encode(), chunk_rows=10,
+                                           predict_fn=lambda dataframe: [1] * len(dataframe))
+
+    assert scored_frames == []
+    assert output["prediction"].tolist() == ["", "", ""]
+    assert scorer.rows_rejected == 3
+
+
+def test_malformed_and_blank_lines_keep_the_row_numbers():
+    upload = pd.read_csv(DATA_FILE_PATH, nrows=6, dtype=str, keep_default_na=False)
+    lines = upload.to_csv(index=False).splitlines()
+    # Row 2 has an extra field and a blank line follows row 3, so the last two rows are lines 5 and 6
+    lines[3] += ",extra"
+    lines.insert(5, "")
+    scorer, output, scored_frames = _score("\n".join(lines).encode(), chunk_rows=3)
+
+    assert output["row"].tolist() == [0, 1, 2, 3, 5, 6]
+    ids = upload["customerID"].tolist()
+    assert output["customerID"].tolist() == ids[:2] + [""] + ids[3:]
+    assert output.loc[2, "error"] == f"expected {len(upload.columns)} fields, got {len(upload.columns) + 1}"
+    assert output.loc[2, "prediction"] == ""
+    assert sum(len(frame) for frame in scored_frames) == 5
+    assert scorer.rows_scored == 6 and scorer.rows_rejected == 1
+
+
+def _respond(body_iterator, body_read: asyncio.Event, receive):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    response = DuplexStreamingResponse(body_iterator, body_read=body_read, media_type="text/csv")
+    asyncio.run(response({"type": "http"}, receive, send))
+    return [message.get("body", b"") for message in sent if message["type"] == "http.response.body"]
+
+
+def test_disconnect_during_the_upload_stops_the_response():
+    async def body_iterator():
+        yield "row,prediction,error\n"
+        # The request stream raises once the client is gone
+        raise ClientDisconnect()
+
+    async def receive():
+        raise AssertionError("receive must not be called before the body is read")
+
+    assert _respond(body_iterator(), asyncio.Event(), receive) == [b"row,prediction,error\n"]
+
+
+def test_disconnect_after_the_upload_stops_scoring():
+    chunks_scored = []
+
+    async def body_iterator():
+        for row in range(1000):
+            chunks_scored.append(row)
+            yield f"{row},1,\n"
+            await asyncio.sleep(0.01)
+
+    async def receive():
+        await asyncio.sleep(0.05)
+        return {"type": "http.disconnect"}
+
+    body_read = asyncio.Event()
+    body_read.set()
+    _respond(body_iterator(), body_read, receive)
+    assert 0 < len(chunks_scored) < 100
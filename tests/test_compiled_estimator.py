@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+
+from conftest import DATA_FILE_PATH
+from src.components.data_transformation import DataTransformation
+from src.constants import TARGET_COLUMN
+from src.entity.compiled_estimator import CompiledModel
+from src.entity.config_entity import ModelTrainerConfig
+from src.entity.estimator import MyModel
+
+
+def _model_input(dataframe: pd.DataFrame) -> pd.DataFrame:
+    # The custom transformations the training and prediction pipelines apply before MyModel
+    transformation = DataTransformation(data_ingestion_artifact=None, data_transformation_config=None,
+                                        data_validation_artifact=None)
+    features = dataframe.drop(columns=[TARGET_COLUMN], errors="ignore").copy()
+    return transformation._drop_column(transformation._change_dtype(features))
+
+
+@pytest.fixture(scope="module")
+def models():
+    dataframe = pd.read_csv(DATA_FILE_PATH)
+    train, test = train_test_split(dataframe, test_size=0.2, random_state=0)
+    # A small forest through the production preprocessing pipeline
+    preprocessor = DataTransformation(data_ingestion_artifact=None, data_transformation_config=None,
+                                      data_validation_artifact=None).get_data_transformer_object()
+    trained_model = RandomForestClassifier(n_estimators=10, min_samples_split=ModelTrainerConfig._min_samples_split,
+                                           min_samples_leaf=ModelTrainerConfig._min_samples_leaf,
+                                           max_depth=ModelTrainerConfig._max_depth,
+                                           criterion=ModelTrainerConfig._criterion,
+                                           random_state=ModelTrainerConfig._random_state)
+    trained_model.fit(preprocessor.fit_transform(_model_input(train)),
+                      LabelEncoder().fit_transform(train[TARGET_COLUMN]))
+    model = MyModel(preprocessing_object=preprocessor, trained_model_object=trained_model)
+    return model, CompiledModel.from_model(model), test
+
+
+def _edge_cases(test: pd.DataFrame) -> pd.DataFrame:
+    rows = test.head(6).copy()
+    rows.iloc[0, rows.columns.get_loc("gender")] = "Unknown"
+    rows.iloc[1, rows.columns.get_loc("Contract")] = "Weekly"
+    rows.iloc[1, rows.columns.get_loc("PaymentMethod")] = "Cash"
+    rows.iloc[2, rows.columns.get_loc("TotalCharges")] = " "
+    rows.iloc[3, rows.columns.get_loc("TotalCharges")] = np.nan
+    rows.iloc[4, rows.columns.get_loc("tenure")] = 1000
+    rows.iloc[5, rows.columns.get_loc("MonthlyCharges")] = -5.0
+    return rows
+
+
+@pytest.mark.parametrize("rows", ["held_out", "edge_cases"])
+def test_compiled_model_matches_my_model(models, rows):
+    model, compiled, test = models
+    dataframe = _model_input(test if rows == "held_out" else _edge_cases(test))
+    if rows == "edge_cases":
+        assert dataframe["TotalCharges"].isna().sum() >= 2
+
+    expected_proba = model.trained_model_object.predict_proba(model.preprocessing_object.transform(dataframe))
+    expected = np.asarray(model.predict(dataframe))
+
+    np.testing.assert_allclose(compiled.predict_proba(dataframe), expected_proba, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(compiled.predict(dataframe), expected)
+    for record, proba, prediction in zip(dataframe[compiled.input_columns].to_dict("records"),
+                                         expected_proba, expected):
+        np.testing.assert_allclose(compiled.predict_proba_one(record), proba, rtol=0, atol=1e-12)
+        assert compiled.predict_one(record) == prediction
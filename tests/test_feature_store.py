@@ -0,0 +1,68 @@
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from conftest import MockMongoClient, load_customer_documents
+from src.components.data_ingestion import DataIngestion
+from src.entity.config_entity import DataIngestionConfig
+
+UPDATED_AT = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def collection(customer_collection):
+    documents = load_customer_documents(500)
+    for index, document in enumerate(documents):
+        document["updated_at"] = UPDATED_AT + timedelta(seconds=index)
+    customer_collection.insert_many(documents)
+    return customer_collection
+
+
+def _ingest(collection, root_dir: str, **config) -> pd.DataFrame:
+    data_ingestion_config = DataIngestionConfig(
+        feature_store_file_path=os.path.join(root_dir, "run", "data.parquet"),
+        persistent_feature_store_dir=os.path.join(root_dir, "store"), incremental=True,
+        watermark_field="updated_at", raw_batch_decoding=False, **config)
+    client = MockMongoClient(collection.database.client)
+    return DataIngestion(data_ingestion_config, mongo_client_factory=lambda: client).export_data_into_feature_store()
+
+
+def test_incremental_ingestion_picks_up_changed_documents(collection, tmp_path):
+    assert len(_ingest(collection, str(tmp_path))) == 500
+
+    changed = collection.find_one({"Churn": "No"})
+    collection.update_one({"_id": changed["_id"]},
+                          {"$set": {"Churn": "Yes", "updated_at": UPDATED_AT + timedelta(hours=1)}})
+    dataframe = _ingest(collection, str(tmp_path)).set_index("customerID")
+
+    assert len(dataframe) == 500
+    assert dataframe.loc[changed["customerID"], "Churn"] == "Yes"
+
+    # Committed after the previous run with an update time just below its watermark
+    late = collection.find_one({"Churn": "No"})
+    collection.update_one({"_id": late["_id"]},
+                          {"$set": {"Churn": "Yes", "updated_at": UPDATED_AT + timedelta(hours=1, seconds=-60)}})
+    dataframe = _ingest(collection, str(tmp_path)).set_index("customerID")
+
+    assert dataframe.loc[late["customerID"], "Churn"] == "Yes"
+
+
+def test_forced_full_resync_drops_deleted_documents(collection, tmp_path):
+    _ingest(collection, str(tmp_path))
+    deleted = collection.find_one({})
+    collection.delete_one({"_id": deleted["_id"]})
+
+    assert deleted["customerID"] in set(_ingest(collection, str(tmp_path))["customerID"])
+
+    dataframe = _ingest(collection, str(tmp_path), force_full_resync=True)
+
+    assert len(dataframe) == 499
+    assert deleted["customerID"] not in set(dataframe["customerID"])
+    assert len(os.listdir(tmp_path / "store")) == 2
+
+
+def test_incremental_ingestion_rejects_id_watermark():
+    with pytest.raises(ValueError):
+        DataIngestionConfig(incremental=True, watermark_field="_id")
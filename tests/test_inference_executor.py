@@ -0,0 +1,39 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.pipline.inference_executor import InferenceExecutor, InferencePoolFullError
+
+
+def test_cancelled_caller_keeps_the_slot_until_the_task_returns():
+    executor = InferenceExecutor(max_workers=1, max_queue_depth=0)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_task():
+        started.set()
+        release.wait(timeout=60)
+        return "done"
+
+    async def run():
+        caller = asyncio.create_task(executor.run(blocking_task))
+        await asyncio.to_thread(started.wait, 60)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+
+        # The worker thread is still busy with the abandoned task
+        assert executor.get_stats()["in_flight"] == 1
+        with pytest.raises(InferencePoolFullError):
+            await executor.run(len, [])
+
+        release.set()
+        while executor.get_stats()["in_flight"]:
+            await asyncio.sleep(0.01)
+        return await executor.run(len, [1, 2])
+
+    try:
+        assert asyncio.run(run()) == 2
+    finally:
+        release.set()
+        executor.shutdown()
@@ -0,0 +1,81 @@
+import os
+import pickle
+
+import dill
+import pandas as pd
+import pytest
+
+from conftest import DATA_FILE_PATH
+from src.cloud_storage.local_storage import LocalStorageService
+from src.entity.compiled_estimator import CompiledModel
+from src.entity.estimator import MyModel
+from src.entity.model_cache import ModelCache
+from src.entity.s3_estimator import Proj1Estimator
+from src.pipline.load_test_pipeline import fit_model
+
+BUCKET_NAME = "model-bucket"
+MODEL_PATH = "model.pkl"
+
+
+@pytest.fixture(scope="module")
+def model_file(tmp_path_factory):
+    model_file_path = tmp_path_factory.mktemp("model") / "model.pkl"
+    with open(model_file_path, "wb") as file_obj:
+        dill.dump(fit_model(pd.read_csv(DATA_FILE_PATH), n_estimators=5), file_obj)
+    return str(model_file_path)
+
+
+def test_compiled_artifact_is_pushed_next_to_the_pickle(tmp_path, model_file):
+    storage = LocalStorageService(root_dir=str(tmp_path))
+    estimator = Proj1Estimator(bucket_name=BUCKET_NAME, model_path=MODEL_PATH, storage=storage)
+    estimator.save_model(model_file, artifact_format="compiled")
+
+    assert estimator.compiled_model_path == "model.compiled"
+    # Readers of model.pkl still get the pickle
+    with open(tmp_path / BUCKET_NAME / MODEL_PATH, "rb") as file_obj:
+        assert isinstance(pickle.load(file_obj), MyModel)
+
+    model_cache = ModelCache(bucket_name=BUCKET_NAME, model_path=MODEL_PATH, storage=storage)
+    snapshot = model_cache.get_snapshot()
+    assert isinstance(snapshot.model, CompiledModel)
+    assert snapshot.version == storage.get_object_version("model.compiled", bucket_name=BUCKET_NAME)
+
+    # A pickle-only push removes the compiled artifact of the earlier model, serving falls back to the pickle
+    estimator.save_model(model_file, artifact_format="pickle")
+    assert not os.path.exists(tmp_path / BUCKET_NAME / "model.compiled")
+    assert model_cache.refresh()
+    assert isinstance(model_cache.get_model(), MyModel)
+    assert model_cache.version == storage.get_object_version(MODEL_PATH, bucket_name=BUCKET_NAME)
+
+
+def test_failed_pickle_push_keeps_the_compiled_artifact(tmp_path, model_file, monkeypatch):
+    storage = LocalStorageService(root_dir=str(tmp_path))
+    estimator = Proj1Estimator(bucket_name=BUCKET_NAME, model_path=MODEL_PATH, storage=storage)
+    estimator.save_model(model_file, artifact_format="compiled")
+
+    def failing_upload(*args, **kwargs):
+        raise OSError("upload failed")
+
+    monkeypatch.setattr(storage, "upload_file", failing_upload)
+    with pytest.raises(Exception):
+        estimator.save_model(model_file, artifact_format="pickle")
+    assert isinstance(estimator.load_model_with_version()[0], CompiledModel)
+
+
+def test_pickle_only_deployment_loads_the_pickle(tmp_path, model_file, monkeypatch):
+    storage = LocalStorageService(root_dir=str(tmp_path))
+    estimator = Proj1Estimator(bucket_name=BUCKET_NAME, model_path=MODEL_PATH, storage=storage)
+    estimator.save_model(model_file, artifact_format="pickle")
+    loaded_paths = []
+    load_model_with_version = storage.load_model_with_version
+
+    def recording_load(model_name, **kwargs):
+        loaded_paths.append(model_name)
+        return load_model_with_version(model_name, **kwargs)
+
+    monkeypatch.setattr(storage, "load_model_with_version", recording_load)
+    model, version = estimator.load_model_with_version()
+
+    assert isinstance(model, MyModel)
+    assert loaded_paths == [MODEL_PATH]
+    assert version == storage.get_object_version(MODEL_PATH, bucket_name=BUCKET_NAME)
@@ -0,0 +1,53 @@
+import multiprocessing
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import MockMongoClient
+from src.components.data_ingestion import DataIngestion
+from src.entity.config_entity import DataIngestionConfig
+
+pytest.importorskip("mongomock")
+
+
+def _ingestion_config(root_dir: str) -> DataIngestionConfig:
+    # Parallel export from the first document on, with mongomock's document cursor
+    return DataIngestionConfig(feature_store_file_path=os.path.join(root_dir, "feature_store", "data.parquet"),
+                               training_file_path=os.path.join(root_dir, "ingested", "train.parquet"),
+                               testing_file_path=os.path.join(root_dir, "ingested", "test.parquet"),
+                               incremental=False, streaming_export=True, raw_batch_decoding=False,
+                               export_workers=2, parallel_min_documents=0)
+
+
+def _export(root_dir: str) -> pd.DataFrame:
+    # MockMongoClient is picklable and holds the same documents in every export worker
+    return DataIngestion(_ingestion_config(root_dir), mongo_client_factory=MockMongoClient).export_data_into_feature_store()
+
+
+def test_parallel_export_matches_collection(tmp_path):
+    dataframe = _export(str(tmp_path))
+
+    assert dataframe.shape == (7043, 21)
+    assert dataframe["customerID"].is_unique
+    assert pd.to_numeric(dataframe["TotalCharges"], errors="coerce").isna().sum() == 11
+
+
+def _export_in_process(root_dir: str, results: multiprocessing.Queue) -> None:
+    try:
+        results.put(("ok", _export(root_dir).shape))
+    except Exception as e:
+        results.put(("error", f"{e}"))
+
+
+def test_export_from_daemonic_process(tmp_path):
+    # Training may run in a daemonic process, which must not start export worker processes
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_export_in_process, args=(str(tmp_path), results), daemon=True)
+    process.start()
+    status, value = results.get(timeout=300)
+    process.join()
+
+    assert status == "ok", value
+    assert value == (7043, 21)
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import app as serving_app
+from conftest import DATA_FILE_PATH
+from src.constants import TARGET_COLUMN
+from src.entity.model_cache import ModelSnapshot
+from src.pipline.prediction_cache import PredictionCache
+from src.pipline.prediction_pipeline import VehicleDataClassifier, get_prediction_schema
+
+
+@pytest.fixture
+def payloads():
+    dataframe = pd.read_csv(DATA_FILE_PATH, nrows=2, dtype=str).drop(columns=[TARGET_COLUMN])
+    return dataframe.to_dict("records")
+
+
+@pytest.fixture
+def coalesced(monkeypatch):
+    # Model version 1 is in memory; the coalescer records what reaches it instead of scoring
+    monkeypatch.setattr(serving_app.model_cache, "_snapshot", ModelSnapshot(model=None, version="1", loaded_at=0.0))
+    records = []
+
+    async def predict(record):
+        records.append(record)
+        return 0
+
+    monkeypatch.setattr(serving_app.prediction_coalescer, "predict", predict)
+    return records
+
+
+def test_cache_hits_do_not_reach_the_coalescer(coalesced, payloads):
+    prediction_cache = serving_app.record_predictor.prediction_cache
+    hit_record = serving_app.feature_decoder.decode(payloads[0])
+    prediction_cache.put(prediction_cache.make_key(hit_record), "1", 1)
+
+    client = TestClient(serving_app.app)
+    assert client.post("/predict", json=payloads[0]).json() == {"status": True, "prediction": 1}
+    assert coalesced == []
+
+    assert client.post("/predict", json=payloads[1]).json() == {"status": True, "prediction": 0}
+    assert coalesced == [serving_app.feature_decoder.decode(payloads[1])]
+
+
+def test_coalesced_miss_is_looked_up_once(monkeypatch, payloads):
+    schema_config = get_prediction_schema()
+    prediction_cache = PredictionCache(
+        input_columns=schema_config["numerical_features"] + schema_config["categorical_features"],
+        numerical_columns=schema_config["numerical_features"])
+    classifier = VehicleDataClassifier(prediction_cache=prediction_cache)
+    snapshot = ModelSnapshot(model=None, version="1", loaded_at=0.0)
+    model_cache = SimpleNamespace(version="1", get_snapshot=lambda: snapshot)
+    monkeypatch.setattr(classifier, "get_model_cache", lambda: model_cache)
+    monkeypatch.setattr(classifier, "score_records", lambda snapshot, records: [1] * len(records))
+    record = serving_app.feature_decoder.decode(payloads[0])
+
+    # predict_record's early check, then the coalesced batch, then a repeat of the request
+    assert classifier.get_cached_prediction(record) == (False, None)
+    assert classifier.predict_records([record], check_cache=False) == [1]
+    assert classifier.get_cached_prediction(record) == (True, 1)
+
+    stats = prediction_cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
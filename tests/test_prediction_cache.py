@@ -0,0 +1,52 @@
+from src.pipline.prediction_cache import PredictionCache
+
+RECORD = {"tenure": 34, "MonthlyCharges": 56.95, "TotalCharges": "1889.5", "Contract": "One year"}
+
+
+def _cache(**kwargs) -> PredictionCache:
+    return PredictionCache(input_columns=list(RECORD), numerical_columns=["tenure", "MonthlyCharges", "TotalCharges"],
+                           **kwargs)
+
+
+def test_equal_records_share_a_key():
+    cache = _cache()
+    key = cache.make_key(RECORD)
+
+    assert key == cache.make_key(dict(RECORD, tenure="34", TotalCharges=1889.5))
+    assert key == cache.make_key(dict(reversed(list(RECORD.items()))))
+    assert key != cache.make_key(dict(RECORD, Contract="Two year"))
+    # Blank and NaN numbers are the same missing value
+    assert cache.make_key(dict(RECORD, TotalCharges=" ")) == cache.make_key(dict(RECORD, TotalCharges=float("nan")))
+    assert cache.make_key({"tenure": 34}) is None
+
+
+def test_hits_misses_and_lru_eviction():
+    cache = _cache(max_size=2)
+    keys = [cache.make_key(dict(RECORD, tenure=tenure)) for tenure in range(3)]
+    cache.put(keys[0], "1", 0)
+    cache.put(keys[1], "1", 1)
+
+    assert cache.get(keys[0], "1") == (True, 0)
+    # keys[1] is now the least recently used entry
+    cache.put(keys[2], "1", 1)
+
+    assert cache.get(keys[1], "1") == (False, None)
+    assert cache.get(keys[2], "1") == (True, 1)
+    assert cache.get(None, "1") == (False, None)
+    stats = cache.get_stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 2, 2, 1)
+
+
+def test_entries_expire_and_new_model_versions_drop_the_cache():
+    key = _cache().make_key(RECORD)
+    expired = _cache(ttl_seconds=-1)
+    expired.put(key, "1", 1)
+
+    assert expired.get(key, "1") == (False, None)
+
+    cache = _cache()
+    cache.put(key, "1", 1)
+
+    assert cache.get(key, "2") == (False, None)
+    assert cache.get(key, "1") == (False, None)
+    assert cache.get_stats()["invalidations"] == 1
@@ -0,0 +1,28 @@
+import asyncio
+
+from src.pipline.prediction_coalescer import PredictionCoalescer
+
+
+def test_shutdown_drains_queued_and_running_batches():
+    scored = []
+
+    def predict_fn(records):
+        scored.append(len(records))
+        return [record["tenure"] for record in records]
+
+    async def run():
+        # A long window: the queued records are only flushed by shutdown
+        coalescer = PredictionCoalescer(predict_fn=predict_fn, window_ms=60_000, max_batch_size=3)
+        callers = [asyncio.create_task(coalescer.predict({"tenure": tenure})) for tenure in range(5)]
+        await asyncio.sleep(0)
+
+        # The first three records filled a batch; its task is held until it finishes
+        assert len(coalescer._batch_tasks) == 1
+        await coalescer.shutdown()
+
+        assert not coalescer._batch_tasks
+        assert all(caller.done() for caller in callers)
+        return await asyncio.gather(*callers)
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+    assert scored == [3, 2]
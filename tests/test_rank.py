@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from src.pipline.prediction_pipeline import top_k_indices
+
+
+@pytest.mark.parametrize("k", [0, 1, 5, 37, 200, 1000])
+def test_top_k_matches_a_stable_full_sort(k):
+    # Few distinct values, so many scores tie with the k-th one
+    scores = np.random.default_rng(0).integers(0, 10, size=200) / 10
+
+    expected = np.argsort(-scores, kind="stable")[:k]
+
+    np.testing.assert_array_equal(top_k_indices(scores, k), expected)
+
+
+def test_top_k_of_no_scores_is_empty():
+    assert len(top_k_indices(np.array([]), 5)) == 0
@@ -0,0 +1,23 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app as serving_app
+
+
+@pytest.fixture(scope="module")
+def client():
+    # Without the lifespan: none of these requests reach the model
+    return TestClient(serving_app.app)
+
+
+def test_empty_records_give_an_empty_ranking(client):
+    response = client.post("/predict/rank", json={"records": [], "k": 5})
+    assert response.status_code == 200
+    assert response.json() == {"status": True, "count": 0, "k": 5, "ranking": []}
+
+
+@pytest.mark.parametrize("k", [0, -1, 2.5, "10", True, None])
+def test_k_must_be_a_positive_integer(client, k):
+    response = client.post("/predict/rank", json={"records": [], "k": k})
+    assert response.status_code == 422
+    assert response.json()["errors"] == [f"k: expected an integer >= 1, got {k!r}"]
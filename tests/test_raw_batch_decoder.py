@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta
+
+import bson
+import pandas as pd
+import pytest
+
+from conftest import MockMongoClient, load_customer_documents
+from src.components.data_ingestion import DataIngestion
+from src.constants import DATA_INGESTION_COLLECTION_NAME
+from src.data_access.CustomerData import CustomerData
+from src.data_access.raw_batch_decoder import RawBatchDecoder
+
+COLUMN_TYPES = DataIngestion._schema_column_types()
+
+
+class RawBatchCursor:
+    """
+    find_raw_batches cursor over a mongomock collection: the matching documents as BSON batches.
+    """
+
+    def __init__(self, collection, query: dict, projection: dict, batch_size: int):
+        self.cursor = collection.find(query, projection)
+        self.batch_size = batch_size
+
+    def sort(self, field: str, direction: int) -> "RawBatchCursor":
+        self.cursor = self.cursor.sort(field, direction)
+        return self
+
+    def __iter__(self):
+        documents = list(self.cursor)
+        for start in range(0, len(documents), self.batch_size):
+            yield b"".join(bson.encode(document) for document in documents[start:start + self.batch_size])
+
+    def close(self) -> None:
+        self.cursor.close()
+
+
+class RawBatchCollection:
+    def __init__(self, collection):
+        self.collection = collection
+        self.codec_options = collection.codec_options
+        self.raw_batch_queries = 0
+
+    def find(self, *args, **kwargs):
+        return self.collection.find(*args, **kwargs)
+
+    def find_raw_batches(self, query: dict, projection: dict, batch_size: int) -> RawBatchCursor:
+        self.raw_batch_queries += 1
+        return RawBatchCursor(self.collection, query, projection, batch_size)
+
+
+def _batches(documents: list, batch_size: int) -> list:
+    return [b"".join(bson.encode(document) for document in documents[start:start + batch_size])
+            for start in range(0, len(documents), batch_size)]
+
+
+def _decode(decoder: RawBatchDecoder, batches: list) -> pd.DataFrame:
+    return decoder.to_typed_chunk(pd.concat([decoder.decode(batch) for batch in batches], ignore_index=True))
+
+
+def _decode_documents(batches: list) -> pd.DataFrame:
+    decoder = RawBatchDecoder(COLUMN_TYPES)
+    # Decode every batch into documents, as without pymongoarrow
+    decoder._arrow_types = None
+    return _decode(decoder, batches)
+
+
+@pytest.fixture(scope="module")
+def documents():
+    # TotalCharges is stored as a string, blank for new customers, as when imported from the CSV
+    return [{column: document[column] for column in COLUMN_TYPES} for document in load_customer_documents(1000)]
+
+
+def test_documents_decode_to_schema_dtypes(documents):
+    dataframe = _decode_documents(_batches(documents, 128))
+
+    assert len(dataframe) == 1000
+    assert dataframe["tenure"].dtype == "int64"
+    assert dataframe["TotalCharges"].dtype == "float64"
+    assert dataframe["TotalCharges"].isna().sum() == sum(document["TotalCharges"] == " " for document in documents)
+    assert dataframe["Contract"].dtype == "category"
+    assert dataframe["customerID"].tolist() == [document["customerID"] for document in documents]
+
+
+def test_arrow_decoding_matches_document_decoding(documents):
+    if not RawBatchDecoder.is_available(COLUMN_TYPES):
+        pytest.skip("pymongoarrow is not installed")
+    # A later batch holds tenure as a float and TotalCharges as a number, so the Arrow types are probed again
+    changed = [dict(document) for document in documents]
+    for document in changed[500:]:
+        document["tenure"] = float(document["tenure"])
+        document["TotalCharges"] = float(document["TotalCharges"]) if document["TotalCharges"] != " " else None
+    batches = _batches(changed, 128)
+
+    pd.testing.assert_frame_equal(_decode(RawBatchDecoder(COLUMN_TYPES), batches), _decode_documents(batches))
+
+
+def test_mixed_types_in_a_batch_fall_back_to_documents(documents):
+    mixed = [dict(document) for document in documents[:10]]
+    mixed[3]["MonthlyCharges"] = "70.5"
+    decoder = RawBatchDecoder(COLUMN_TYPES)
+
+    dataframe = _decode(decoder, _batches(mixed, 10))
+
+    assert dataframe["MonthlyCharges"].tolist() == [70.5 if index == 3 else document["MonthlyCharges"]
+                                                    for index, document in enumerate(mixed)]
+
+
+def test_raw_batch_export_matches_document_export(customer_collection):
+    if not RawBatchDecoder.is_available(dict(COLUMN_TYPES, _id="object")):
+        pytest.skip("pymongoarrow is not installed")
+    customer_collection.insert_many(load_customer_documents(1000))
+    collection = RawBatchCollection(customer_collection)
+    client = MockMongoClient(customer_collection.database.client)
+    client.database = {DATA_INGESTION_COLLECTION_NAME: collection}
+    customer_data = CustomerData(mongo_client=client)
+
+    def export(raw_batches: bool) -> pd.DataFrame:
+        chunks = customer_data.iter_collection_as_typed_chunks(
+            collection_name=DATA_INGESTION_COLLECTION_NAME, column_types=COLUMN_TYPES, chunk_size=300,
+            batch_size=128, sort_field="_id", raw_batches=raw_batches)
+        return pd.concat(chunks, ignore_index=True)
+
+    raw, documents = export(raw_batches=True), export(raw_batches=False)
+    assert collection.raw_batch_queries == 1
+    for column, dtype in COLUMN_TYPES.items():
+        if dtype == "category":
+            # Categories are those seen in each chunk, compare the values
+            raw[column], documents[column] = raw[column].astype(str), documents[column].astype(str)
+    pd.testing.assert_frame_equal(raw, documents)
+
+
+def test_updated_at_watermark_is_decoded_from_raw_batches(customer_collection):
+    if not RawBatchDecoder.is_available(COLUMN_TYPES):
+        pytest.skip("pymongoarrow is not installed")
+    documents = load_customer_documents(1000)
+    for index, document in enumerate(documents):
+        document["updated_at"] = datetime(2026, 1, 1) + timedelta(seconds=index)
+    customer_collection.insert_many(documents)
+    collection = RawBatchCollection(customer_collection)
+    client = MockMongoClient(customer_collection.database.client)
+    client.database = {DATA_INGESTION_COLLECTION_NAME: collection}
+    customer_data = CustomerData(mongo_client=client)
+
+    def export(raw_batches: bool) -> pd.DataFrame:
+        # The query and sort of an incremental ingestion run
+        chunks = customer_data.iter_collection_as_typed_chunks(
+            collection_name=DATA_INGESTION_COLLECTION_NAME, column_types=COLUMN_TYPES, chunk_size=300,
+            batch_size=128, query={"updated_at": {"$gte": datetime(2026, 1, 1, 0, 5)}}, sort_field="updated_at",
+            raw_batches=raw_batches)
+        return pd.concat(chunks, ignore_index=True)
+
+    raw, documents = export(raw_batches=True), export(raw_batches=False)
+    assert collection.raw_batch_queries == 1
+    assert len(raw) == 700
+    assert raw["updated_at"].iloc[-1] == datetime(2026, 1, 1) + timedelta(seconds=999)
+    pd.testing.assert_series_equal(raw["updated_at"], documents["updated_at"], check_exact=True)
+
+
+def test_epoch_second_watermarks_decode_as_numbers():
+    if not RawBatchDecoder.is_available(COLUMN_TYPES):
+        pytest.skip("pymongoarrow is not installed")
+    decoder = RawBatchDecoder({"customerID": "category", "updated_at": "object"})
+    batch = _batches([{"customerID": "0001", "updated_at": 1767225600},
+                      {"customerID": "0002", "updated_at": 1767225600.5}], 2)[0]
+
+    assert decoder.decode(batch)["updated_at"].tolist() == [1767225600.0, 1767225600.5]
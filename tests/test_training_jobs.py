@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.pipline import training_jobs
+from src.pipline.training_jobs import (FAILED, RUNNING, SUCCEEDED, TrainingJob, TrainingJobManager,
+                                       TrainingJobRunningError)
+
+
+def _fake_training_job(events, niceness):
+    # Runs in the spawned training process; finishes once the test creates the release file
+    events.put(("started", "data_ingestion", None, time.time()))
+    while not os.path.exists(os.path.join(os.environ["TRAINING_JOB_TEST_DIR"], "release")):
+        time.sleep(0.05)
+    events.put(("completed", "data_ingestion", {"rows": 1}, time.time()))
+    events.put((SUCCEEDED, None, None, time.time()))
+
+
+def _wait_for(condition, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    # The spawned training process reads the environment, not the test's monkeypatched module
+    monkeypatch.setenv("TRAINING_JOB_TEST_DIR", str(tmp_path))
+    monkeypatch.setattr(training_jobs, "_run_training_job", _fake_training_job)
+    return str(tmp_path / "state")
+
+
+def test_one_job_per_host_and_status_shared_between_workers(state_dir, tmp_path):
+    # Two managers on one state directory stand for two serving workers
+    first_worker = TrainingJobManager(state_dir=state_dir)
+    second_worker = TrainingJobManager(state_dir=state_dir)
+
+    job = first_worker.submit()
+    with pytest.raises(TrainingJobRunningError) as running:
+        second_worker.submit()
+    assert running.value.job_id == job.job_id
+    _wait_for(lambda: second_worker.get_job(job.job_id)["status"] == RUNNING)
+
+    (tmp_path / "release").touch()
+    _wait_for(lambda: second_worker.get_job(job.job_id)["status"] == SUCCEEDED)
+    assert second_worker.get_job(job.job_id)["artifacts"] == {"data_ingestion": {"rows": 1}}
+
+    _wait_for(lambda: not first_worker._run_lock.locked())
+    next_job = second_worker.submit()
+    _wait_for(lambda: first_worker.get_job(next_job.job_id)["status"] == SUCCEEDED)
+
+
+def test_abandoned_job_is_reported_failed(state_dir):
+    manager = TrainingJobManager(state_dir=state_dir)
+    os.makedirs(state_dir)
+    # Left running by a worker that died: nobody holds the host lock
+    manager._write_job(TrainingJob(job_id="a" * 32, status=RUNNING))
+
+    assert manager.get_job("a" * 32)["status"] == FAILED
+
+
+def test_unknown_job_ids(state_dir):
+    manager = TrainingJobManager(state_dir=state_dir)
+
+    assert manager.get_job("b" * 32) is None
+    assert manager.get_job("../training.lock") is None
+
+
+def test_polls_read_the_lock_holder_without_taking_the_lock(state_dir, monkeypatch):
+    manager = TrainingJobManager(state_dir=state_dir)
+    os.makedirs(state_dir)
+    exited_worker = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited_worker.wait()
+
+    def flock(*args):
+        raise AssertionError("a poll must not take the host lock, it would make a concurrent submit fail")
+
+    monkeypatch.setattr(training_jobs, "fcntl", SimpleNamespace(flock=flock))
+    for job_id, holder_pid, status in (("a" * 32, exited_worker.pid, FAILED), ("b" * 32, os.getpid(), RUNNING)):
+        with open(os.path.join(state_dir, "training.lock"), "w") as lock_file:
+            lock_file.write(f"{job_id} {holder_pid}")
+        manager._write_job(TrainingJob(job_id=job_id, status=RUNNING))
+
+        assert manager.get_job(job_id)["status"] == status